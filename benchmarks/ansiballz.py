@@ -0,0 +1,141 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Measure what every task pays before a module does any work: build the
+AnsiballZ payload of each collection module the way the controller
+does, then run it locally in check mode, where the resource modules
+exit right after argument validation.
+
+Reports the payload size, the size of the embedded module_utils zip,
+and the median wall time of a check mode run.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import base64
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# sets up sys.path and the plugin loader for the collection
+import harness  # noqa: F401
+
+from ansible import constants as C  # noqa: E402
+from ansible.executor.module_common import modify_module  # noqa: E402
+from ansible.parsing.dataloader import DataLoader  # noqa: E402
+from ansible.template import Templar  # noqa: E402
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "modules")
+
+# arguments of a check mode run; modules not listed here connect to the
+# switch even in check mode, so only their size is reported
+CHECK_MODE_ARGS = {
+    "acl": {"state": "gathered"},
+    "bridge": {"state": "gathered"},
+    "command": {"commands": ["nv show system"]},
+    "config": {"state": "gathered"},
+    "evpn": {"state": "gathered"},
+    "interface": {"state": "gathered"},
+    "mlag": {"state": "gathered"},
+    "qos": {"state": "gathered"},
+    "router": {"state": "gathered"},
+    "service": {"state": "gathered"},
+    "system": {"state": "gathered"},
+    "vrf": {"state": "gathered"},
+    "vxlan": {"state": "gathered"},
+}
+
+ZIP_DATA = re.compile(rb"['\"]([A-Za-z0-9+/=\r\n]{1024,})['\"]")
+
+
+def module_names():
+    return sorted(
+        name[:-3] for name in os.listdir(MODULES_DIR)
+        if name.endswith(".py") and not name.startswith("_")
+    )
+
+
+def build(name, args):
+    """Build the AnsiballZ payload for a module; returns the payload bytes"""
+    module_args = dict(args, _ansible_check_mode=True)
+    built = modify_module(
+        module_name=name,
+        module_path=os.path.join(MODULES_DIR, name + ".py"),
+        module_args=module_args,
+        templar=Templar(loader=DataLoader()),
+        task_vars={"ansible_python_interpreter": sys.executable, "ansible_playbook_python": sys.executable},
+        module_compression=C.config.get_config_value("DEFAULT_MODULE_COMPRESSION"),
+        remote_is_local=True,
+    )
+    # ansible-core 2.19 returns an object, older releases a tuple
+    return getattr(built, "b_module_data", None) or built[0]
+
+
+def zip_size(payload):
+    match = ZIP_DATA.search(payload)
+    if match is None:
+        return None
+    return len(base64.b64decode(match.group(1)))
+
+
+def startup(payload, runs):
+    """Median seconds of running a payload with the current interpreter"""
+    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as handle:
+        handle.write(payload)
+    env = dict(os.environ, ANSIBLE_KEEP_REMOTE_FILES="0")
+    timings = []
+    try:
+        for _run in range(runs):
+            start = time.perf_counter()
+            process = subprocess.run([sys.executable, handle.name], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            timings.append(time.perf_counter() - start)
+            result = json.loads(process.stdout or b"{}")
+            if process.returncode or result.get("failed"):
+                raise Exception(f"Check mode run failed: {result.get('msg') or process.stderr.decode()}")
+    finally:
+        os.unlink(handle.name)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", help="modules to measure (default: all)")
+    parser.add_argument("--runs", type=int, default=10, help="check mode runs per module (default: 10)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    names = args.modules or module_names()
+    unknown = sorted(set(names) - set(module_names()))
+    if unknown:
+        parser.error(f"unknown modules: {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'module':<12}{'payload KiB':>14}{'zip KiB':>10}{'startup ms':>13}")
+    for name in names:
+        payload = build(name, CHECK_MODE_ARGS.get(name, {}))
+        seconds = startup(payload, args.runs) if name in CHECK_MODE_ARGS else None
+        zipped = zip_size(payload)
+        results[name] = {"payload": len(payload), "zip": zipped, "startup": seconds}
+        print(
+            f"{name:<12}{len(payload) / 1024:>14.1f}"
+            f"{zipped / 1024 if zipped else float('nan'):>10.1f}"
+            f"{seconds * 1000 if seconds else float('nan'):>13.1f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Microbenchmarks of controller-side CPU per task, run with pytest-benchmark:
+
+    make bench-micro
+
+They time HttpApi.normalize_keys/normalize_spec and AnsibleModule argument
+validation of the interface, vrf, acl and bridge modules, with and without
+fast_validation, on generated data with 10, 1,000 and 10,000 list entries,
+and the acl compile step on ACLs of 1,000 to 20,000 rules. The scaling
+checks fail when the cost per entry grows with the number of entries,
+which is how accidental quadratic behavior shows up.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import gc
+import time
+
+import pytest
+
+import generators
+from harness import load_httpapi, run_module
+from ansible_collections.nvidia.nvue.plugins.module_utils.acl import compile_rules
+
+SCALES = [10, 1000, 10000]
+COMPILE_SCALES = [1000, 5000, 20000]
+
+PAYLOADS = {
+    "interface": generators.interfaces,
+    "vrf": generators.vrfs,
+    "acl": generators.acl,
+    "bridge": generators.bridge,
+}
+
+# allowed growth of the per-entry cost from 1,000 to 10,000 entries
+LINEAR_SLACK = 3.0
+
+
+@pytest.fixture(scope="module")
+def plugin():
+    return load_httpapi(None)
+
+
+def payload(module, scale):
+    return PAYLOADS[module](scale)
+
+
+def normalize(plugin, data):
+    return plugin.normalize_spec(plugin.normalize_keys(data))
+
+
+def validate(module, data, fast=False):
+    result = run_module(module, {"state": "merged", "data": data, "fast_validation": fast}, check_mode=True)
+    assert not result.get("failed"), result.get("msg")
+    return result
+
+
+def fresh(data):
+    # normalize_spec consumes the ids of its input, so every round gets a copy
+    return lambda: ((copy.deepcopy(data),), {})
+
+
+@pytest.mark.parametrize("scale", SCALES)
+@pytest.mark.parametrize("module", sorted(PAYLOADS))
+def bench_normalize_keys(benchmark, plugin, module, scale):
+    data = payload(module, scale)
+    benchmark.extra_info["entries"] = scale
+    benchmark.pedantic(plugin.normalize_keys, args=(data,), rounds=5)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+@pytest.mark.parametrize("module", sorted(PAYLOADS))
+def bench_normalize_spec(benchmark, plugin, module, scale):
+    data = plugin.normalize_keys(payload(module, scale))
+    benchmark.extra_info["entries"] = scale
+    benchmark.pedantic(plugin.normalize_spec, setup=fresh(data), rounds=5)
+
+
+@pytest.mark.parametrize("fast", [False, True], ids=["standard", "fast"])
+@pytest.mark.parametrize("scale", SCALES)
+@pytest.mark.parametrize("module", sorted(PAYLOADS))
+def bench_validation(benchmark, module, scale, fast):
+    data = payload(module, scale)
+    benchmark.extra_info["entries"] = scale
+    benchmark.pedantic(validate, args=(module, data, fast), rounds=3 if scale < 10000 else 1)
+
+
+@pytest.mark.parametrize("scale", COMPILE_SCALES)
+def bench_compile_acl(benchmark, scale):
+    rules = generators.redundant_acl(scale)[0]["rule"]
+    benchmark.extra_info["entries"] = scale
+    kept, report = benchmark.pedantic(compile_rules, args=(rules,), rounds=3 if scale < 20000 else 1)
+    assert report["tcam_entries"]["saved"] == scale * 3 // 10
+
+
+def per_entry(function, module, scale, generate=payload):
+    data = generate(module, scale)
+    # keep collector pauses, which grow with the heap, out of the comparison
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function(data)
+        return (time.perf_counter() - start) / scale
+    finally:
+        gc.enable()
+
+
+@pytest.mark.parametrize("module", sorted(PAYLOADS))
+def bench_normalize_scales_linearly(plugin, module):
+    step = lambda data: normalize(plugin, data)  # noqa: E731
+    small = min(per_entry(step, module, 1000) for dummy in range(3))
+    large = min(per_entry(step, module, 10000) for dummy in range(3))
+    assert large < small * LINEAR_SLACK, "normalizing %s costs %.1fx more per entry at 10k" % (module, large / small)
+
+
+@pytest.mark.parametrize("fast", [False, True], ids=["standard", "fast"])
+@pytest.mark.parametrize("module", sorted(PAYLOADS))
+def bench_validation_scales_linearly(module, fast):
+    step = lambda data: validate(module, data, fast)  # noqa: E731
+    small = per_entry(step, module, 1000)
+    large = per_entry(step, module, 10000)
+    assert large < small * LINEAR_SLACK, "validating %s costs %.1fx more per entry at 10k" % (module, large / small)
+
+
+def bench_compile_scales_linearly():
+    step = lambda rules: compile_rules(rules)  # noqa: E731
+    generate = lambda module, scale: generators.redundant_acl(scale)[0]["rule"]  # noqa: E731
+    small = min(per_entry(step, "acl", 1000, generate) for dummy in range(3))
+    large = min(per_entry(step, "acl", 10000, generate) for dummy in range(3))
+    assert large < small * LINEAR_SLACK, "compiling an ACL costs %.1fx more per rule at 10k" % (large / small)
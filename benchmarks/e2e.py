@@ -0,0 +1,221 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+End-to-end benchmarks: the real httpapi plugin and resource modules
+pushing representative workloads to mock nvued instances.
+
+For every workload and host this reports the number of HTTP requests,
+bytes sent, wall time and peak Python memory. Results can be saved and
+later compared against, failing when a workload needs more requests or
+gets slower than the tolerance allows:
+
+    make bench BENCH_ARGS="--save baseline.json"
+    make bench BENCH_ARGS="--compare baseline.json --tolerance 0.25"
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generators  # noqa: E402
+from harness import UrllibConnection, load_httpapi, measure, run_module  # noqa: E402
+from mock_nvued import MockNvued  # noqa: E402
+
+
+def full_leaf(plugin, wait):
+    """Stage every resource of a 64-port MLAG/EVPN leaf into one revision and apply it"""
+    revid = run_module("config", {"state": "new"}, plugin)["revid"]
+    steps = [
+        ("system", generators.system()),
+        ("interface", generators.interfaces(48) + generators.uplinks(4) + generators.bonds(48) + generators.svis(32)),
+        ("bridge", generators.bridge(32)),
+        ("mlag", generators.mlag()),
+        ("router", generators.router()),
+        ("evpn", generators.evpn()),
+        ("vrf", generators.vrfs(4)),
+    ]
+    for name, data in steps:
+        run_module(name, {"state": "merged", "revid": revid, "data": data}, plugin)
+    return run_module("config", {"state": "apply", "revid": revid, "force": True, "wait": wait}, plugin)
+
+
+def gather_all(plugin, wait):
+    """Gather every resource, then the whole configuration"""
+    for name in ("system", "interface", "bridge", "mlag", "router", "evpn", "vrf", "acl", "vxlan", "qos", "service"):
+        run_module(name, {"state": "gathered"}, plugin)
+    return run_module("api", {"operation": "get", "path": "/"}, plugin)
+
+
+def bridge_4k(plugin, wait):
+    """A 4,000-VLAN EVPN bridge pushed and applied in one task"""
+    return run_module("bridge", {"state": "merged", "force": True, "wait": wait, "data": generators.bridge(4000)}, plugin)
+
+
+def bridge_4k_ranges(plugin, wait):
+    """The bridge-4k VLANs sent as VLAN ranges with compress_vlans"""
+    args = {"state": "merged", "force": True, "wait": wait, "compress_vlans": True, "data": generators.bridge(4000)}
+    return run_module("bridge", args, plugin)
+
+
+def acl_5k(plugin, wait):
+    """A 5,000-rule ACL pushed and applied in one task"""
+    return run_module("acl", {"state": "merged", "force": True, "wait": wait, "data": generators.acl(5000)}, plugin)
+
+
+def acl_3k(plugin, wait):
+    """A 3,000-rule ACL pushed and applied in one task"""
+    return run_module("acl", {"state": "merged", "force": True, "wait": wait, "data": generators.acl(3000)}, plugin)
+
+
+def acl_edit(plugin, wait):
+    """One rule of the 3,000-rule ACL changed with incremental"""
+    data = generators.acl(3000)
+    data[0]["rule"][1500]["match"]["ip"]["source_ip"] = "10.255.0.0/16"
+    return run_module("acl", {"state": "merged", "force": True, "wait": wait, "incremental": True, "data": data}, plugin)
+
+
+def vrf_routes_50k(plugin, wait):
+    """50,000 static routes streamed into a VRF from a CSV routes_file"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "routes.csv")
+        generators.routes_csv(filename, 50000)
+        args = {"state": "merged", "force": True, "wait": wait, "vrfid": "TENANT1", "routes_file": filename}
+        return run_module("vrf", args, plugin)
+
+
+WORKLOADS = {
+    "full-leaf": full_leaf,
+    "gather-all": gather_all,
+    "bridge-4k": bridge_4k,
+    "bridge-4k-ranges": bridge_4k_ranges,
+    "acl-5k": acl_5k,
+    "acl-edit": acl_edit,
+    "vrf-routes-50k": vrf_routes_50k,
+}
+
+# configuration a workload expects to find applied
+PRIMERS = {
+    "gather-all": full_leaf,
+    "acl-edit": acl_3k,
+}
+
+
+def run_workload(name, hosts, latency, apply_time, wait, memory):
+    """Run a workload against each host in turn and return per-host measurements"""
+    measurements = []
+    for index in range(hosts):
+        with MockNvued(latency=latency, apply_time=apply_time, hostname="leaf%02d" % (index + 1)) as server:
+            plugin = load_httpapi(UrllibConnection(server.port))
+            if name in PRIMERS:
+                PRIMERS[name](plugin, wait)
+            server.state.reset_counters()
+            result, elapsed, _peak = measure(lambda: WORKLOADS[name](plugin, wait), memory=False)
+            requests = sum(server.state.requests.values())
+            bytes_in = server.state.bytes_in
+            bytes_out = server.state.bytes_out
+            peak = measure(lambda: WORKLOADS[name](plugin, wait))[2] if memory else None
+        if result.get("failed"):
+            raise RuntimeError("%s failed: %s" % (name, result.get("msg")))
+        measurements.append({
+            "requests": requests,
+            "bytes_sent": bytes_in,
+            "bytes_received": bytes_out,
+            "seconds": elapsed,
+            "peak_bytes": peak,
+        })
+    return measurements
+
+
+def summarize(name, measurements):
+    hosts = len(measurements)
+    peaks = [m["peak_bytes"] for m in measurements if m["peak_bytes"] is not None]
+    return {
+        "workload": name,
+        "hosts": hosts,
+        "requests_per_host": sum(m["requests"] for m in measurements) / hosts,
+        "bytes_sent_per_host": sum(m["bytes_sent"] for m in measurements) / hosts,
+        "seconds_per_host": sum(m["seconds"] for m in measurements) / hosts,
+        "wall_seconds": sum(m["seconds"] for m in measurements),
+        "peak_mib": max(peaks) / 2 ** 20 if peaks else None,
+    }
+
+
+def print_table(summaries):
+    header = "%-16s %6s %14s %16s %12s %10s" % ("workload", "hosts", "requests/host", "KiB sent/host", "s/host", "peak MiB")
+    print(header)
+    print("-" * len(header))
+    for summary in summaries:
+        print("%-16s %6d %14.1f %16.1f %12.3f %10s" % (
+            summary["workload"],
+            summary["hosts"],
+            summary["requests_per_host"],
+            summary["bytes_sent_per_host"] / 1024,
+            summary["seconds_per_host"],
+            "%.1f" % summary["peak_mib"] if summary["peak_mib"] is not None else "-",
+        ))
+
+
+def compare(summaries, baseline, tolerance):
+    """Return the regressions of summaries against a saved baseline"""
+    previous = dict((summary["workload"], summary) for summary in baseline)
+    regressions = []
+    for summary in summaries:
+        before = previous.get(summary["workload"])
+        if before is None:
+            continue
+        if summary["requests_per_host"] > before["requests_per_host"]:
+            regressions.append("%s: requests/host %.1f -> %.1f" % (
+                summary["workload"], before["requests_per_host"], summary["requests_per_host"]))
+        if summary["seconds_per_host"] > before["seconds_per_host"] * (1 + tolerance):
+            regressions.append("%s: s/host %.3f -> %.3f" % (
+                summary["workload"], before["seconds_per_host"], summary["seconds_per_host"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workloads", nargs="*", metavar="workload",
+                        help="workloads to run, from %s (default: all)" % ", ".join(WORKLOADS))
+    parser.add_argument("--hosts", type=int, default=1, help="mock switches per workload")
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds added to every request")
+    parser.add_argument("--apply-time", type=float, default=0.0, help="seconds an apply takes on the mock")
+    parser.add_argument("--wait", type=int, default=30, help="wait passed to applying tasks")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="fail on regressions against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown when comparing")
+    args = parser.parse_args()
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error("unknown workloads: %s" % ", ".join(sorted(unknown)))
+
+    summaries = [
+        summarize(name, run_workload(name, args.hosts, args.latency, args.apply_time, args.wait, args.memory))
+        for name in (args.workloads or WORKLOADS)
+    ]
+    print_table(summaries)
+
+    if args.save:
+        with open(args.save, "w") as results:
+            json.dump(summaries, results, indent=2)
+    if args.compare:
+        with open(args.compare) as results:
+            regressions = compare(summaries, json.load(results), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION %s" % regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
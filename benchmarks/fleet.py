@@ -0,0 +1,200 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Fleet-scale load simulator: starts one mock nvued per virtual switch on
+localhost, writes a matching inventory and runs a real playbook against
+it with ansible-playbook, once per fork count. For each run it reports
+completion time, controller CPU time, the peak number of persistent
+connection (ansible-connection) processes and the peak resident memory
+of the controller's Ansible processes.
+
+    make bench-fleet BENCH_ARGS="--switches 200 --forks 10,50,100"
+
+Process accounting reads /proc, so this runs on Linux only.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_nvued import MockNvued  # noqa: E402
+
+COLLECTIONS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+DEFAULT_PLAYBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "playbooks", "fleet-push.yml")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# older ansible-core runs persistent connections as ansible-connection,
+# newer releases as ansible_connection_cli_stub.py
+PERSISTENT_COMMAND = re.compile(r"ansible-connection|ansible_connection_cli_stub")
+
+
+def write_inventory(directory, servers):
+    path = os.path.join(directory, "hosts")
+    with open(path, "w") as inventory:
+        inventory.write("[switches]\n")
+        for index, server in enumerate(servers):
+            # ansible_port keeps the persistent connection sockets of the switches apart
+            inventory.write("sw%04d ansible_host=127.0.0.1 ansible_port=%d ansible_httpapi_port=%d\n" % (
+                index + 1, server.port, server.port))
+        inventory.write(
+            "\n[switches:vars]\n"
+            "ansible_connection=ansible.netcommon.httpapi\n"
+            "ansible_network_os=nvidia.nvue.httpapi\n"
+            "ansible_httpapi_use_ssl=false\n"
+            "ansible_user=cumulus\n"
+            "ansible_password=CumulusLinux!\n"
+        )
+    return path
+
+
+def read_proc(pid):
+    """Return (ppid, cpu seconds, rss bytes, command line) of a process, or None"""
+    try:
+        with open("/proc/%d/stat" % pid) as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/%d/cmdline" % pid, "rb") as cmdline:
+            command = cmdline.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except (IOError, OSError, IndexError):
+        return None
+    # fields start at "state", the third field of /proc/<pid>/stat
+    ppid = int(fields[1])
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = int(fields[21]) * PAGE_SIZE
+    return ppid, cpu, rss, command
+
+
+class Sampler(threading.Thread):
+    """
+    Periodically samples the ansible-playbook process tree and every
+    persistent connection process. Persistent connections daemonize out
+    of the ansible-playbook tree, so they are matched by command line.
+    """
+
+    def __init__(self, root_pid, interval=0.2):
+        threading.Thread.__init__(self, daemon=True)
+        self.root_pid = root_pid
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.connection_cpu = {}
+        self.peak_connections = 0
+        self.peak_rss = 0
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def sample(self):
+        processes = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                info = read_proc(int(entry))
+                if info:
+                    processes[int(entry)] = info
+        tree = set([self.root_pid])
+        changed = True
+        while changed:
+            children = set(pid for pid, info in processes.items() if info[0] in tree) - tree
+            changed = bool(children)
+            tree |= children
+        matching = set(pid for pid, info in processes.items() if PERSISTENT_COMMAND.search(info[3]))
+        # every task starts a short-lived stub under its worker; only the stubs
+        # that daemonized out of the playbook's process tree hold connections
+        connections = matching - tree
+        for pid in matching:
+            self.connection_cpu[pid] = processes[pid][1]
+        self.peak_connections = max(self.peak_connections, len(connections))
+        rss = sum(processes[pid][2] for pid in tree | matching if pid in processes)
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_playbook(playbook, inventory, forks, extra_args):
+    env = dict(
+        os.environ,
+        ANSIBLE_COLLECTIONS_PATH=COLLECTIONS_ROOT,
+        ANSIBLE_HOST_KEY_CHECKING="False",
+        ANSIBLE_RETRY_FILES_ENABLED="False",
+        ANSIBLE_PERSISTENT_CONNECT_TIMEOUT="30",
+        ANSIBLE_DEPRECATION_WARNINGS="False",
+    )
+    command = ["ansible-playbook", "-i", inventory, "-f", str(forks), playbook] + extra_args
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    sampler = Sampler(process.pid)
+    sampler.start()
+    output = process.communicate()[0]
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    failed = len([count for count in re.findall(r"(?:failed|unreachable)=(\d+)", output) if int(count)])
+    return {
+        "forks": forks,
+        "seconds": elapsed,
+        "cpu_seconds": cpu + sum(sampler.connection_cpu.values()),
+        "peak_connections": sampler.peak_connections,
+        "peak_rss_mib": sampler.peak_rss / 2 ** 20,
+        "failed_hosts": failed,
+        "returncode": process.returncode,
+        "output": output,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--switches", type=int, default=50, help="number of mock switches")
+    parser.add_argument("--forks", default="5,25,50", help="comma separated fork counts to run with")
+    parser.add_argument("--playbook", default=DEFAULT_PLAYBOOK, help="playbook run against the switches group")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to every request")
+    parser.add_argument("--apply-time", type=float, default=1.0, help="seconds an apply takes on the mock")
+    parser.add_argument("--verbose", action="store_true", help="print ansible-playbook output")
+    args, extra_args = parser.parse_known_args()
+
+    servers = [
+        MockNvued(latency=args.latency, apply_time=args.apply_time, hostname="sw%04d" % (index + 1)).start()
+        for index in range(args.switches)
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            inventory = write_inventory(directory, servers)
+            header = "%6s %9s %10s %12s %14s %14s %8s" % (
+                "forks", "switches", "seconds", "CPU seconds", "persistent", "peak RSS MiB", "failed")
+            print(header)
+            print("-" * len(header))
+            for forks in [int(value) for value in args.forks.split(",")]:
+                result = run_playbook(args.playbook, inventory, forks, extra_args)
+                if args.verbose or result["returncode"] not in (0, 2):
+                    print(result["output"])
+                print("%6d %9d %10.1f %12.1f %14d %14.1f %8d" % (
+                    forks, args.switches, result["seconds"], result["cpu_seconds"],
+                    result["peak_connections"], result["peak_rss_mib"], result["failed_hosts"]))
+                requests = sum(sum(server.state.requests.values()) for server in servers)
+                print("%6s %d requests served, %.1f per switch" % ("", requests, requests / float(args.switches)))
+                for server in servers:
+                    server.state.reset_counters()
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Generators for module "data" payloads of a given size, shared by the
+end-to-end and micro benchmarks. Every generator returns the list (or
+dict) that a playbook would pass as the module's data parameter.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+def interfaces(count, bridge="br_default"):
+    """Switch ports with an address, MTU and bridge membership"""
+    return [
+        {
+            "id": "swp%d" % (index + 1),
+            "type": "swp",
+            "description": "server port %d" % (index + 1),
+            "link": {"mtu": 9216, "state": [{"id": "up"}]},
+            "bridge": {"domain": [{"id": bridge, "untagged": 1, "vlan": [{"id": "10"}, {"id": "20"}]}]},
+        }
+        for index in range(count)
+    ]
+
+
+def uplinks(count, first=49):
+    """Routed uplinks with PIM and a routed address"""
+    return [
+        {
+            "id": "swp%d" % (first + index),
+            "type": "swp",
+            "ip": {"address": [{"id": "10.0.%d.%d/31" % (index // 128, (index % 128) * 2)}]},
+            "router": {"pim": {"enable": "on"}},
+        }
+        for index in range(count)
+    ]
+
+
+def bonds(count, bridge="br_default"):
+    """MLAG bonds, one member each"""
+    return [
+        {
+            "id": "bond%d" % (index + 1),
+            "type": "bond",
+            "bond": {
+                "member": [{"id": "swp%d" % (index + 1)}],
+                "mlag": {"enable": "on", "id": index + 1},
+            },
+            "bridge": {"domain": [{"id": bridge}]},
+        }
+        for index in range(count)
+    ]
+
+
+def svis(count, first_vlan=10):
+    """VLAN interfaces with a VRR address"""
+    return [
+        {
+            "id": "vlan%d" % (first_vlan + index),
+            "type": "svi",
+            "vlan": first_vlan + index,
+            "ip": {
+                "address": [{"id": "10.%d.%d.2/24" % ((first_vlan + index) // 256, (first_vlan + index) % 256)}],
+                "vrr": {"enable": "on", "address": [{"id": "10.%d.%d.1/24" % ((first_vlan + index) // 256, (first_vlan + index) % 256)}]},
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def bridge(vlans, first_vlan=10, vni_base=10000, domain="br_default"):
+    """A VLAN-aware bridge domain with one VNI per VLAN"""
+    return [
+        {
+            "id": domain,
+            "type": "vlan-aware",
+            "untagged": 1,
+            "vlan": [
+                {"id": str(first_vlan + index), "vni": [{"id": str(vni_base + first_vlan + index)}]}
+                for index in range(vlans)
+            ],
+        }
+    ]
+
+
+def acl(rules, name="acl_bench"):
+    """An IPv4 ACL of distinct permit rules"""
+    return [
+        {
+            "id": name,
+            "type": "ipv4",
+            "rule": [
+                {
+                    "id": str((index + 1) * 10),
+                    "match": {
+                        "ip": {
+                            "source_ip": "10.%d.%d.0/24" % (index // 256 % 256, index % 256),
+                            "dest_ip": "192.168.%d.0/24" % (index % 256),
+                            "protocol": "tcp",
+                            "tcp": {"dest_port": [{"id": str(1024 + index % 60000)}]},
+                        }
+                    },
+                    "action": {"permit": {}},
+                }
+                for index in range(rules)
+            ],
+        }
+    ]
+
+
+def redundant_acl(rules, name="acl_redundant"):
+    """
+    An IPv4 ACL as generated ACLs often are: in every ten rules, one is an
+    exact duplicate, one is shadowed by an earlier, wider rule, and two
+    adjacent /25 prefixes can be merged into one /24
+    """
+    entries = []
+    for index in range(rules):
+        block = index // 10
+        source = "10.%d.%d.0/24" % (block // 256 % 256, block % 256)
+        match = {
+            "source_ip": source,
+            "dest_ip": "192.168.%d.0/24" % (index % 256),
+            "protocol": "tcp",
+            "tcp": {"dest_port": [{"id": str(1024 + index % 60000)}]},
+        }
+        kind = index % 10
+        if kind == 5:
+            match = dict(entries[-1]["match"]["ip"])
+        elif kind == 6:
+            match = dict(entries[-2]["match"]["ip"], source_ip=source.replace(".0/24", ".64/26"))
+        elif kind in (7, 8):
+            match["dest_ip"] = "172.16.%d.0/24" % (block % 256)
+            match["tcp"] = {"dest_port": [{"id": "443"}]}
+            match["source_ip"] = source.replace(".0/24", ".0/25" if kind == 7 else ".128/25")
+        entries.append({"id": str((index + 1) * 10), "match": {"ip": match}, "action": {"permit": {}}})
+    return [{"id": name, "type": "ipv4", "rule": entries}]
+
+
+def vrfs(count, neighbors=2):
+    """Tenant VRFs with an L3 VNI and BGP towards the fabric"""
+    return [
+        {
+            "id": "tenant%d" % (index + 1),
+            "evpn": {"enable": "on", "vni": [{"id": str(50000 + index)}]},
+            "router": {
+                "bgp": {
+                    "enable": "on",
+                    "autonomous_system": 65000,
+                    "router_id": "10.10.10.1",
+                    "address_family": {
+                        "ipv4_unicast": {
+                            "enable": "on",
+                            "redistribute": {"connected": {"enable": "on"}},
+                            "route_export": {"to_evpn": {"enable": "on"}},
+                        }
+                    },
+                    "neighbor": [
+                        {"id": "swp%d" % (51 + peer), "type": "unnumbered", "remote_as": "external"}
+                        for peer in range(neighbors)
+                    ],
+                },
+                "static": [
+                    {"id": "172.16.%d.0/24" % index, "address_family": "ipv4-unicast", "via": [{"id": "blackhole", "type": "blackhole"}]}
+                ],
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def mlag(peer_ip="linklocal"):
+    return {
+        "enable": "on",
+        "init_delay": 100,
+        "mac_address": "44:38:39:BE:EF:AA",
+        "backup": [{"id": "10.10.10.2"}],
+        "peer_ip": peer_ip,
+        "priority": 1000,
+    }
+
+
+def system(hostname="leaf01"):
+    return {
+        "hostname": hostname,
+        "login_message": {"pre_login": "benchmark switch", "post_login": "logged in to %s" % hostname},
+        "timezone": "Etc/UTC",
+    }
+
+
+def router(asn=65101, router_id="10.10.10.1"):
+    return {
+        "bgp": {"enable": "on", "autonomous_system": asn, "router_id": router_id},
+        "vrr": {"enable": "on"},
+    }
+
+
+def evpn():
+    return {"enable": "on", "route_advertise": {"svi_ip": "off"}}
+
+
+def routes_csv(filename, count):
+    """A routes_file for the vrf module with count /24 routes spread over 200 next hops"""
+    with open(filename, "w") as handle:
+        handle.write("prefix,via\n")
+        for index in range(count):
+            handle.write("10.%d.%d.0/24,192.0.2.%d\n" % (index // 256 % 256, index % 256, 1 + index % 200))
@@ -0,0 +1,147 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Glue that lets the benchmarks drive the real collection code in-process:
+- load the nvidia.nvue.httpapi plugin through Ansible's plugin loader,
+- give it a plain urllib transport in place of the persistent
+  ansible.netcommon.httpapi connection,
+- run resource modules' main() against that plugin, with arguments and
+  results passed through JSON just like the persistent connection does.
+
+The collection must be importable as ansible_collections.nvidia.nvue,
+which is what "make bench" arranges.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from unittest import mock
+
+COLLECTIONS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+if COLLECTIONS_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTIONS_ROOT)
+
+from ansible.module_utils import basic  # noqa: E402
+from ansible.module_utils.common.text.converters import to_bytes  # noqa: E402
+from ansible.plugins.loader import httpapi_loader, init_plugin_loader  # noqa: E402
+
+init_plugin_loader([COLLECTIONS_ROOT])
+
+MODULES = "ansible_collections.nvidia.nvue.plugins.modules."
+
+
+class UrllibConnection:
+    """
+    Minimal replacement for the persistent httpapi connection: send()
+    returns the (response, buffer) pair the plugin expects, and HTTP
+    errors are returned rather than raised, as netcommon does once the
+    plugin's handle_httperror has declined to retry.
+    """
+
+    def __init__(self, port, host="127.0.0.1", inventory_hostname=None):
+        self.base = "http://%s:%d" % (host, port)
+        self.port = port
+        self.inventory_hostname = inventory_hostname or "%s:%d" % (host, port)
+
+    def get_option(self, option):
+        if option == "host":
+            return self.inventory_hostname
+        if option == "port":
+            return self.port
+        if option == "use_ssl":
+            return False
+        raise KeyError(option)
+
+    def send(self, path, data, headers=None, method="GET"):
+        if isinstance(data, dict):
+            data = json.dumps(data) if data else ""
+        body = to_bytes(data) if data else None
+        request = urllib.request.Request(self.base + path, data=body, headers=headers or {}, method=method)
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as exc:
+            return exc, io.BytesIO(exc.read())
+        return response, io.BytesIO(response.read())
+
+
+def load_httpapi(connection, **options):
+    """Load nvidia.nvue.httpapi around a connection and set its options"""
+    plugin = httpapi_loader.get("nvidia.nvue.httpapi", connection)
+    plugin.set_options(direct=options)
+    return plugin
+
+
+class JsonRpcConnection:
+    """
+    Stands in for ansible.module_utils.connection.Connection inside a
+    module: calls go straight to the plugin, but arguments and results
+    still make the JSON round trip of the real JSON-RPC socket.
+    """
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def __call__(self, socket_path):
+        return self
+
+    def send_request(self, *args, **kwargs):
+        args, kwargs = json.loads(json.dumps([args, kwargs]))
+        return json.loads(json.dumps(self.plugin.send_request(*args, **kwargs)))
+
+
+def run_module(name, params, plugin=None, check_mode=False):
+    """Run a collection module's main() and return its result dict"""
+    module = importlib.import_module(MODULES + name)
+    args = dict(
+        params,
+        _ansible_socket="benchmark",
+        _ansible_check_mode=check_mode,
+        _ansible_remote_tmp=tempfile.gettempdir(),
+        _ansible_keep_remote_files=False,
+    )
+    basic._ANSIBLE_ARGS = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+    if hasattr(basic, "_ANSIBLE_PROFILE"):
+        # ansible-core 2.19+ also needs the serialization profile
+        basic._ANSIBLE_PROFILE = "legacy"
+    output = io.StringIO()
+    patcher = mock.patch.object(module, "Connection", JsonRpcConnection(plugin)) if plugin else contextlib.nullcontext()
+    with patcher, contextlib.redirect_stdout(output):
+        try:
+            module.main()
+        except SystemExit:
+            pass
+    return json.loads(output.getvalue())
+
+
+def measure(function, memory=True):
+    """
+    Time a call, then repeat it under tracemalloc to find its peak
+    Python memory, so tracing overhead does not distort the timing.
+    Returns (result, seconds, peak_bytes).
+    """
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak
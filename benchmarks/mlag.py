@@ -0,0 +1,105 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+MLAG pair apply benchmark: pairs of mock switches, each pair a mock MLAG
+pair, get a change of their MLAG MAC address staged on both peers, then
+applied either one peer after the other, as separate waves or plays
+would, or together as nvidia.nvue.mlag_apply does.
+
+It prints, for each mode, the inconsistent window (from the start of
+the first apply of a pair to the end of its last one, while only one
+peer has the change) and the convergence time (from the start of the
+first apply until MLAG sees the peer again on both), worst pair first.
+
+    make bench-mlag BENCH_ARGS="--pairs 4 --apply-time 2 --converge-time 3"
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import functools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# sets up sys.path and the plugin loader for the collection
+import harness  # noqa: E402,F401
+from mock_nvued import MockNvued  # noqa: E402
+from ansible_collections.nvidia.nvue.plugins.action.mlag_apply import apply_pair, peer_alive  # noqa: E402
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import Endpoint, poll, wait_for_revisions  # noqa: E402
+
+
+def stage(endpoint, mac):
+    revid = list(endpoint.request("revision", {}, "POST"))[0]
+    endpoint.request("mlag?rev=" + revid, {"enable": "on", "mac-address": mac}, "PATCH")
+    return revid
+
+
+def run(pairs, apply_time, converge_time, paired, interval):
+    servers = []
+    for index in range(pairs):
+        one = MockNvued(apply_time=apply_time, converge_time=converge_time, hostname="leaf%02d" % (2 * index + 1)).start()
+        other = MockNvued(apply_time=apply_time, converge_time=converge_time, hostname="leaf%02d" % (2 * index + 2)).start()
+        servers.append(one.pair(other))
+        servers.append(other)
+    try:
+        endpoints = dict((server.state.hostname, Endpoint("127.0.0.1", server.port, use_ssl=False)) for server in servers)
+        hosts = sorted(endpoints)
+        couples = [hosts[index:index + 2] for index in range(0, len(hosts), 2)]
+        for mac in ("44:38:39:be:ef:aa", "44:38:39:be:ef:bb"):
+            revids = dict((host, stage(endpoints[host], mac)) for host in hosts)
+            start = time.time()
+            starts = {}
+            if paired:
+                applied = {}
+                for couple in couples:
+                    applied.update(apply_pair(couple, endpoints, revids, True))
+                starts = dict((host, found["started"]) for host, (found, _error) in applied.items())
+                waited = wait_for_revisions(
+                    dict((host, (endpoints[host], revids[host], starts[host])) for host in hosts), 60, interval, interval)
+            else:
+                # one peer of every pair, then the other, as in two waves
+                waited = {}
+                for side in (0, 1):
+                    wave = [couple[side] for couple in couples]
+                    for host in wave:
+                        starts[host] = time.time()
+                        endpoints[host].apply(revids[host], True)
+                    waited.update(wait_for_revisions(
+                        dict((host, (endpoints[host], revids[host], starts[host])) for host in wave), 60, interval, interval))
+            ends = dict((host, starts[host] + waited[host]["duration"]) for host in hosts)
+            polled = poll(
+                dict((host, (functools.partial(endpoints[host].operational, "mlag"), peer_alive, start)) for host in hosts),
+                60, interval, interval)
+        windows = [max(ends[host] for host in couple) - min(starts[host] for host in couple) for couple in couples]
+        converged = [max(polled[host]["duration"] for host in couple) for couple in couples]
+        return max(windows), max(converged)
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=4, help="MLAG pairs")
+    parser.add_argument("--apply-time", type=float, default=2.0, help="seconds an apply takes on the mock")
+    parser.add_argument("--converge-time", type=float, default=3.0, help="seconds MLAG takes to see the peer after an apply")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between polls")
+    args = parser.parse_args()
+
+    header = "%-12s %20s %16s" % ("mode", "inconsistent window", "converged after")
+    print(header)
+    print("-" * len(header))
+    for paired in (False, True):
+        window, converged = run(args.pairs, args.apply_time, args.converge_time, paired, args.interval)
+        print("%-12s %19.2fs %15.2fs" % ("paired" if paired else "independent", window, converged))
+
+
+if __name__ == "__main__":
+    main()
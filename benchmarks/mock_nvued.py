@@ -0,0 +1,380 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+A local stand-in for nvued, the NVUE REST server, used by the benchmarks.
+
+It implements the parts of the revision lifecycle the collection relies on:
+- POST /nvue_v1/revision creates a pending revision
+- PATCH /nvue_v1/<path>?rev=<revision> merges data into a revision
+- DELETE /nvue_v1/<path>?rev=<revision> removes data from a revision
+- PATCH /nvue_v1/revision/<revision> with {"state": "apply"} starts an apply,
+  which moves to "applied" once the configured apply time has passed;
+  applying an applied revision again rolls the configuration back to it;
+  applies run one at a time, so an apply started while another is in
+  flight waits for it
+- GET /nvue_v1/revision[/<revision>] returns revision states
+- DELETE /nvue_v1/revision/<revision> drops a revision
+- GET /nvue_v1/<path>?rev=<applied|operational|startup|revision>[&filled=]
+  returns configuration
+- with a convergence time, GET /nvue_v1/<path>?rev=operational adds
+  operational state: interface link oper-status is up unless an apply
+  is in flight, BGP neighbor state turns established once the
+  convergence time has passed since the last apply, and, with an MLAG
+  peer set, mlag peer-alive turns true once both switches have MLAG
+  enabled with the same mac-address and the convergence time has passed
+  on both
+
+Every request is delayed by a configurable latency and counted, so a
+benchmark can report how many requests and bytes a workload cost.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import collections
+import copy
+import itertools
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "/nvue_v1"
+
+
+class NvuedState:
+    """Configuration and revisions of a single mock switch"""
+
+    def __init__(self, apply_time=0.0, hostname="cumulus", converge_time=None):
+        self.apply_time = apply_time
+        self.hostname = hostname
+        # without a convergence time, operational reads return the applied configuration
+        self.converge_time = converge_time
+        # the NvuedState of the MLAG peer
+        self.peer = None
+        self.applied_at = 0.0
+        self.lock = threading.Lock()
+        self.applied = {}
+        self.revisions = {}
+        self.sequence = itertools.count(1)
+        # nvued applies one revision at a time
+        self.applying_until = 0.0
+        self.requests = collections.Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def create_revision(self):
+        with self.lock:
+            revid = "changeset/%s/%s_%05d" % (
+                self.hostname,
+                time.strftime("%Y-%m-%d_%H.%M.%S"),
+                next(self.sequence),
+            )
+            self.revisions[revid] = {
+                "state": "pending",
+                "base": self.applied,
+                "operations": [],
+                "apply_at": None,
+            }
+            return {revid: self.describe(revid)}
+
+    def describe(self, revid):
+        revision = self.revisions[revid]
+        return {"state": revision["state"], "transition": {"issue": {}, "progress": ""}}
+
+    def refresh(self):
+        """Complete the applies that are due, in the order they were started"""
+        now = time.time()
+        due = sorted(
+            (revision["apply_at"], known) for known, revision in self.revisions.items()
+            if revision["state"] == "apply" and now >= revision["apply_at"])
+        for apply_at, known in due:
+            self.applied = self.materialize(known)
+            self.revisions[known]["state"] = "applied"
+            self.applied_at = apply_at
+
+    def materialize(self, revid):
+        revision = self.revisions[revid]
+        config = copy.deepcopy(revision["base"])
+        for method, segments, data in revision["operations"]:
+            if method == "PATCH":
+                merge(config, segments, data)
+            else:
+                remove(config, segments)
+        return config
+
+    def revision(self, revid):
+        with self.lock:
+            if revid is None:
+                self.refresh()
+                return dict((known, self.describe(known)) for known in self.revisions)
+            if revid not in self.revisions:
+                return None
+            self.refresh()
+            return self.describe(revid)
+
+    def apply(self, revid, data):
+        with self.lock:
+            if revid not in self.revisions:
+                return None
+            revision = self.revisions[revid]
+            # applying an applied revision again rolls back to it
+            if data.get("state") == "apply" and revision["state"] in ("pending", "applied"):
+                revision["state"] = "apply"
+                revision["apply_at"] = max(time.time(), self.applying_until) + self.apply_time
+                self.applying_until = revision["apply_at"]
+                self.refresh()
+            return self.describe(revid)
+
+    def delete_revision(self, revid):
+        with self.lock:
+            return self.revisions.pop(revid, None) is not None
+
+    def change(self, method, segments, revid, data):
+        with self.lock:
+            if revid not in self.revisions or self.revisions[revid]["state"] != "pending":
+                return None
+            self.revisions[revid]["operations"].append((method, segments, data))
+            return data if method == "PATCH" else {}
+
+    def applying(self):
+        return any(revision["state"] == "apply" for revision in self.revisions.values())
+
+    def mlag(self):
+        """The applied MLAG configuration, when it settles, and whether an apply is in flight"""
+        with self.lock:
+            self.refresh()
+            return copy.deepcopy(self.applied.get("mlag") or {}), self.applied_at + self.converge_time, self.applying()
+
+    def read(self, segments, rev):
+        # the peer is read first, so that two peers never wait for each other's lock
+        peer = self.peer.mlag() if self.peer is not None and self.converge_time is not None and rev == "operational" else None
+        with self.lock:
+            self.refresh()
+            if rev == "operational" and self.converge_time is not None:
+                config = self.operational(peer)
+            elif rev in (None, "applied", "operational", "startup"):
+                config = self.applied
+            elif rev in self.revisions:
+                config = self.materialize(rev)
+            else:
+                return None
+            for segment in segments:
+                if not isinstance(config, dict) or segment not in config:
+                    return {}
+                config = config[segment]
+            return config
+
+    def operational(self, peer):
+        """
+        The applied configuration with the state of interfaces, up once
+        applied, and of BGP neighbors and MLAG, up once the convergence
+        time has passed
+        """
+        config = copy.deepcopy(self.applied)
+        now = time.time()
+        applying = self.applying()
+        for interface in (config.get("interface") or {}).values():
+            if isinstance(interface, dict):
+                interface.setdefault("link", {})["oper-status"] = "down" if applying else "up"
+        established = not applying and now >= self.applied_at + self.converge_time
+        for vrf in (config.get("vrf") or {}).values():
+            neighbors = ((((vrf or {}).get("router") or {}).get("bgp") or {}).get("neighbor") or {})
+            for neighbor in neighbors.values():
+                if isinstance(neighbor, dict):
+                    neighbor["state"] = "established" if established else "idle"
+        if peer is not None:
+            config["mlag"] = self.mlag_state(peer, established)
+        return config
+
+    def mlag_state(self, peer, established):
+        mlag = copy.deepcopy(self.applied.get("mlag") or {})
+        theirs, settled_at, applying = peer
+        alive = (
+            established and mlag.get("enable") == "on" and theirs.get("enable") == "on"
+            and mlag.get("mac-address") == theirs.get("mac-address")
+            and not applying and time.time() >= settled_at)
+        primary = (mlag.get("priority", 32768), self.hostname) <= (theirs.get("priority", 32768), self.peer.hostname)
+        mlag.update({
+            "peer-alive": alive,
+            "backup-active": alive,
+            "local-role": ("primary" if primary else "secondary") if alive else "primary",
+            "peer-role": ("secondary" if primary else "primary") if alive else "",
+        })
+        return mlag
+
+
+def merge(config, segments, data):
+    for segment in segments:
+        config = config.setdefault(segment, {})
+    merge_dict(config, data)
+
+
+def merge_dict(target, data):
+    for key, value in data.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_dict(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def remove(config, segments):
+    for segment in segments[:-1]:
+        config = config.get(segment)
+        if not isinstance(config, dict):
+            return
+    if segments:
+        config.pop(segments[-1], None)
+    else:
+        config.clear()
+
+
+class NvuedHandler(BaseHTTPRequestHandler):
+    server_version = "mock-nvued/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        state = self.server.state
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with state.lock:
+            state.requests[method] += 1
+            state.bytes_in += len(body)
+
+        parsed = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        if not parsed.path.startswith(PREFIX):
+            return self.reply(404, {"title": "Not Found", "detail": parsed.path})
+        segments = [
+            urllib.parse.unquote(segment)
+            for segment in parsed.path[len(PREFIX):].split("/")
+            if segment
+        ]
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return self.reply(400, {"title": "Bad Request", "detail": "invalid JSON"})
+
+        if segments[:1] == ["revision"]:
+            revid = "/".join(segments[1:]) or None
+            if method == "POST" and revid is None:
+                return self.reply(200, state.create_revision())
+            if method == "GET":
+                result = state.revision(revid)
+            elif method == "PATCH" and revid:
+                result = state.apply(revid, data)
+            elif method == "DELETE" and revid:
+                result = {} if state.delete_revision(revid) else None
+            else:
+                return self.reply(405, {"title": "Method Not Allowed"})
+        elif method == "GET":
+            result = state.read(segments, query.get("rev"))
+        elif method in ("PATCH", "DELETE"):
+            result = state.change(method, segments, query.get("rev"), data)
+        else:
+            return self.reply(405, {"title": "Method Not Allowed"})
+
+        if result is None:
+            return self.reply(404, {"title": "Not Found", "detail": self.path})
+        return self.reply(200, result)
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        with self.server.state.lock:
+            self.server.state.bytes_out += len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockNvued(ThreadingHTTPServer):
+    """
+    A mock nvued listening on localhost, served from a daemon thread.
+    Use it as a context manager, or call start() and stop().
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, port=0, latency=0.0, apply_time=0.0, hostname="cumulus", converge_time=None):
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", port), NvuedHandler)
+        self.latency = latency
+        self.state = NvuedState(apply_time=apply_time, hostname=hostname, converge_time=converge_time)
+        self.thread = None
+
+    def pair(self, peer):
+        """Make this mock and peer the two switches of an MLAG pair"""
+        self.state.peer = peer.state
+        peer.state.peer = self.state
+        return self
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a mock NVUE REST server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--apply-time", type=float, default=0.0, help="seconds an apply takes")
+    parser.add_argument("--converge-time", type=float, help="seconds BGP takes to come back after an apply")
+    args = parser.parse_args()
+
+    server = MockNvued(port=args.port, latency=args.latency, apply_time=args.apply_time, converge_time=args.converge_time)
+    print("mock nvued listening on http://127.0.0.1:%d%s" % (server.port, PREFIX))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Concurrent writers benchmark: several writers, each with a connection
+of its own as concurrent plays would have, change one mock switch at
+the same time without a revid, so every change is a revision of its
+own that is applied. The mock applies one revision at a time.
+
+It runs once without and once with the apply queue, and prints the
+time taken, the changes per second, the applies the switch ran and the
+changes lost because a revision was applied over another.
+
+    make bench-writers BENCH_ARGS="--writers 1,4,16 --changes 5 --apply-time 0.5"
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import UrllibConnection, load_httpapi  # noqa: E402
+from mock_nvued import MockNvued  # noqa: E402
+
+
+def writer(plugin, index, changes, errors):
+    for change in range(changes):
+        try:
+            plugin.send_request(
+                {"swp%d" % (index + 1): {"description": "writer %d change %d" % (index, change)}},
+                "interface", "set", force=True, wait=600)
+        except Exception as exc:
+            errors.append(str(exc))
+
+
+def run(writers, changes, latency, apply_time, queue):
+    with MockNvued(latency=latency, apply_time=apply_time) as server:
+        options = {"apply_queue": queue} if queue else {}
+        errors = []
+        # plugins are loaded up front, as loading is not thread safe
+        plugins = [load_httpapi(UrllibConnection(server.port), **options) for index in range(writers)]
+        threads = [
+            threading.Thread(target=writer, args=(plugins[index], index, changes, errors))
+            for index in range(writers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        applied = server.state.read(["interface"], "applied") or {}
+        applies = len([revision for revision in server.state.revisions.values() if revision["state"] == "applied"])
+        lost = len([
+            index for index in range(writers)
+            if (applied.get("swp%d" % (index + 1)) or {}).get("description") != "writer %d change %d" % (index, changes - 1)
+        ])
+    return elapsed, applies, lost, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", default="1,4,16", help="comma separated writer counts to run with")
+    parser.add_argument("--changes", type=int, default=5, help="changes made by each writer, one after the other")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds added to every request")
+    parser.add_argument("--apply-time", type=float, default=0.5, help="seconds an apply takes on the mock")
+    args = parser.parse_args()
+
+    header = "%7s %6s %10s %11s %8s %11s" % ("writers", "queue", "seconds", "changes/s", "applies", "lost writes")
+    print(header)
+    print("-" * len(header))
+    for writers in [int(value) for value in args.writers.split(",")]:
+        for queued in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                elapsed, applies, lost, errors = run(
+                    writers, args.changes, args.latency, args.apply_time, directory if queued else None)
+            print("%7d %6s %10.2f %11.1f %8d %11d" % (
+                writers, "yes" if queued else "no", elapsed, writers * args.changes / elapsed, applies, lost))
+            for error in errors[:3]:
+                print("%7s %s" % ("", error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import functools
+import time
+import urllib.parse
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import \
+    SUCCESS_STATES, host_endpoint, poll, revision_id, wait_for_revisions
+
+ARGUMENT_SPEC = dict(
+    hosts=dict(type='list', elements='str'),
+    revisions=dict(type='dict'),
+    bgp=dict(type='list', elements='str'),
+    mlag=dict(type='bool', default=False),
+    interfaces=dict(type='list', elements='str'),
+    checks=dict(type='list', elements='dict', options=dict(
+        name=dict(type='str', required=True),
+        path=dict(type='str', required=True),
+        expect=dict(type='dict', required=True),
+        each=dict(type='bool', default=False),
+        items=dict(type='list', elements='str'),
+    )),
+    timeout=dict(type='int', default=300),
+    interval=dict(type='float', default=1.0),
+    max_interval=dict(type='float', default=10.0),
+    parallel=dict(type='int', default=32),
+)
+
+
+def matches(value, expect):
+    """Whether value holds expect, compared key by key; keys may use _ for -"""
+    if isinstance(expect, dict):
+        if not isinstance(value, dict):
+            return False
+        return all(matches(value.get(key, value.get(key.replace("_", "-"))), wanted) for key, wanted in expect.items())
+    return value == expect
+
+
+def failing(value, check):
+    """The entries of value, an operational state, that do not pass check; empty when it passes"""
+    if not check["each"]:
+        return [] if matches(value, check["expect"]) else [check["path"]]
+    if not isinstance(value, dict) or not value:
+        return [check["path"]]
+    return [item for item in check["items"] or sorted(value) if not matches(value.get(item), check["expect"])]
+
+
+def checks_of(args):
+    """The checks of the bgp, mlag and interfaces options, then those of checks"""
+    checks = []
+    for vrf in args["bgp"] or []:
+        checks.append({
+            "name": "bgp", "path": "vrf/%s/router/bgp/neighbor" % urllib.parse.quote(vrf, safe=""),
+            "expect": {"state": "established"}, "each": True, "items": None})
+    if args["mlag"]:
+        checks.append({"name": "mlag", "path": "mlag", "expect": {"peer-alive": True}, "each": False, "items": None})
+    for interface in args["interfaces"] or []:
+        checks.append({
+            "name": "interfaces", "path": "interface/%s" % urllib.parse.quote(interface, safe=""),
+            "expect": {"link": {"oper-status": "up"}}, "each": False, "items": None})
+    checks.extend(args["checks"] or [])
+    return checks
+
+
+class ActionModule(ActionBase):
+    """Wait for the protocols of many switches to converge after an apply"""
+
+    _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _valid, args = self.validate_argument_spec(ARGUMENT_SPEC)
+        task_vars = task_vars or {}
+        hostvars = task_vars.get("hostvars", {})
+
+        checks = checks_of(args)
+        if not checks:
+            raise AnsibleActionFail("Set bgp, mlag, interfaces or checks")
+        given = args["revisions"] or {}
+        if args["hosts"] is not None:
+            hosts = args["hosts"]
+        elif given:
+            hosts = list(given)
+        elif self._task.run_once:
+            hosts = list(task_vars.get("ansible_play_hosts", []))
+        else:
+            hosts = [task_vars.get("inventory_hostname")]
+        missing = sorted(host for host in hosts if host not in hostvars)
+        if missing:
+            raise AnsibleActionFail("Not in the inventory: %s" % ", ".join(missing))
+        endpoints = dict((host, host_endpoint(host, hostvars[host], self._templar.template)) for host in hosts)
+
+        deadline = time.time() + args["timeout"]
+        reports = dict((host, {"converged": {}, "failing": {}}) for host in hosts)
+        since = dict((host, None) for host in hosts)
+        waiting = {}
+        for host in hosts:
+            revid, started = revision_id(given.get(host))
+            if revid is not None:
+                waiting[host] = (endpoints[host], revid, started)
+                since[host] = started
+        if waiting:
+            for host, waited in wait_for_revisions(
+                    waiting, timeout=args["timeout"], interval=args["interval"],
+                    max_interval=args["max_interval"], parallel=args["parallel"]).items():
+                reports[host]["revision"] = waited
+        polling = [host for host in hosts if reports[host].get("revision", {}).get("state", SUCCESS_STATES[0]) in SUCCESS_STATES]
+
+        # every check of every host is polled on its own, so each protocol converges at its own pace
+        polled = poll(
+            dict(((host, index), (
+                functools.partial(endpoints[host].operational, check["path"]),
+                lambda value, check=check: not failing(value, check),
+                since[host])) for host in polling for index, check in enumerate(checks)),
+            timeout=max(0, deadline - time.time()), interval=args["interval"],
+            max_interval=args["max_interval"], parallel=args["parallel"]) if polling else {}
+
+        convergence = {}
+        for host in hosts:
+            report = reports[host]
+            for index, check in enumerate(checks):
+                found = polled.get((host, index))
+                done = found is not None and found["done"]
+                previous = report["converged"].get(check["name"], 0)
+                report["converged"][check["name"]] = max(previous, found["duration"]) if done and previous is not None else None
+                if found is not None and not done:
+                    report["failing"].setdefault(check["name"], []).extend(
+                        [found["error"]] if "error" in found else failing(found["value"], check))
+            for name, duration in report["converged"].items():
+                previous = convergence.get(name, 0)
+                convergence[name] = max(previous, duration) if duration is not None and previous is not None else None
+
+        failed = sorted(host for host in hosts if None in reports[host]["converged"].values())
+        result.update(changed=False, hosts=reports, convergence=convergence, failed=bool(failed))
+        if failed:
+            result["msg"] = "Not converged on %d of %d hosts: %s" % (
+                len(failed), len(hosts), ", ".join(
+                    "%s (%s)" % (host, "revision %s" % reports[host]["revision"]["state"] if host not in polling else ", ".join(
+                        name for name, duration in sorted(reports[host]["converged"].items()) if duration is None))
+                    for host in failed))
+        return result
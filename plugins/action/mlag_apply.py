@@ -0,0 +1,171 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import functools
+import threading
+import time
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import \
+    SUCCESS_STATES, host_endpoint, poll, revision_id, run_parallel, wait_for_revisions
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.waves import PEER_VARIABLES, mlag_pairs, mlag_peers
+
+ARGUMENT_SPEC = dict(
+    revisions=dict(type='dict', required=True),
+    pairs=dict(type='list', elements='list'),
+    force=dict(type='bool', default=False),
+    converge=dict(type='bool', default=True),
+    wait=dict(type='int', default=300),
+    rendezvous=dict(type='int', default=60),
+    interval=dict(type='float', default=1.0),
+    max_interval=dict(type='float', default=10.0),
+    parallel=dict(type='int', default=32),
+)
+
+
+def peer_alive(state):
+    """Whether the MLAG operational state of a switch sees its peer"""
+    return isinstance(state, dict) and state.get("peer-alive") is True
+
+
+def apply_pair(pair, endpoints, revids, force, timeout=60):
+    """
+    Start the applies of the staged revisions of the hosts of pair at the
+    same time, or none of them: each side checks that its revision is
+    still pending, then waits for the other at a barrier, at most timeout
+    seconds, before it starts its apply. An apply that then fails does
+    not undo that of the other side. Returns {host: (report, error)}.
+    """
+    barrier = threading.Barrier(len(pair))
+
+    def side(host):
+        try:
+            state = endpoints[host].revision_state(revids[host])
+        except BaseException:
+            barrier.abort()
+            raise
+        if state != "pending":
+            barrier.abort()
+            return {"state": state or "missing"}
+        try:
+            barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            return {"state": "held"}
+        started = time.time()
+        return {"state": endpoints[host].apply(revids[host], force), "started": started}
+
+    return run_parallel(side, dict((host, (host,)) for host in pair), len(pair))
+
+
+class ActionModule(ActionBase):
+    """Apply the revisions of both peers of MLAG pairs together"""
+
+    _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+    def pairs(self, hosts, hostvars, given):
+        if given is not None:
+            pairs = [[str(host) for host in pair] for pair in given]
+            bad = [pair for pair in pairs if len(pair) not in (1, 2)]
+            if bad:
+                raise AnsibleActionFail("pairs holds lists of one or two hosts, got %s" % bad)
+            listed = [host for pair in pairs for host in pair]
+            return pairs + [[host] for host in hosts if host not in listed]
+        variables = dict(
+            (host, dict((name, self._templar.template(hostvars[host][name])) for name in PEER_VARIABLES if name in hostvars[host]))
+            for host in hosts)
+        return mlag_pairs(hosts, mlag_peers(variables))
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _valid, args = self.validate_argument_spec(ARGUMENT_SPEC)
+        hostvars = (task_vars or {}).get("hostvars", {})
+
+        revids = {}
+        for host, revision in args["revisions"].items():
+            revid = revision_id(revision)[0]
+            if revid is not None:
+                revids[host] = revid
+        hosts = sorted(revids)
+        missing = sorted(host for host in hosts if host not in hostvars)
+        if missing:
+            raise AnsibleActionFail("Not in the inventory: %s" % ", ".join(missing))
+        pairs = self.pairs(hosts, hostvars, args["pairs"])
+        unknown = sorted(host for pair in pairs for host in pair if host not in revids)
+        if unknown:
+            raise AnsibleActionFail("No revision in revisions for %s" % ", ".join(unknown))
+        endpoints = dict((host, host_endpoint(host, hostvars[host], self._templar.template)) for host in hosts)
+
+        revisions = dict((host, {"revid": revids[host], "state": None}) for host in hosts)
+        reports = [{"hosts": pair} for pair in pairs]
+        for report in reports:
+            for host in report["hosts"]:
+                revisions[host]["peer"] = ([other for other in report["hosts"] if other != host] or [None])[0]
+        result["pairs"] = reports
+        if self._play_context.check_mode:
+            result.update(changed=bool(hosts), revisions=revisions)
+            return result
+
+        deadline = time.time() + args["wait"]
+        applied = run_parallel(
+            functools.partial(
+                apply_pair, endpoints=endpoints, revids=revids, force=args["force"], timeout=args["rendezvous"]),
+            dict((index, (pair,)) for index, pair in enumerate(pairs)), max(1, args["parallel"] // 2))
+        waiting = {}
+        for index, (sides, error) in applied.items():
+            report = reports[index]
+            for host in report["hosts"]:
+                found, side_error = (None, error) if sides is None else sides[host]
+                if side_error is not None:
+                    revisions[host].update(state="unreachable", error=side_error)
+                    continue
+                revisions[host].update(found)
+                if "started" in found:
+                    waiting[host] = (endpoints[host], revids[host], found["started"])
+            starts = [revisions[host]["started"] for host in report["hosts"] if "started" in revisions[host]]
+            if len(starts) == len(report["hosts"]):
+                report["skew"] = round(max(starts) - min(starts), 3)
+        result["changed"] = bool(waiting)
+
+        if args["wait"] > 0:
+            for host, waited in wait_for_revisions(
+                    waiting, timeout=max(0, deadline - time.time()), interval=args["interval"],
+                    max_interval=args["max_interval"], parallel=args["parallel"]).items():
+                revisions[host].update(waited)
+            converging = [
+                report for report in reports
+                if all(revisions[host]["state"] in SUCCESS_STATES for host in report["hosts"])]
+            if args["converge"] and converging:
+                polled = poll(
+                    dict((host, (functools.partial(endpoints[host].operational, "mlag"), peer_alive,
+                                 min(revisions[other]["started"] for other in report["hosts"])))
+                         for report in converging for host in report["hosts"]),
+                    timeout=max(0, deadline - time.time()), interval=args["interval"],
+                    max_interval=args["max_interval"], parallel=args["parallel"])
+                for report in converging:
+                    if all(polled[host]["done"] for host in report["hosts"]):
+                        report["converged"] = max(polled[host]["duration"] for host in report["hosts"])
+                    else:
+                        report["converged"] = None
+                    for host in report["hosts"]:
+                        state = polled[host]["value"] if isinstance(polled[host]["value"], dict) else {}
+                        revisions[host]["mlag"] = dict(
+                            (key.replace("-", "_"), state.get(key)) for key in ("peer-alive", "local-role", "peer-role"))
+            failed = sorted(host for host, revision in revisions.items() if revision["state"] not in SUCCESS_STATES)
+            failed.extend(
+                host for report in reports if report.get("converged", 0) is None for host in report["hosts"] if host not in failed)
+        else:
+            failed = sorted(host for host, revision in revisions.items() if "started" not in revision)
+
+        result["revisions"] = revisions
+        if failed:
+            result.update(failed=True, msg="Not applied and converged on %d of %d hosts: %s" % (
+                len(failed), len(revisions), ", ".join(
+                    "%s (%s)" % (host, "not converged" if revisions[host]["state"] in SUCCESS_STATES else revisions[host]["state"])
+                    for host in sorted(failed))))
+        return result
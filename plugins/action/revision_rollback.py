@@ -0,0 +1,99 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import time
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import \
+    SUCCESS_STATES, host_endpoint, read_last_known_good, revision_id, run_parallel, wait_for_revisions, \
+    write_last_known_good
+
+ARGUMENT_SPEC = dict(
+    hosts=dict(type='list', elements='str'),
+    last_known_good=dict(type='path'),
+    revisions=dict(type='dict'),
+    force=dict(type='bool', default=False),
+    wait=dict(type='int', default=300),
+    interval=dict(type='float', default=1.0),
+    max_interval=dict(type='float', default=10.0),
+    parallel=dict(type='int', default=32),
+)
+
+
+class ActionModule(ActionBase):
+    """Roll many switches back to their last known good revision at once"""
+
+    _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _valid, args = self.validate_argument_spec(ARGUMENT_SPEC)
+        task_vars = task_vars or {}
+        hostvars = task_vars.get("hostvars", {})
+
+        directory = args["last_known_good"] or os.environ.get("ANSIBLE_NVUE_LAST_KNOWN_GOOD")
+        if directory is None and task_vars.get("ansible_nvue_last_known_good") is not None:
+            directory = self._templar.template(task_vars["ansible_nvue_last_known_good"])
+        given = args["revisions"] or {}
+        hosts = args["hosts"] if args["hosts"] is not None else list(given or task_vars.get("ansible_play_hosts", []))
+        missing = sorted(host for host in hosts if host not in hostvars)
+        if missing:
+            raise AnsibleActionFail("Not in the inventory: %s" % ", ".join(missing))
+        if directory is None and any(revision_id(given.get(host))[0] is None for host in hosts):
+            raise AnsibleActionFail("Set last_known_good, or give the revision of every host in revisions")
+
+        revisions = {}
+        targets = {}
+        for host in hosts:
+            endpoint = host_endpoint(host, hostvars[host], self._templar.template)
+            revid = revision_id(given.get(host))[0]
+            if revid is None:
+                record = read_last_known_good(directory, endpoint.host, endpoint.port)
+                revid = record["revid"] if record else None
+            if revid is None:
+                revisions[host] = {"revid": None, "state": "missing"}
+            else:
+                revisions[host] = {"revid": revid, "state": None}
+                targets[host] = endpoint
+
+        if self._play_context.check_mode:
+            result.update(changed=bool(targets), revisions=revisions)
+            return result
+
+        started = time.time()
+        applies = run_parallel(
+            lambda endpoint, revid: endpoint.apply(revid, args["force"]),
+            dict((host, (endpoint, revisions[host]["revid"])) for host, endpoint in targets.items()), args["parallel"])
+        for host, (state, error) in applies.items():
+            revisions[host].update(state=state, started=started)
+            if error is not None:
+                revisions[host].update(state="unreachable", error=error)
+                del targets[host]
+        result.update(changed=bool(targets), burst=round(time.time() - started, 3))
+        if directory is not None:
+            # the revisions rolled back to are the ones applied from now on
+            for host, endpoint in targets.items():
+                write_last_known_good(directory, endpoint.host, endpoint.port, revisions[host]["revid"], revisions[host]["revid"])
+
+        if args["wait"] > 0:
+            waiting = dict((host, (endpoint, revisions[host]["revid"], started)) for host, endpoint in targets.items())
+            for host, waited in wait_for_revisions(
+                    waiting, timeout=args["wait"], interval=args["interval"],
+                    max_interval=args["max_interval"], parallel=args["parallel"]).items():
+                revisions[host].update(waited)
+            failed = sorted(host for host, revision in revisions.items() if revision["state"] not in SUCCESS_STATES)
+        else:
+            failed = sorted(host for host, revision in revisions.items() if revision["state"] in ("missing", "unreachable"))
+
+        result["revisions"] = revisions
+        if failed:
+            result.update(failed=True, msg="Not rolled back on %d of %d hosts: %s" % (
+                len(failed), len(revisions), ", ".join("%s (%s)" % (host, revisions[host]["state"]) for host in failed)))
+        return result
@@ -0,0 +1,56 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import \
+    SUCCESS_STATES, host_endpoint, revision_id, wait_for_revisions
+
+ARGUMENT_SPEC = dict(
+    revisions=dict(type='dict', required=True),
+    timeout=dict(type='int', default=300),
+    interval=dict(type='float', default=1.0),
+    max_interval=dict(type='float', default=10.0),
+    parallel=dict(type='int', default=32),
+)
+
+
+class ActionModule(ActionBase):
+    """Wait on the controller for the revisions of many switches at once"""
+
+    _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _valid, args = self.validate_argument_spec(ARGUMENT_SPEC)
+        hostvars = (task_vars or {}).get("hostvars", {})
+
+        targets = {}
+        skipped = []
+        for host, revision in args["revisions"].items():
+            revid, started = revision_id(revision)
+            if revid is None:
+                skipped.append(host)
+                continue
+            if host not in hostvars:
+                raise AnsibleActionFail(f"{host} is not in the inventory")
+            targets[host] = (host_endpoint(host, hostvars[host], self._templar.template), revid, started)
+
+        revisions = wait_for_revisions(
+            targets, timeout=args["timeout"], interval=args["interval"],
+            max_interval=args["max_interval"], parallel=args["parallel"])
+        for host in skipped:
+            revisions[host] = {"revid": None, "state": "skipped", "duration": None, "polls": 0}
+
+        failed = sorted(host for host in targets if revisions[host]["state"] not in SUCCESS_STATES)
+        result.update(changed=False, revisions=revisions, failed=bool(failed))
+        if failed:
+            result["msg"] = "Revisions not applied on %d of %d hosts: %s" % (
+                len(failed), len(targets), ", ".join(
+                    "%s (%s)" % (host, revisions[host]["state"]) for host in failed))
+        return result
@@ -0,0 +1,153 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import time
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import \
+    SUCCESS_STATES, applied_revisions, host_endpoint, revision_id, run_parallel, wait_for_revisions, write_json
+
+ARGUMENT_SPEC = dict(
+    state=dict(type='str', required=True, choices=['staged', 'verified', 'applied']),
+    path=dict(type='path', required=True),
+    revisions=dict(type='dict'),
+    hosts=dict(type='list', elements='str'),
+    force=dict(type='bool', default=False),
+    wait=dict(type='int', default=300),
+    interval=dict(type='float', default=1.0),
+    max_interval=dict(type='float', default=10.0),
+    parallel=dict(type='int', default=32),
+)
+
+
+def check(endpoint, revid, base):
+    """The state of a staged revision, and the revisions applied since it was staged"""
+    revisions = endpoint.revisions()
+    state = (revisions.get(revid) or {}).get("state")
+    applied = applied_revisions(revisions)
+    since = [known for known in applied if known not in base]
+    return {"revid": revid, "state": state or "missing", "stale": bool(since), "applied_since": since}, applied
+
+
+def read_staged(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError) as exc:
+        raise AnsibleActionFail(f"Cannot read staged revisions from {path}: {exc}")
+
+
+class ActionModule(ActionBase):
+    """Stage revisions ahead of a maintenance window and apply them together"""
+
+    _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+    def endpoints(self, hosts, task_vars):
+        hostvars = (task_vars or {}).get("hostvars", {})
+        missing = sorted(host for host in hosts if host not in hostvars)
+        if missing:
+            raise AnsibleActionFail("Not in the inventory: %s" % ", ".join(missing))
+        return dict((host, host_endpoint(host, hostvars[host], self._templar.template)) for host in hosts)
+
+    def stage(self, args, task_vars):
+        if not args["revisions"]:
+            raise AnsibleActionFail("state=staged requires revisions")
+        revids = {}
+        for host, revision in args["revisions"].items():
+            revid = revision_id(revision)[0]
+            if revid is not None:
+                revids[host] = revid
+        endpoints = self.endpoints(revids, task_vars)
+        checked = run_parallel(
+            check, dict((host, (endpoints[host], revid, ())) for host, revid in revids.items()), args["parallel"])
+
+        staged = read_staged(args["path"])
+        revisions = {}
+        for host, (found, error) in checked.items():
+            if error is not None:
+                revisions[host] = {"revid": revids[host], "state": "unreachable", "error": error}
+                continue
+            report, applied = found
+            revisions[host] = {"revid": report["revid"], "state": report["state"]}
+            if report["state"] == "pending":
+                staged[host] = {"revid": report["revid"], "base": applied, "staged": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        if not self._play_context.check_mode:
+            write_json(args["path"], staged)
+        return revisions, sorted(host for host, revision in revisions.items() if revision["state"] != "pending")
+
+    def verify(self, args, task_vars):
+        staged = read_staged(args["path"])
+        hosts = args["hosts"] if args["hosts"] is not None else sorted(staged)
+        unknown = sorted(host for host in hosts if host not in staged)
+        if unknown:
+            raise AnsibleActionFail("No staged revision for %s in %s" % (", ".join(unknown), args["path"]))
+        endpoints = self.endpoints(hosts, task_vars)
+        checked = run_parallel(
+            check, dict((host, (endpoints[host], staged[host]["revid"], staged[host]["base"])) for host in hosts), args["parallel"])
+
+        revisions = {}
+        for host, (found, error) in checked.items():
+            if error is not None:
+                revisions[host] = {"revid": staged[host]["revid"], "state": "unreachable", "stale": None, "error": error}
+            else:
+                revisions[host] = found[0]
+        failed = sorted(host for host, revision in revisions.items() if revision["state"] != "pending" or revision["stale"])
+        return revisions, failed, endpoints
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _valid, args = self.validate_argument_spec(ARGUMENT_SPEC)
+
+        if args["state"] == "staged":
+            revisions, failed = self.stage(args, task_vars)
+            result.update(changed=bool(revisions), revisions=revisions, failed=bool(failed))
+            if failed:
+                result["msg"] = "Revisions not pending, so not staged: %s" % ", ".join(failed)
+            return result
+
+        revisions, failed, endpoints = self.verify(args, task_vars)
+        result.update(changed=False, revisions=revisions, failed=bool(failed))
+        if failed:
+            result["msg"] = "Staged revisions not ready on %d of %d hosts: %s" % (
+                len(failed), len(revisions), ", ".join(
+                    "%s (%s)" % (host, "stale" if revisions[host]["stale"] else revisions[host]["state"]) for host in failed))
+            return result
+        if args["state"] == "verified" or self._play_context.check_mode:
+            return result
+
+        # every staged revision is ready; start all applies in one burst
+        started = time.time()
+        applies = run_parallel(
+            lambda endpoint, revid: endpoint.apply(revid, args["force"]),
+            dict((host, (endpoints[host], revision["revid"])) for host, revision in revisions.items()), args["parallel"])
+        for host, (state, error) in applies.items():
+            revisions[host].update(state=state, started=started)
+            if error is not None:
+                revisions[host].update(state="unreachable", error=error)
+        result.update(changed=True, burst=round(time.time() - started, 3))
+
+        if args["wait"] > 0:
+            waiting = dict(
+                (host, (endpoints[host], revision["revid"], started))
+                for host, revision in revisions.items() if revision["state"] != "unreachable")
+            for host, waited in wait_for_revisions(
+                    waiting, timeout=args["wait"], interval=args["interval"],
+                    max_interval=args["max_interval"], parallel=args["parallel"]).items():
+                revisions[host].update(waited)
+            failed = sorted(host for host, revision in revisions.items() if revision["state"] not in SUCCESS_STATES)
+        else:
+            failed = sorted(host for host, revision in revisions.items() if revision["state"] == "unreachable")
+        if failed:
+            result.update(failed=True, msg="Revisions not applied on %d of %d hosts: %s" % (
+                len(failed), len(revisions), ", ".join("%s (%s)" % (host, revisions[host]["state"]) for host in failed)))
+        return result
@@ -0,0 +1,37 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.prefixes import aggregate_rules
+
+
+def aggregate_prefixes(rules, step=10):
+    """Aggregate prefix list rules, or plain prefixes, into the fewest equivalent rules"""
+    if not isinstance(rules, list):
+        raise AnsibleFilterError(f"aggregate_prefixes expects a list, got {type(rules).__name__}")
+    expanded = []
+    for index, rule in enumerate(rules):
+        if isinstance(rule, string_types):
+            rule = {"id": index + 1, "match": [{"id": rule}], "action": "permit"}
+        elif not isinstance(rule, dict):
+            raise AnsibleFilterError(f"aggregate_prefixes expects prefixes or prefix list rules, got {rule!r}")
+        expanded.append(rule)
+    try:
+        aggregated, report = aggregate_rules(expanded, step=int(step))
+    except (TypeError, ValueError) as exc:
+        raise AnsibleFilterError(f"aggregate_prefixes: {exc}")
+    if "skipped" in report:
+        raise AnsibleFilterError(f"aggregate_prefixes cannot order rules with {report['skipped']}")
+    return aggregated
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {"aggregate_prefixes": aggregate_prefixes}
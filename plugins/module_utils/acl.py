@@ -0,0 +1,270 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Compile the rules of an ACL into fewer, equivalent rules.
+
+Rules are evaluated in order and the first rule with a permit or deny
+action decides, so a rule can be left out when it is an exact duplicate
+of an earlier rule, or when an earlier permit or deny rule matches
+everything it matches. Runs of consecutive rules that only differ in
+their source or destination prefix are merged into the fewest prefixes
+covering the same addresses.
+
+TCAM use is estimated as one entry per rule and per combination of
+listed source and destination ports.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import ipaddress
+import json
+
+PREFIX_FIELDS = ('source_ip', 'dest_ip')
+PORT_PROTOCOLS = ('tcp', 'udp')
+TERMINAL_ACTIONS = ('permit', 'deny')
+
+
+def clean(value):
+    """A copy of value without unset (None) options"""
+    if isinstance(value, dict):
+        return dict((key, clean(item)) for key, item in value.items() if item is not None)
+    if isinstance(value, list):
+        return [clean(item) for item in value]
+    return value
+
+
+def signature(rule, leave_out=None):
+    """What a rule matches and does, as text; leave_out is an ip match field to ignore"""
+    match = dict(rule.get('match') or {})
+    if leave_out is not None:
+        match['ip'] = dict((key, value) for key, value in (match.get('ip') or {}).items() if key != leave_out)
+    return json.dumps([match, rule.get('action') or {}], sort_keys=True)
+
+
+def network(value):
+    """The network of a prefix, None for any address, or the text when it is no prefix"""
+    if value is None or str(value).lower() == 'any':
+        return None
+    try:
+        return ipaddress.ip_network(str(value))
+    except ValueError:
+        return value
+
+
+def ports(match):
+    """The listed ports of a match as {(protocol, direction): set of ports}, leaving out ANY"""
+    listed = {}
+    for protocol in PORT_PROTOCOLS:
+        for direction in ('source_port', 'dest_port'):
+            names = set(str(entry.get('id')) for entry in ((match.get(protocol) or {}).get(direction)) or [])
+            if names and 'any' not in (name.lower() for name in names):
+                listed[(protocol, direction)] = names
+    return listed
+
+
+def tcam_entries(rule):
+    ip = (rule.get('match') or {}).get('ip') or {}
+    entries = 1
+    for listed in ports(ip).values():
+        entries *= len(listed)
+    return entries
+
+
+def covers_network(wide, narrow):
+    """Whether the network wide, as returned by network(), holds every address of narrow"""
+    if wide is None:
+        return True
+    if narrow is None:
+        return False
+    if isinstance(wide, str) or isinstance(narrow, str):
+        return wide == narrow
+    return wide.version == narrow.version and narrow.subnet_of(wide)
+
+
+class Match:
+    """
+    The match of a rule, taken apart once into what an earlier match must
+    cover: the options it must equal, the protocols with port options,
+    the listed ports, and the source and destination networks.
+    """
+
+    def __init__(self, position, rule):
+        self.position = position
+        self.rule = rule
+        match = rule.get('match') or {}
+        ip = match.get('ip') or {}
+        exact = [((key,), json.dumps(value, sort_keys=True)) for key, value in match.items() if key != 'ip']
+        exact.extend(
+            (('ip', key), json.dumps(value, sort_keys=True)) for key, value in ip.items()
+            if key not in PREFIX_FIELDS and key not in PORT_PROTOCOLS)
+        self.exact = frozenset(exact)
+        self.protocols = frozenset(protocol for protocol in PORT_PROTOCOLS if protocol in ip)
+        self.ports = ports(ip)
+        self.networks = tuple(network(ip.get(field)) for field in PREFIX_FIELDS)
+
+    def group(self):
+        return self.exact, self.protocols, frozenset(self.ports)
+
+    def covers(self, later):
+        """Whether every packet the match of later matches is matched by this one"""
+        return self.exact <= later.exact and self.protocols <= later.protocols \
+            and all(key in later.ports and listed.issuperset(later.ports[key]) for key, listed in self.ports.items()) \
+            and all(covers_network(wide, narrow) for wide, narrow in zip(self.networks, later.networks))
+
+
+def covering_keys(value, lengths):
+    """
+    The keys, in a ShadowIndex, of the networks that may cover value:
+    any address, and the same text, or the networks of value at each of
+    lengths, {(version, prefix length)}, no longer than its own
+    """
+    keys = [None]
+    if isinstance(value, str):
+        keys.append(value)
+    elif value is not None:
+        for version, length in lengths:
+            if version == value.version and length <= value.prefixlen:
+                keys.append(value if length == value.prefixlen else value.supernet(new_prefix=length))
+    return keys
+
+
+class ShadowIndex:
+    """
+    The permit and deny rules kept so far, looked up by what a later
+    rule matches. Rules are grouped by the options that must be equal,
+    their protocols and the port options they list, and within a group
+    by their source and destination networks and one of their ports, so
+    a rule is only compared with the few that could cover it.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.compatible = {}
+
+    def add(self, match):
+        key = match.group()
+        if key not in self.groups:
+            self.groups[key] = {'lengths': [set(), set()], 'rules': {}}
+            self.compatible.clear()
+        group = self.groups[key]
+        for field, value in enumerate(match.networks):
+            if value is not None and not isinstance(value, str):
+                group['lengths'][field].add((value.version, value.prefixlen))
+        port_keys = [None]
+        if match.ports:
+            first = min(match.ports)
+            port_keys = [(first, port) for port in match.ports[first]]
+        for port_key in port_keys:
+            group['rules'].setdefault(match.networks + (port_key,), []).append(match)
+
+    def groups_for(self, match):
+        key = match.group()
+        if key not in self.compatible:
+            exact, protocols, port_keys = key
+            self.compatible[key] = [
+                (group_key, group) for group_key, group in self.groups.items()
+                if group_key[0] <= exact and group_key[1] <= protocols and group_key[2] <= port_keys]
+        return self.compatible[key]
+
+    def shadow(self, match):
+        """The earliest rule added that covers match, or None"""
+        found = None
+        for (_exact, _protocols, port_keys), group in self.groups_for(match):
+            if port_keys:
+                first = min(port_keys)
+                port_key = (first, min(match.ports[first]))
+            else:
+                port_key = None
+            for source in covering_keys(match.networks[0], group['lengths'][0]):
+                for dest in covering_keys(match.networks[1], group['lengths'][1]):
+                    for earlier in group['rules'].get((source, dest, port_key), ()):
+                        if found is not None and earlier.position > found.position:
+                            break
+                        if earlier.covers(match):
+                            found = earlier
+                            break
+        return found
+
+
+def terminal(rule):
+    return any((rule.get('action') or {}).get(action) is not None for action in TERMINAL_ACTIONS)
+
+
+def merge_runs(rules, field, merged):
+    """Merge consecutive rules that only differ in one prefix field"""
+    result = []
+    index = 0
+    while index < len(rules):
+        key = signature(rules[index], field)
+        run = [rules[index]]
+        while index + len(run) < len(rules) and signature(rules[index + len(run)], field) == key:
+            run.append(rules[index + len(run)])
+        index += len(run)
+
+        networks = [network(((rule.get('match') or {}).get('ip') or {}).get(field)) for rule in run]
+        if len(run) == 1 or not all(isinstance(net, (ipaddress.IPv4Network, ipaddress.IPv6Network)) for net in networks) \
+                or len(set(net.version for net in networks)) != 1:
+            result.extend(run)
+            continue
+        collapsed = list(ipaddress.collapse_addresses(networks))
+        if len(collapsed) == len(run):
+            result.extend(run)
+            continue
+        for position, net in enumerate(collapsed):
+            rule = dict(run[position], match=dict(run[position]['match']))
+            rule['match']['ip'] = dict(rule['match']['ip'], **{field: str(net)})
+            result.append(rule)
+        merged.append({'rules': [rule.get('id') for rule in run], 'into': [rule.get('id') for rule in result[-len(collapsed):]]})
+    return result
+
+
+def compile_rules(rules):
+    """
+    Return the compiled rules of an ACL and a report of what was done:
+    the duplicate and shadowed rules left out, the merged rules, and the
+    rule and TCAM entry counts before and after.
+    """
+    rules = [clean(rule) for rule in rules or []]
+    report = {
+        'rules': {'before': len(rules)},
+        'tcam_entries': {'before': sum(tcam_entries(rule) for rule in rules)},
+        'duplicates': [],
+        'shadowed': [],
+        'merged': [],
+    }
+
+    kept = []
+    seen = {}
+    index = ShadowIndex()
+    for position, rule in enumerate(rules):
+        key = signature(rule)
+        if key in seen:
+            report['duplicates'].append({'rule': rule.get('id'), 'of': seen[key]})
+            continue
+        match = Match(position, rule)
+        shadow = index.shadow(match)
+        if shadow is not None:
+            shadow = shadow.rule
+            report['shadowed'].append({
+                'rule': rule.get('id'), 'by': shadow.get('id'),
+                'conflict': signature(dict(action=rule.get('action'))) != signature(dict(action=shadow.get('action'))),
+            })
+            continue
+        seen[key] = rule.get('id')
+        kept.append(rule)
+        if terminal(rule):
+            index.add(match)
+
+    count = None
+    while count != len(kept):
+        count = len(kept)
+        for field in PREFIX_FIELDS:
+            kept = merge_runs(kept, field, report['merged'])
+
+    report['rules']['after'] = len(kept)
+    report['tcam_entries']['after'] = sum(tcam_entries(rule) for rule in kept)
+    report['tcam_entries']['saved'] = report['tcam_entries']['before'] - report['tcam_entries']['after']
+    return kept, report
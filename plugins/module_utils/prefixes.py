@@ -0,0 +1,155 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Aggregate the rules of a prefix list into the fewest equivalent rules.
+
+A match entry of a prefix list rule stands for the routes within its
+prefix whose length lies between min_prefix_len (ge) and
+max_prefix_len (le). Without either, only the prefix itself matches;
+with ge alone, lengths up to the address width match; with le alone,
+lengths from the prefix length up match. An entry is kept here as
+(network, lowest length, highest length).
+
+The first rule matching a route decides, so:
+
+- an entry that an earlier entry fully covers never decides anything
+  and is left out, whatever its action;
+- within a run of consecutive rules with the same action the order does
+  not matter, and two sibling prefixes with the same length bounds are
+  replaced by their parent with those bounds, which matches exactly the
+  same routes because the bounds exclude the parent's own length.
+
+The result has one rule per entry, renumbered in steps.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import ipaddress
+
+NETWORKS = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+WIDTHS = {4: 32, 6: 128}
+
+
+def entry(match):
+    """
+    The (version, address, length, low, high) of a match entry, with the
+    network address as an integer, or None when it is not a prefix
+    """
+    try:
+        network = ipaddress.ip_network(str(match.get('id')))
+    except ValueError:
+        return None
+    low = match.get('min_prefix_len')
+    high = match.get('max_prefix_len')
+    if low is None and high is None:
+        low = high = network.prefixlen
+    elif high is None:
+        high = network.max_prefixlen
+    elif low is None:
+        low = network.prefixlen
+    return network.version, int(network.network_address), network.prefixlen, max(low, network.prefixlen), high
+
+
+def match(version, address, length, low, high):
+    """The match entry of an entry"""
+    result = {'id': str(NETWORKS[version]((address, length)))}
+    if low > length:
+        result['min_prefix_len'] = low
+        if high != WIDTHS[version]:
+            result['max_prefix_len'] = high
+    elif high != length:
+        result['max_prefix_len'] = high
+    return result
+
+
+def covered(kept, lengths, version, address, length, low, high):
+    """
+    Whether an entry in kept, {(version, address, length): [(low, high)]},
+    matches every route of an entry; lengths holds the prefix lengths in
+    kept, {version: set of lengths}
+    """
+    width = WIDTHS[version]
+    for prefix in lengths[version]:
+        if prefix > length:
+            continue
+        host_bits = width - prefix
+        for bounds in kept.get((version, address >> host_bits << host_bits, prefix), ()):
+            if bounds[0] <= low and high <= bounds[1]:
+                return True
+    return False
+
+
+def merge_siblings(entries):
+    """Replace sibling prefixes with the same bounds by their parent, as often as possible"""
+    groups = {}
+    for version, address, length, low, high in entries:
+        groups.setdefault((version, low, high), {}).setdefault(length, set()).add(address)
+    merged = []
+    for (version, low, high), lengths in groups.items():
+        width = WIDTHS[version]
+        for length in range(max(lengths), 0, -1):
+            level = lengths.get(length, ())
+            bit = 1 << (width - length)
+            for address in sorted(level):
+                if address in level and address ^ bit in level:
+                    level.discard(address)
+                    level.discard(address ^ bit)
+                    lengths.setdefault(length - 1, set()).add(address & ~bit)
+        for length, level in lengths.items():
+            merged.extend((version, address, length, low, high) for address in level)
+    return sorted(merged)
+
+
+def rule_number(rule):
+    """The number of a rule, or None when its id is not one"""
+    try:
+        return int(rule.get('id') or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def aggregate_rules(rules, step=10):
+    """
+    Return the aggregated rules of a prefix list, renumbered from step
+    in steps of step, and a count of the match entries before and after.
+    Rules without an action or with a match that is not a prefix are
+    kept as they are, and end the run of rules they are in. Rules are
+    evaluated in the order of their numbers, so when an id is not a
+    number the rules are returned as they are, with the reason in the
+    skipped key of the count.
+    """
+    before = sum(len(rule.get('match') or []) for rule in rules or [])
+    numbers = [rule_number(rule) for rule in rules or []]
+    if None in numbers:
+        ids = [str(rule.get('id')) for rule, number in zip(rules, numbers) if number is None]
+        return list(rules), {'before': before, 'after': before, 'skipped': 'rule ids that are not numbers: %s' % ', '.join(ids)}
+    runs = []
+    for _number, rule in sorted(zip(numbers, rules or []), key=lambda numbered: numbered[0]):
+        entries = [entry(item) for item in rule.get('match') or []]
+        if not entries or None in entries or rule.get('action') is None:
+            runs.append((None, [rule]))
+        elif runs and runs[-1][0] == rule.get('action'):
+            runs[-1][1].extend(entries)
+        else:
+            runs.append((rule.get('action'), entries))
+
+    kept = {}
+    lengths = {4: set(), 6: set()}
+    result = []
+    for action, entries in runs:
+        if action is None:
+            for rule in entries:
+                result.append(dict(rule, id=step * (len(result) + 1)))
+            continue
+        live = [item for item in entries if item[3] <= item[4] and not covered(kept, lengths, *item)]
+        for item in merge_siblings(live):
+            if covered(kept, lengths, *item):
+                continue
+            kept.setdefault(item[:3], []).append(item[3:])
+            lengths[item[0]].add(item[2])
+            result.append({'id': step * (len(result) + 1), 'match': [match(*item)], 'action': action})
+    after = sum(len(rule.get('match') or []) for rule in result)
+    return result, {'before': before, 'after': after}
@@ -0,0 +1,144 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Range selectors, in the syntax of the NVUE CLI.
+
+A selector is a comma separated list of names in which any number may
+be a range: swp1-48 is swp1 to swp48, swp49-52s0-3 is the breakout
+ports swp49s0 to swp52s3, and swp1-4,swp10 adds swp10 to the first
+four ports. Names without ranges, such as vlan10-v0, stand for
+themselves.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import itertools
+import json
+import re
+
+NUMBER_RANGE = re.compile(r'(\d+)-(\d+)(?=\D|$)')
+
+
+def is_range(selector):
+    """Whether a selector stands for more than its own name"""
+    return ',' in selector or NUMBER_RANGE.search(selector) is not None
+
+
+def check(selector):
+    """Raise ValueError for a selector with a range that runs backwards"""
+    for match in NUMBER_RANGE.finditer(selector):
+        if int(match.group(1)) > int(match.group(2)):
+            raise ValueError(f"Invalid range {match.group(0)} in {selector}")
+
+
+def expand(selector):
+    """Yield the names a selector stands for, in order"""
+    for part in selector.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        texts = []
+        numbers = []
+        position = 0
+        check(part)
+        for match in NUMBER_RANGE.finditer(part):
+            first, last = int(match.group(1)), int(match.group(2))
+            texts.append(part[position:match.start()])
+            numbers.append(range(first, last + 1))
+            position = match.end()
+        texts.append(part[position:])
+        for combination in itertools.product(*numbers):
+            yield ''.join(text + str(number) for text, number in zip(texts, combination)) + texts[-1]
+
+
+def expand_keys(data):
+    """
+    Expand the range selectors among the keys of a dict. Every name of a
+    selector refers to the same value, so expanding does not copy the
+    configuration. Settings for a name given by several keys are merged,
+    later keys taking precedence. Anything but a dict, such as the None
+    of a deletion, is returned unchanged.
+    """
+    if not isinstance(data, dict):
+        return data
+    expanded = {}
+    for key, value in data.items():
+        for name in (expand(key) if is_range(key) else [key]):
+            if name in expanded:
+                expanded[name] = merge(expanded[name], value)
+            else:
+                expanded[name] = value
+    return expanded
+
+
+def merge(base, update):
+    """Merge update into base without modifying either"""
+    if not isinstance(base, dict) or not isinstance(update, dict):
+        return update
+    merged = dict(base)
+    for key, value in update.items():
+        merged[key] = merge(merged[key], value) if key in merged else value
+    return merged
+
+
+def compress(numbers):
+    """The shortest range selector for a collection of numbers, such as 10-20,30"""
+    numbers = sorted(set(numbers))
+    parts = []
+    start = 0
+    for index in range(1, len(numbers) + 1):
+        if index == len(numbers) or numbers[index] != numbers[index - 1] + 1:
+            first, last = numbers[start], numbers[index - 1]
+            parts.append(str(first) if first == last else f"{first}-{last}")
+            start = index
+    return ','.join(parts)
+
+
+def vni_offset(vlan):
+    """The offset of the only VNI of a VLAN entry from its VLAN, or None"""
+    vnis = vlan.get('vni') or []
+    if len(vnis) != 1 or not str(vlan.get('id')).isdigit() or not str(vnis[0].get('id')).isdigit():
+        return None
+    return int(vnis[0]['id']) - int(vlan['id'])
+
+
+def compress_vlans(vlans, offset=None):
+    """
+    Collapse the VLAN entries of a bridge domain into range entries.
+
+    A VLAN whose only VNI is the VLAN plus offset gets VNI auto, which
+    NVUE maps through the vlan-vni-offset of the domain. Without an
+    offset, the most common one among the VLANs is picked. VLANs with
+    the same settings then become one entry with a range selector, so
+    the payload grows with the number of distinct settings rather than
+    with the number of VLANs. Returns the entries and the offset, which
+    is None when no VLAN has VNI auto.
+    """
+    if offset is None:
+        counts = {}
+        for vlan in vlans:
+            found = vni_offset(vlan)
+            if found is not None:
+                counts[found] = counts.get(found, 0) + 1
+        if counts:
+            offset = max(counts, key=counts.get)
+
+    groups = {}
+    for vlan in vlans:
+        settings = dict((key, value) for key, value in vlan.items() if key != 'id' and value is not None)
+        if offset is not None and vni_offset(vlan) == offset:
+            settings['vni'] = [dict(settings['vni'][0], id='auto')]
+        if not str(vlan.get('id')).isdigit():
+            groups[(vlan.get('id'), None)] = (None, settings)
+            continue
+        signature = json.dumps(settings, sort_keys=True, default=str)
+        groups.setdefault((None, signature), ([], settings))[0].append(int(vlan['id']))
+
+    compressed = []
+    for (selector, _signature), (numbers, settings) in groups.items():
+        compressed.append(dict(settings, id=selector if numbers is None else compress(numbers)))
+    used = any(vni.get('id') == 'auto' for vlan in compressed for vni in vlan.get('vni') or [])
+    return compressed, offset if used else None
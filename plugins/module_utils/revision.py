@@ -0,0 +1,102 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Select revisions of a switch: to list, or to delete.
+
+NVUE keeps every revision it has created until it is deleted: those
+applied, and those created for a change that was never applied, such
+as after a failed play. A revision id names the user who created it and
+ends in the time it was created, as in
+changeset/cumulus/2021-11-02_16.09.18_5Z1K, which gives its author and
+age.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import calendar
+import re
+import time
+
+CREATED = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}\.\d{2}\.\d{2})')
+SUCCESS_STATES = ('applied', 'applied_and_saved')
+FAILURE_STATES = ('invalid', 'inactive')
+# revisions that were never applied, or whose apply failed
+ABANDONED_STATES = ('pending', 'invalid', 'apply_fail', 'ays_fail', 'ignore_fail', 'confirm_fail')
+
+
+def created(revid):
+    """The time a revision was created as seconds since the epoch, read as UTC, or None"""
+    found = CREATED.search(str(revid))
+    if found is None:
+        return None
+    try:
+        return calendar.timegm(time.strptime(found.group(1), '%Y-%m-%d_%H.%M.%S'))
+    except ValueError:
+        return None
+
+
+def author(revid):
+    """The user who created a revision, or None"""
+    parts = str(revid).split('/')
+    return parts[1] if len(parts) > 2 and parts[0] == 'changeset' else None
+
+
+def parse_time(text):
+    """Seconds since the epoch of a UTC date, with or without a time, or None"""
+    if text is None:
+        return None
+    for layout in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d_%H.%M.%S', '%Y-%m-%d'):
+        try:
+            return calendar.timegm(time.strptime(str(text).rstrip('Z'), layout))
+        except ValueError:
+            continue
+    raise ValueError(f"{text} is not a date such as 2021-11-02 or 2021-11-02T16:09:18")
+
+
+def select(revisions, states=None, user=None, after=None, before=None, newest=None, offset=0):
+    """
+    One page of the revisions in revisions, {revid: {state, ...}}, newest
+    first: those in one of states, created by user, and created from
+    after up to before (seconds since the epoch); offset revisions are
+    skipped and at most newest returned. Returns the page, the number of
+    revisions selected, and the offset of the next page or None.
+    """
+    found = []
+    for revid, revision in revisions.items():
+        if states and (revision or {}).get('state') not in states:
+            continue
+        if user is not None and author(revid) != user:
+            continue
+        when = created(revid)
+        if (after is not None or before is not None) and when is None:
+            continue
+        if (after is not None and when < after) or (before is not None and when > before):
+            continue
+        found.append((when or 0, revid))
+    found.sort(reverse=True)
+    end = len(found) if newest is None else offset + newest
+    page = dict((revid, revisions[revid]) for _when, revid in found[offset:end])
+    return page, len(found), end if end < len(found) else None
+
+
+def prunable(revisions, states=ABANDONED_STATES, older_than=0, keep=(), now=None):
+    """
+    The ids of the revisions in revisions, {revid: {state, ...}}, in one
+    of states and created more than older_than seconds ago, oldest
+    first. Revisions in keep, applied revisions whatever states holds,
+    and revisions of unknown age unless older_than is 0, are left out.
+    """
+    now = time.time() if now is None else now
+    found = []
+    for revid, revision in revisions.items():
+        state = (revision or {}).get('state')
+        if revid in keep or state not in states or state in SUCCESS_STATES:
+            continue
+        when = created(revid)
+        if older_than and (when is None or now - when < older_than):
+            continue
+        found.append((when or 0, revid))
+    return [revid for _when, revid in sorted(found)]
@@ -0,0 +1,121 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Read static routes from a CSV or JSON lines file, one route at a time.
+
+A CSV file has a header row naming its columns: prefix (or id), via,
+and optionally type and address_family. Each row adds one next hop to
+a route, so a route with several next hops takes several rows. When
+type is empty it follows from via: an IPv4 or IPv6 address, blackhole
+or reject, and an interface otherwise.
+
+A JSON lines file has one route per line, in the form of the static
+suboption of the vrf module, such as
+{"id": "10.1.0.0/16", "via": [{"id": "192.0.2.1", "type": "ipv4-address"}]}.
+Empty lines and lines starting with # are skipped in both formats.
+
+The routes are read one at a time and sent in batches. The rows of a
+prefix in one batch are merged into one route with all their next hops,
+as sending the prefix twice in one request would keep only the last;
+NVUE merges the next hops of a prefix sent in several requests.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import csv
+import ipaddress
+import json
+
+FORMATS = ('csv', 'jsonl')
+
+
+class RouteError(Exception):
+    pass
+
+
+def file_format(filename, wanted=None):
+    """The format of a routes file, from wanted or else from its extension"""
+    if wanted:
+        return wanted
+    return 'csv' if filename.lower().endswith('.csv') else 'jsonl'
+
+
+def via_type(via):
+    if via in ('blackhole', 'reject'):
+        return via
+    try:
+        return 'ipv%d-address' % ipaddress.ip_address(via).version
+    except ValueError:
+        return 'interface'
+
+
+def csv_routes(handle):
+    rows = csv.DictReader(handle)
+    if rows.fieldnames is None:
+        return
+    fields = set(name.strip() for name in rows.fieldnames)
+    if not fields & {'prefix', 'id'} or 'via' not in fields:
+        raise RouteError("the CSV header must name a prefix and a via column")
+    for row in rows:
+        if (row.get(rows.fieldnames[0]) or '').lstrip().startswith('#'):
+            continue
+        row = dict((key.strip(), (value or '').strip()) for key, value in row.items() if key)
+        via = row.get('via')
+        route = {'id': row.get('prefix') or row.get('id')}
+        if row.get('address_family'):
+            route['address_family'] = row['address_family']
+        if via:
+            route['via'] = [{'id': via, 'type': row.get('type') or via_type(via)}]
+        yield rows.line_num, route
+
+
+def jsonl_routes(handle):
+    for number, line in enumerate(handle, 1):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        try:
+            route = json.loads(line)
+        except ValueError as exc:
+            raise RouteError(f"line {number}: {exc}")
+        if not isinstance(route, dict):
+            raise RouteError(f"line {number}: expected an object, got {line.strip()}")
+        yield number, route
+
+
+def read_routes(filename, wanted=None):
+    """Yield (line number, route) for each route in a routes file, checking the prefix of each"""
+    reader = csv_routes if file_format(filename, wanted) == 'csv' else jsonl_routes
+    with open(filename, newline='') as handle:
+        for number, route in reader(handle):
+            try:
+                ipaddress.ip_network(str(route.get('id')))
+            except ValueError:
+                raise RouteError(f"line {number}: {route.get('id')!r} is not a network prefix")
+            yield number, route
+
+
+def batches(routes, size):
+    """
+    Yield lists of at most size (line number, route), one per prefix,
+    from routes, (line number, route) pairs. The next hops of the rows
+    of a prefix in one batch are merged into its first row, and a batch
+    is only closed before the row of a new prefix.
+    """
+    batch = {}
+    for number, route in routes:
+        prefix = str(route.get('id'))
+        if prefix in batch:
+            first = batch[prefix][1]
+            first['via'] = first.get('via', []) + (route.get('via') or [])
+            for key, value in route.items():
+                first.setdefault(key, value)
+            continue
+        if len(batch) >= size:
+            yield list(batch.values())
+            batch = {}
+        batch[prefix] = number, route
+    if batch:
+        yield list(batch.values())
@@ -0,0 +1,93 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Expand a template into one configuration per tenant.
+
+Strings in the template, keys included, may refer to the parameters of
+a tenant as {name}. A string that is only a placeholder takes the value
+of the parameter as it is, so numbers stay numbers; other strings have
+their placeholders replaced by text. Every tenant has an id parameter.
+
+The template is compiled once. Parts of it without placeholders are not
+copied but shared by all tenants, so expanding touches only the parts
+that differ, and tenants cost memory only for those parts.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import re
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class TemplateError(Exception):
+    pass
+
+
+def parameter(params, name):
+    try:
+        return params[name]
+    except KeyError:
+        raise TemplateError(f"Tenant {params.get('id')} has no parameter {name}")
+
+
+def compile_text(text):
+    """A function of the parameters for a string with placeholders, or None"""
+    if not isinstance(text, str) or PLACEHOLDER.search(text) is None:
+        return None
+    whole = PLACEHOLDER.fullmatch(text)
+    if whole is not None:
+        return lambda params: parameter(params, whole.group(1))
+    return lambda params: PLACEHOLDER.sub(lambda match: str(parameter(params, match.group(1))), text)
+
+
+def compile_template(template):
+    """
+    Compile a template into a function of the parameters of a tenant.
+    Returns None when the template has no placeholders at all.
+    """
+    if isinstance(template, dict):
+        items = [(key, compile_text(key), value, compile_template(value)) for key, value in template.items()]
+        if all(key_builder is None and builder is None for _key, key_builder, _value, builder in items):
+            return None
+        return lambda params: dict(
+            (key if key_builder is None else key_builder(params), value if builder is None else builder(params))
+            for key, key_builder, value, builder in items
+        )
+    if isinstance(template, list):
+        builders = [compile_template(value) for value in template]
+        if all(builder is None for builder in builders):
+            return None
+        return lambda params: [
+            value if builder is None else builder(params)
+            for value, builder in zip(template, builders)
+        ]
+    return compile_text(template)
+
+
+def placeholders(template):
+    """The names of the parameters a template refers to"""
+    if isinstance(template, dict):
+        return set(PLACEHOLDER.findall(' '.join(key for key in template if isinstance(key, str)))).union(
+            *(placeholders(value) for value in template.values()))
+    if isinstance(template, list):
+        return set().union(*(placeholders(value) for value in template))
+    if isinstance(template, str):
+        return set(PLACEHOLDER.findall(template))
+    return set()
+
+
+def is_placeholder(value):
+    return isinstance(value, str) and PLACEHOLDER.search(value) is not None
+
+
+def expand_tenants(template, tenants):
+    """Yield (tenant id, configuration) for each tenant"""
+    builder = compile_template(template)
+    for params in tenants:
+        if params.get('id') is None:
+            raise TemplateError(f"Tenant without an id: {params}")
+        yield str(params['id']), template if builder is None else builder(params)
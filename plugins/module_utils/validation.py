@@ -0,0 +1,236 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Opt-in fast validation of the data argument of resource modules.
+
+AnsibleModule validates nested suboptions recursively for every list
+element, running the full set of checks (aliases, no_log, mutually
+exclusive options and so on) at every level and filling in every
+unset suboption with None. For data with thousands of entries that
+takes seconds.
+
+With fast_validation, the data suboptions are compiled once into flat
+tables of (type checker, choices, child table) entries, and data is
+checked in one pass over those tables using the same type checkers
+as AnsibleModule. Unset suboptions are left out rather than set to
+None, which the httpapi plugin drops anyway. The fast path stops at
+the first problem; the data is then validated again the normal way,
+so errors are reported exactly as without fast_validation.
+
+Specs that use anything other than type, elements, choices, default,
+required and options are validated the normal way.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import re
+
+from ansible.module_utils import basic
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.common.parameters import DEFAULT_TYPE_VALIDATORS
+from ansible.module_utils.errors import UnsupportedError
+from ansible.module_utils.parsing.convert_bool import BOOLEANS_FALSE, BOOLEANS_TRUE
+
+# python types that need no conversion by the checker of an ansible type
+NATIVE_TYPES = {
+    'str': str,
+    'list': list,
+    'dict': dict,
+    'bool': bool,
+    'int': int,
+    'float': float,
+}
+
+FAST_VALIDATION = re.compile(br'"fast_validation"\s*:\s*(true|1|"(1|on|t|true|y|yes)")', re.IGNORECASE)
+
+COMPILABLE_KEYS = frozenset(['type', 'elements', 'choices', 'default', 'required', 'options'])
+
+_compiled = {}
+
+
+class Invalid(Exception):
+    pass
+
+
+def compile_options(spec):
+    """
+    Compile suboptions into a (fields, required, defaults) table, where
+    fields maps each name to (native type, checker, choices, boolean
+    remap, element native type, element checker, child table). Returns
+    None when the spec needs the full AnsibleModule validation.
+    Tables are cached by spec, so shared spec pieces compile once.
+    """
+    cached = _compiled.get(id(spec))
+    if cached is not None and cached[0] is spec:
+        return cached[1]
+
+    fields = {}
+    required = []
+    defaults = []
+    for name, option in spec.items():
+        if not COMPILABLE_KEYS.issuperset(option):
+            return None
+        wanted = option.get('type', 'str')
+        if wanted not in DEFAULT_TYPE_VALIDATORS:
+            return None
+        if option.get('required'):
+            required.append(name)
+        if option.get('default') is not None:
+            defaults.append((name, option['default']))
+
+        elements = option.get('elements')
+        if elements is not None and elements not in DEFAULT_TYPE_VALIDATORS:
+            return None
+        child = None
+        if option.get('options') is not None:
+            if wanted != 'dict' and elements != 'dict':
+                return None
+            child = compile_options(option['options'])
+            if child is None:
+                return None
+
+        choices = option.get('choices')
+        remap = {}
+        if choices is not None:
+            try:
+                choices = frozenset(choices)
+            except TypeError:
+                return None
+            # the PyYAML boolean round trip AnsibleModule undoes
+            for text, booleans in (('True', BOOLEANS_TRUE), ('False', BOOLEANS_FALSE)):
+                overlap = booleans.intersection(choices)
+                if len(overlap) == 1:
+                    remap[text] = next(iter(overlap))
+
+        fields[name] = (
+            NATIVE_TYPES.get(wanted), DEFAULT_TYPE_VALIDATORS[wanted], choices, remap,
+            NATIVE_TYPES.get(elements), DEFAULT_TYPE_VALIDATORS.get(elements), child
+        )
+
+    table = (fields, tuple(required), tuple(defaults))
+    _compiled[id(spec)] = (spec, table)
+    return table
+
+
+def check_options(table, params, skip=None):
+    """
+    Check and convert one dict of suboptions in place; raises Invalid.
+    Values for which skip returns true, such as template placeholders,
+    are left as they are.
+    """
+    fields, required, defaults = table
+    for name in required:
+        if name not in params:
+            raise Invalid(name)
+    for name, default in defaults:
+        if name not in params:
+            params[name] = default
+
+    for name, value in params.items():
+        field = fields.get(name)
+        if field is None:
+            raise Invalid(name)
+        if value is None:
+            if name in required:
+                raise Invalid(name)
+            continue
+        if skip is not None and skip(value):
+            continue
+        native, checker, choices, remap, element_native, element_checker, child = field
+
+        if type(value) is not native:
+            try:
+                value = checker(value)
+            except (TypeError, ValueError):
+                raise Invalid(name)
+            params[name] = value
+
+        if element_checker is not None:
+            if not isinstance(value, list):
+                raise Invalid(name)
+            for index, element in enumerate(value):
+                if skip is not None and skip(element):
+                    continue
+                if type(element) is not element_native:
+                    try:
+                        value[index] = element = element_checker(element)
+                    except (TypeError, ValueError):
+                        raise Invalid(name)
+                if child is not None:
+                    check_options(child, element, skip)
+        elif child is not None:
+            check_options(child, value, skip)
+
+        if choices is not None:
+            try:
+                if isinstance(value, list):
+                    if not choices.issuperset(element for element in value if skip is None or not skip(element)):
+                        raise Invalid(name)
+                elif value not in choices:
+                    value = remap.get(value, value)
+                    if value not in choices:
+                        raise Invalid(name)
+                    params[name] = value
+            except TypeError:
+                raise Invalid(name)
+
+
+def check_data(option, data):
+    """Check the value of a dict or list of dicts option against its compiled suboptions"""
+    table = compile_options(option['options'])
+    if table is None:
+        raise Invalid(None)
+    for element in (data if isinstance(data, list) else [data]):
+        if not isinstance(element, dict):
+            raise Invalid(None)
+        check_options(table, element)
+    return data
+
+
+def requested(buffer):
+    """
+    Whether the raw module arguments may set fast_validation. Decoding
+    the arguments costs as much as validating them, and AnsibleModule
+    decodes them again, so this only scans the JSON text. A false match
+    is harmless: data is then validated the normal way after all.
+    """
+    if buffer is None:
+        return True
+    if isinstance(buffer, str):
+        buffer = buffer.encode()
+    return FAST_VALIDATION.search(buffer) is not None
+
+
+def resource_module(argument_spec, **kwargs):
+    """
+    Create the AnsibleModule of a resource module. When the task sets
+    fast_validation, the suboptions of data are left out of what
+    AnsibleModule validates and checked by check_data instead.
+    """
+    data_option = argument_spec['data']
+    if not data_option.get('options') or not requested(basic._ANSIBLE_ARGS):
+        return AnsibleModule(argument_spec=argument_spec, **kwargs)
+
+    plain = dict((key, value) for key, value in data_option.items() if key != 'options')
+    module = AnsibleModule(argument_spec=dict(argument_spec, data=plain), **kwargs)
+    data = module.params['data']
+    if data is None:
+        return module
+
+    try:
+        if not module.params['fast_validation']:
+            raise Invalid(None)
+        module.params['data'] = check_data(data_option, data)
+    except Invalid:
+        result = ArgumentSpecValidator(dict(data=data_option)).validate(dict(data=data))
+        if result.error_messages:
+            msg = result.errors.msg
+            if isinstance(result.errors[0], UnsupportedError):
+                msg = "Unsupported parameters for ({name}) module: {msg}".format(name=module._name, msg=msg)
+            module.fail_json(msg=msg)
+        module.params['data'] = result.validated_parameters['data']
+    return module
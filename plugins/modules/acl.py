@@ -234,6 +234,36 @@ options:
         required: false
         default: 0
         type: int
+    fast_validation:
+        description: Validate C(data) with a validator compiled from the module's argument spec instead of the
+                     standard suboption validation, which is much faster for long lists. Unset suboptions are
+                     left out of the data passed on rather than set to null. Errors are reported as without it.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
+    incremental:
+        description:
+            - Send only what differs from the applied configuration. The applied ACLs are fetched and compared rule by rule;
+              rules that are new or changed are sent, and rules of the ACLs in I(data) that are not in I(data) are removed.
+            - With I(incremental), I(data) must list every rule of each ACL it contains. Nothing is sent, and the task does not
+              report a change, when the applied ACLs already match.
+            - With I(state=deleted) and no I(data), every applied ACL is removed, and nothing is sent when there are none.
+            - Cannot be combined with I(aclid).
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
+    compile:
+        description:
+            - Compile the rules of each ACL before sending them. Exact duplicates of earlier rules and rules that can never match,
+              because an earlier permit or deny rule matches all their packets, are left out. Runs of consecutive rules that
+              only differ in their source or destination prefix are merged into the fewest prefixes covering the same addresses.
+            - What was left out and merged, and the TCAM entries saved, are returned in C(compiled), in check mode as well.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -266,6 +296,20 @@ EXAMPLES = r'''
                     - id: 'smtp'
                   protocol: 'tcp'
           type: 'ipv4'
+
+- name: Check how much a generated ACL can be compacted, without changing anything
+  nvidia.nvue.acl:
+    state: merged
+    compile: true
+    data: "{{ lookup('file', 'acl_edge.json') | from_json }}"
+  check_mode: true
+  register: compiled
+
+- name: Change one rule of a long ACL, sending only that rule
+  nvidia.nvue.acl:
+    state: merged
+    incremental: true
+    data: "{{ lookup('file', 'acl_edge.json') | from_json }}"
     '''
 
 RETURN = r'''
@@ -275,6 +319,18 @@ changed:
   returned: always
   type: bool
   sample: true
+compiled:
+    description: for each ACL compiled with I(compile), the rules left out or merged, and the rule and TCAM entry counts before and after
+    type: dict
+    returned: when compile is true
+    version_added: '1.3.0'
+    sample:
+        acl1:
+            rules: {before: 4, after: 2}
+            tcam_entries: {before: 4, after: 2, saved: 2}
+            duplicates: [{rule: '30', of: '10'}]
+            shadowed: [{rule: '40', by: '10', conflict: true}]
+            merged: [{rules: ['10', '20'], into: ['10']}]
 message:
     description: details of the ACL (for gathered) or whether the change was applied (for merged)
     type: dict
@@ -304,9 +360,10 @@ message:
 '''
 
 import json
-from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
 from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.acl import compile_rules
+from ansible_collections.nvidia.nvue.plugins.module_utils.validation import resource_module
 
 
 def main():
@@ -377,6 +434,9 @@ def main():
         wait=dict(type="int", required=False, default=0),
         state=dict(type='str', required=True, choices=["gathered", "deleted", "merged"]),
         revid=dict(type='str', required=False),
+        fast_validation=dict(type='bool', required=False, default=False),
+        incremental=dict(type='bool', required=False, default=False),
+        compile=dict(type='bool', required=False, default=False),
         aclid=dict(type='str', required=False),
         data=dict(type='list', required=False, elements='dict', options=acl_spec),
         filters=dict(type='dict', required=False, options=filter_spec)
@@ -389,8 +449,8 @@ def main():
     # this includes instantiation, a couple of common attr would be the
     # args/params passed to the execution, as well as if the module
     # supports check mode
-    module = AnsibleModule(
-        argument_spec=module_args,
+    module = resource_module(
+        module_args,
         required_if=required_if,
         supports_check_mode=True
     )
@@ -410,9 +470,27 @@ def main():
     if isinstance(data, string_types):
         data = json.loads(data)
 
+    # every rule of the ACLs in data is listed, so the rules of each ACL are compared as a whole
+    incremental = None
+    if module.params["incremental"]:
+        if module.params["aclid"] is not None:
+            module.fail_json(msg="incremental cannot be combined with aclid")
+        incremental = ("*", "rule")
+
     warnings = list()
     result = {"changed": False, "warnings": warnings}
 
+    if module.params["compile"] and data:
+        result["compiled"] = {}
+        for acl in data:
+            if acl.get("rule"):
+                acl["rule"], report = compile_rules(acl["rule"])
+                result["compiled"][acl["id"]] = report
+                for shadowed in report["shadowed"]:
+                    if shadowed["conflict"]:
+                        warnings.append(f"Rule {shadowed['rule']} of ACL {acl['id']} has a different action than rule {shadowed['by']}, "
+                                        "which matches all its packets first; it was left out")
+
     running = None
     commit = not module.check_mode
 
@@ -423,7 +501,7 @@ def main():
         module.exit_json(**result)
 
     connection = Connection(module._socket_path)
-    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid)
+    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid, incremental=incremental)
     if operation == "set" and response:
         result["changed"] = True
     result["message"] = response
@@ -64,6 +64,11 @@ options:
                 description: Type of bridge domain.
                 required: false
                 type: str
+            vlan_vni_offset:
+                description: Offset added to a VLAN to get its VNI, for VLANs with VNI C(auto).
+                required: false
+                type: int
+                version_added: '1.3.0'
             vlan:
                 description: Set of vlans in the bridge domain. Only applicable when the domain type is "vlan-aware".
                 required: false
@@ -71,7 +76,7 @@ options:
                 elements: dict
                 suboptions:
                     id:
-                        description: A VLAN tag identifier
+                        description: A VLAN tag identifier, or a range of them such as C(10-20,30).
                         required: false
                         type: str
                     vni:
@@ -81,7 +86,7 @@ options:
                         elements: dict
                         suboptions:
                             id:
-                                description: VNI
+                                description: VNI, or C(auto) for the VLAN plus the I(vlan_vni_offset) of the domain.
                                 required: false
                                 type: str
                             flooding:
@@ -194,6 +199,24 @@ options:
         required: false
         default: 0
         type: int
+    fast_validation:
+        description: Validate C(data) with a validator compiled from the module's argument spec instead of the
+                     standard suboption validation, which is much faster for long lists. Unset suboptions are
+                     left out of the data passed on rather than set to null. Errors are reported as without it.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
+    compress_vlans:
+        description:
+            - Collapse the VLANs of each domain into VLAN ranges before sending them, so that the size of the change grows with
+              the number of distinct VLAN settings rather than with the number of VLANs.
+            - VLANs whose only VNI is the VLAN plus a fixed offset get VNI C(auto), and the domain gets that I(vlan_vni_offset).
+              The offset of the domain is used if it is given, otherwise the most common offset among its VLANs.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -217,6 +240,29 @@ EXAMPLES = r'''
             - id: '10'
               vni:
                 - id: '10'
+
+- name: Map VLANs 10 to 4009 to VNIs 10010 to 14009
+  nvidia.nvue.bridge:
+    state: merged
+    wait: 15
+    data:
+        - id: 'br_default'
+          type: 'vlan-aware'
+          vlan_vni_offset: 10000
+          vlan:
+            - id: '10-4009'
+              vni:
+                - id: 'auto'
+
+- name: Push a VLAN list generated elsewhere, sent as VLAN ranges
+  nvidia.nvue.bridge:
+    state: merged
+    wait: 15
+    compress_vlans: true
+    data:
+        - id: 'br_default'
+          type: 'vlan-aware'
+          vlan: "{{ tenant_vlans }}"
     '''
 
 RETURN = r'''
@@ -264,9 +310,10 @@ message:
 '''
 
 import json
-from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
 from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.ranges import compress_vlans
+from ansible_collections.nvidia.nvue.plugins.module_utils.validation import resource_module
 
 
 def main():
@@ -284,6 +331,7 @@ def main():
         type=dict(type='str', required=False),
         encap=dict(type='str', required=False),
         mac_address=dict(type='str', required=False),
+        vlan_vni_offset=dict(type='int', required=False),
         vlan=dict(type='list', required=False, elements='dict', options=dict(
             id=dict(type='str', required=False),
             vni=dict(type='list', required=False, elements='dict', options=dict(
@@ -317,6 +365,8 @@ def main():
         wait=dict(type="int", required=False, default=0),
         state=dict(type='str', required=True, choices=["gathered", "deleted", "merged"]),
         revid=dict(type='str', required=False),
+        fast_validation=dict(type='bool', required=False, default=False),
+        compress_vlans=dict(type='bool', required=False, default=False),
         domainid=dict(type='str', required=False),
         data=dict(type='list', required=False, elements='dict', options=bridge_spec),
         filters=dict(type='dict', required=False, options=filter_spec)
@@ -329,8 +379,8 @@ def main():
     # this includes instantiation, a couple of common attr would be the
     # args/params passed to the execution, as well as if the module
     # supports check mode
-    module = AnsibleModule(
-        argument_spec=module_args,
+    module = resource_module(
+        module_args,
         mutually_exclusive=[["data", "domainid"]],
         required_if=required_if,
         supports_check_mode=True
@@ -354,6 +404,13 @@ def main():
     if isinstance(data, string_types):
         data = json.loads(data)
 
+    if module.params["compress_vlans"]:
+        for domain in data or []:
+            if domain.get("vlan"):
+                domain["vlan"], offset = compress_vlans(domain["vlan"], domain.get("vlan_vni_offset"))
+                if offset is not None:
+                    domain["vlan_vni_offset"] = offset
+
     warnings = list()
     result = {"changed": False, "warnings": warnings}
 
@@ -40,6 +40,8 @@ options:
             - gathered
             - new
             - apply
+            - pruned
+            - rollback
     force:
         description: When true, replies "yes" to NVUE prompts.
         required: false
@@ -50,11 +52,106 @@ options:
         required: false
         default: 0
         type: int
+    async_apply:
+        description:
+            - With I(state=apply), return as soon as the apply has been started instead of waiting for it. I(revid) in the
+              result then holds the revision id, its state and the time the apply started, which M(nvidia.nvue.revision_wait)
+              takes to wait for the revisions of many switches at once.
+            - The C(ansible_nvue_async_apply) variable does the same for the resource modules.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
     revid:
         description: The default is to query the operational state. However, this parameter can be used to query desired state on configuration branches,
                      such as startup and applied. This could be a branch name, tag name or specific commit.
+                     With I(state=pruned), this revision is kept.
+                     With I(state=rollback), this revision is applied again instead of the last known good revision.
+        required: false
+        type: str
+    last_known_good:
+        description:
+            - A directory on the controller in which the httpapi plugin records, before each apply, the revision applied
+              on the switch, as with the C(ansible_nvue_last_known_good) variable.
+            - With I(state=rollback), that revision is applied again in one request, and polled for up to I(wait) seconds.
+            - Revisions are only recorded while this option or the variable is set.
+        required: false
+        type: path
+        version_added: '1.3.0'
+    revision_states:
+        description:
+            - With I(state=gathered) and no I(revid), only list revisions in one of these states, such as C(applied).
+            - This and the other revision listing options select the revisions on the connection, so only the selected
+              revisions are passed on to the task. Revisions are then listed newest first.
+        required: false
+        type: list
+        elements: str
+        version_added: '1.3.0'
+    author:
+        description: With I(state=gathered) and no I(revid), only list revisions created by this user.
+        required: false
+        type: str
+        version_added: '1.3.0'
+    created_after:
+        description:
+            - With I(state=gathered) and no I(revid), only list revisions created at or after this UTC time, such as
+              C(2021-11-02) or C(2021-11-02T16:09:18). The creation time is read from the revision id.
+        required: false
+        type: str
+        version_added: '1.3.0'
+    created_before:
+        description: With I(state=gathered) and no I(revid), only list revisions created at or before this UTC time.
         required: false
         type: str
+        version_added: '1.3.0'
+    newest:
+        description:
+            - With I(state=gathered) and no I(revid), list at most this many revisions, newest first.
+            - Together with I(offset), this pages through the revisions; I(next_offset) in the result is the offset of
+              the next page.
+        required: false
+        type: int
+        version_added: '1.3.0'
+    offset:
+        description: With I(state=gathered) and no I(revid), how many of the selected revisions, newest first, to skip.
+        required: false
+        default: 0
+        type: int
+        version_added: '1.3.0'
+    prune_states:
+        description:
+            - With I(state=pruned), the states of the revisions to delete. The default covers revisions that were never
+              applied and revisions whose apply failed. Applied revisions are never deleted.
+        required: false
+        type: list
+        elements: str
+        default: [pending, invalid, apply_fail, ays_fail, ignore_fail, confirm_fail]
+        version_added: '1.3.0'
+    older_than:
+        description:
+            - With I(state=pruned), only delete revisions created more than this many seconds ago, so that revisions
+              of plays still running are kept. The creation time is read from the revision id, in UTC.
+            - With C(0), revisions are deleted whatever their age.
+            - Revisions staged with M(nvidia.nvue.staged_revisions) are pending until their window, and are deleted
+              once they are older than this unless they are listed in I(keep).
+        required: false
+        default: 86400
+        type: int
+        version_added: '1.3.0'
+    prune_batch:
+        description: With I(state=pruned), how many revisions to delete per call to the connection.
+        required: false
+        default: 100
+        type: int
+        version_added: '1.3.0'
+    keep:
+        description:
+            - With I(state=pruned), ids of revisions never to delete, besides I(revid), such as the revisions staged
+              for a maintenance window with M(nvidia.nvue.staged_revisions).
+        required: false
+        type: list
+        elements: str
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -76,14 +173,98 @@ EXAMPLES = r'''
   nvidia.nvue.config:
     state: apply
     revid: changeset/cumulus/2021-11-02_16.09.18_5Z1K
+- name: Roll back to the revision applied before the last apply
+  nvidia.nvue.config:
+    state: rollback
+    force: true
+    wait: 120
+    last_known_good: /var/lib/nvue/last-known-good
+- name: Fetch the last applied revision
+  nvidia.nvue.config:
+    state: gathered
+    revision_states: [applied]
+    newest: 1
+- name: Fetch the revisions of the automation user from November 2021, 50 at a time
+  nvidia.nvue.config:
+    state: gathered
+    author: automation
+    created_after: '2021-11-01'
+    created_before: '2021-11-30T23:59:59'
+    newest: 50
+    offset: '{{ page | default(0) }}'
+- name: Delete revisions left pending or failed for more than a week
+  nvidia.nvue.config:
+    state: pruned
+    older_than: 604800
+- name: Delete abandoned revisions, but not those staged for the next window
+  nvidia.nvue.config:
+    state: pruned
+    keep: "{{ (lookup('file', '/var/lib/nvue/window.json') | from_json).values() | map(attribute='revid') | list }}"
 '''
 
 RETURN = r'''
-
+total:
+    description: The number of revisions selected, of which I(revid) holds one page.
+    returned: when I(state=gathered) is used with the revision listing options
+    type: int
+next_offset:
+    description: The I(offset) of the next page, or null on the last page.
+    returned: when I(state=gathered) is used with the revision listing options
+    type: int
+pruned:
+    description: The ids of the revisions deleted, or that would be deleted in check mode.
+    returned: when I(state=pruned)
+    type: list
+    elements: str
+revisions:
+    description: The number of revisions before and after pruning.
+    returned: when I(state=pruned)
+    type: dict
+    sample: {"before": 1520, "after": 40}
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
+from ansible_collections.nvidia.nvue.plugins.module_utils.revision import ABANDONED_STATES, parse_time, prunable
+
+
+def prune(module, result):
+    """Delete abandoned revisions in batches, or list them in check mode"""
+    connection = Connection(module._socket_path)
+    revisions = connection.send_request("", "revision", "get") or {}
+    keep = set(module.params["keep"] or [])
+    if module.params["revid"]:
+        keep.add(module.params["revid"])
+    stale = prunable(revisions, module.params["prune_states"], module.params["older_than"], keep)
+
+    pruned = []
+    if module.check_mode:
+        pruned = stale
+    else:
+        size = max(module.params["prune_batch"], 1)
+        for start in range(0, len(stale), size):
+            response = connection.send_request(stale[start:start + size], "revision", "delete")
+            pruned.extend(response["deleted"])
+            for revid, error in response["errors"].items():
+                result["warnings"].append(f"Cannot delete revision {revid}: {error}")
+    result.update(changed=bool(pruned), pruned=pruned, revisions={"before": len(revisions), "after": len(revisions) - len(pruned)})
+    module.exit_json(**result)
+
+
+def listing(module):
+    """The revision listing options, or None when none is set"""
+    params = module.params
+    filters = params["filters"] or {}
+    selection = (params["revision_states"], params["author"], params["created_after"], params["created_before"],
+                 params["newest"], params["offset"] or None, filters.get("include"), filters.get("omit"))
+    if all(value is None for value in selection):
+        return None
+    try:
+        after, before = parse_time(params["created_after"]), parse_time(params["created_before"])
+    except ValueError as exc:
+        module.fail_json(msg=str(exc))
+    return dict(states=params["revision_states"], user=params["author"], after=after, before=before,
+                newest=params["newest"], offset=params["offset"], include=filters.get("include"), omit=filters.get("omit"))
 
 
 def main():
@@ -97,8 +278,20 @@ def main():
     module_args = dict(
         force=dict(type='bool', required=False, default=False),
         wait=dict(type="int", required=False, default=0),
-        state=dict(type='str', required=True, choices=['new', 'apply', 'gathered']),
+        state=dict(type='str', required=True, choices=['new', 'apply', 'gathered', 'pruned', 'rollback']),
         revid=dict(type='str', required=False),
+        async_apply=dict(type='bool', required=False, default=False),
+        last_known_good=dict(type='path', required=False),
+        revision_states=dict(type='list', elements='str', required=False),
+        author=dict(type='str', required=False),
+        created_after=dict(type='str', required=False),
+        created_before=dict(type='str', required=False),
+        newest=dict(type='int', required=False),
+        offset=dict(type='int', required=False, default=0),
+        prune_states=dict(type='list', elements='str', required=False, default=list(ABANDONED_STATES)),
+        older_than=dict(type='int', required=False, default=86400),
+        prune_batch=dict(type='int', required=False, default=100),
+        keep=dict(type='list', elements='str', required=False),
         filters=dict(type='dict', required=False, options=filter_spec)
     )
 
@@ -133,6 +326,9 @@ def main():
     running = None
     commit = not module.check_mode
 
+    if operation == "pruned":
+        prune(module, result)
+
     # if the user is working with this module in only check mode we do not
     # want to make any changes to the environment, just return the current
     # state with no modifications
@@ -140,8 +336,15 @@ def main():
         module.exit_json(**result)
 
     connection = Connection(module._socket_path)
-    response = connection.send_request("", path, operation, force=force, wait=wait, revid=revid)
-    if operation == "set" and response:
+    selection = listing(module) if operation == "get" and revid is None else None
+    if selection is not None:
+        response = connection.send_request("", path, operation, listing=selection)
+        result.update(revid=response["revisions"], total=response["total"], next_offset=response["next_offset"])
+        module.exit_json(**result)
+
+    response = connection.send_request("", path, operation, force=force, wait=wait, revid=revid, async_apply=module.params["async_apply"],
+                                       last_known_good=module.params["last_known_good"])
+    if operation in ("set", "rollback") and response:
         result["changed"] = True
     result["revid"] = response
 
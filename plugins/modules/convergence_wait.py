@@ -0,0 +1,177 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: convergence_wait
+
+short_description: Wait for the protocols of Cumulus Linux switches to converge after an apply
+
+version_added: "1.3.0"
+
+description:
+    - Polls the operational state of switches until BGP neighbors, MLAG, interfaces and other health checks pass, and
+      reports how long each of them took to converge, instead of pausing for a fixed time after an apply.
+    - Every check of every host is polled on its own and at the same time as the others, first every I(interval)
+      seconds and less often the longer it takes, up to I(max_interval), all until a shared I(timeout).
+    - Runs on the controller and talks to each switch over the NVUE REST API with the connection settings of its
+      inventory host. With C(run_once), it waits for every host of the play at once; otherwise, for the host of the
+      task.
+    - With I(revisions), waits for the revisions to be applied first and counts the convergence time from the start
+      of each apply, as given by M(nvidia.nvue.config) with I(async_apply=true).
+
+options:
+    hosts:
+        description: The hosts to wait for. The default is the hosts in I(revisions), or else as described above.
+        required: false
+        type: list
+        elements: str
+    revisions:
+        description:
+            - Revisions to wait for before polling, as a dictionary of host names to revision ids or to results holding
+              one, such as those of asynchronous applies.
+        required: false
+        type: dict
+    bgp:
+        description: VRFs whose BGP neighbors must all be C(established), checked as C(bgp).
+        required: false
+        type: list
+        elements: str
+    mlag:
+        description: When true, MLAG must see its peer (C(peer-alive)), checked as C(mlag).
+        required: false
+        default: false
+        type: bool
+    interfaces:
+        description: Interfaces whose link must be operationally up, checked as C(interfaces).
+        required: false
+        type: list
+        elements: str
+    checks:
+        description: Other health checks on the operational state.
+        required: false
+        type: list
+        elements: dict
+        suboptions:
+            name:
+                description: The name the convergence time is reported under; checks of the same name are reported together.
+                required: true
+                type: str
+            path:
+                description: The NVUE path of the operational state, such as C(vrf/default/router/bgp/neighbor).
+                required: true
+                type: str
+            expect:
+                description:
+                    - The values the state must hold, as a dictionary nested like the state; other keys are ignored.
+                      C(_) may be used for C(-) in keys.
+                required: true
+                type: dict
+            each:
+                description: When true, the state is a dictionary of entries, such as neighbors or VNIs, and each must hold I(expect).
+                required: false
+                default: false
+                type: bool
+            items:
+                description: With I(each), the entries that must hold I(expect), instead of all of them.
+                required: false
+                type: list
+                elements: str
+    timeout:
+        description: Seconds to wait for every host and check together.
+        required: false
+        default: 300
+        type: int
+    interval:
+        description: Seconds between the first two polls of a check.
+        required: false
+        default: 1.0
+        type: float
+    max_interval:
+        description: The longest time between two polls of a check.
+        required: false
+        default: 10.0
+        type: float
+    parallel:
+        description: How many requests to make at the same time.
+        required: false
+        default: 32
+        type: int
+
+notes:
+    - This module has a corresponding action plugin.
+    - Supports C(check_mode), as it only reads operational state.
+
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+EXAMPLES = r'''
+- name: Start applying the revision
+  nvidia.nvue.config:
+    state: apply
+    revid: '{{ revision.revid }}'
+    force: true
+    async_apply: true
+  register: apply
+
+- name: Wait for BGP, MLAG and the uplinks of every switch
+  nvidia.nvue.convergence_wait:
+    revisions: "{{ dict(ansible_play_hosts | zip(ansible_play_hosts | map('extract', hostvars, ['apply', 'revid']))) }}"
+    bgp:
+      - default
+    mlag: true
+    interfaces:
+      - swp51
+      - swp52
+    checks:
+      - name: tenants
+        path: vrf/RED/router/bgp/neighbor
+        each: true
+        items:
+          - swp51
+        expect:
+          state: established
+    timeout: 600
+  run_once: true
+  register: converged
+
+- name: Show the convergence times
+  ansible.builtin.debug:
+    msg: '{{ converged.convergence }}'
+  run_once: true
+'''
+
+RETURN = r'''
+hosts:
+    description: The result for each host.
+    returned: always
+    type: dict
+    contains:
+        converged:
+            description:
+                - Seconds each check took to pass, by name, from the start of the apply, or else from the start of the
+                  task; null when it had not passed by the deadline.
+            type: dict
+        failing:
+            description: For each check that had not passed, the entries, or paths, that did not hold what was expected.
+            type: dict
+        revision:
+            description: The result of waiting for the revision, as returned by M(nvidia.nvue.revision_wait).
+            type: dict
+            returned: when I(revisions) has one for the host
+convergence:
+    description: The longest time each check took to pass on any host, by name, or null when it had not passed on one.
+    returned: always
+    type: dict
+    sample:
+        bgp: 12.4
+        mlag: 4.1
+        interfaces: 0.8
+'''
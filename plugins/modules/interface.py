@@ -44,7 +44,9 @@ options:
         elements: dict
         suboptions:
             id:
-                description: Interface name.
+                description: Interface name, or a range selector such as C(swp1-48), C(swp49-52s0-3) or C(swp1-4,swp10) to apply
+                             the same settings to several interfaces. Settings for an interface selected by several entries are merged,
+                             later entries taking precedence.
                 required: true
                 type: str
             description:
@@ -716,7 +718,7 @@ options:
         required: false
         type: str
     interfaceid:
-        description: Specific interface to query/modify.
+        description: Specific interface to query/modify. When modifying, this can be a range selector like the C(id) of I(data).
         required: false
         type: str
     state:
@@ -737,6 +739,14 @@ options:
         required: false
         default: 0
         type: int
+    fast_validation:
+        description: Validate C(data) with a validator compiled from the module's argument spec instead of the
+                     standard suboption validation, which is much faster for long lists. Unset suboptions are
+                     left out of the data passed on rather than set to null. Errors are reported as without it.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -760,6 +770,18 @@ EXAMPLES = r'''
             address:
                 - id: '10.10.10.1/32'
           type: 'loopback'
+
+- name: Set the MTU of all server ports, and describe the first one
+  nvidia.nvue.interface:
+    state: merged
+    wait: 15
+    data:
+        - id: swp1-48,swp49-52s0-3
+          type: 'swp'
+          link:
+            mtu: 9216
+        - id: swp1
+          description: 'server01'
 '''
 
 RETURN = r'''
@@ -803,9 +825,10 @@ message:
 '''
 
 import json
-from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
 from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.ranges import check
+from ansible_collections.nvidia.nvue.plugins.module_utils.validation import resource_module
 
 
 def main():
@@ -993,6 +1016,7 @@ def main():
         wait=dict(type="int", required=False, default=0),
         state=dict(type='str', required=True, choices=["gathered", "deleted", "merged"]),
         revid=dict(type='str', required=False),
+        fast_validation=dict(type='bool', required=False, default=False),
         interfaceid=dict(type='str', required=False),
         data=dict(type='list', required=False, elements='dict', options=interface_spec),
         filters=dict(type='dict', required=False, options=filter_spec)
@@ -1005,8 +1029,8 @@ def main():
     # this includes instantiation, a couple of common attr would be the
     # args/params passed to the execution, as well as if the module
     # supports check mode
-    module = AnsibleModule(
-        argument_spec=module_args,
+    module = resource_module(
+        module_args,
         required_if=required_if,
         supports_check_mode=True
     )
@@ -1026,6 +1050,13 @@ def main():
     if isinstance(data, string_types):
         data = json.loads(data)
 
+    selectors = [entry["id"] for entry in data or []] + [module.params["interfaceid"] or ""]
+    for selector in selectors:
+        try:
+            check(selector)
+        except ValueError as exc:
+            module.fail_json(msg=str(exc))
+
     warnings = list()
     result = {"changed": False, "warnings": warnings}
 
@@ -1039,7 +1070,7 @@ def main():
         module.exit_json(**result)
 
     connection = Connection(module._socket_path)
-    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid)
+    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid, ranges=True)
     if operation == "set" and response:
         result["changed"] = True
     result["message"] = response
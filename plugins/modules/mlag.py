@@ -104,6 +104,10 @@ options:
         default: 0
         type: int
 
+notes:
+    - To apply the revisions of both peers of an MLAG pair together, pass a I(revid) and apply with
+      M(nvidia.nvue.mlag_apply).
+
 author:
     - Nvidia NBU Team (@nvidia-nbu)
     - Krishna Vasudevan (@krisvasudevan)
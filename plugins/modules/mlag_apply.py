@@ -0,0 +1,151 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: mlag_apply
+
+short_description: Apply the revisions of both peers of Cumulus Linux MLAG pairs together
+
+version_added: "1.3.0"
+
+description:
+    - Applies the staged revisions of the two peers of each MLAG pair at the same time, then waits for both revisions
+      and for MLAG to see the peer again on both switches, and reports how long the pair took to reconverge.
+    - Changes to the peer link, backup IP or MLAG bonds leave a pair inconsistent while only one peer has them.
+      Applying both sides together keeps that window down to the apply time.
+    - Each side checks that its revision is still pending, and both wait for each other for up to I(rendezvous) seconds
+      before they start their applies, so both applies are started or neither is; a side whose peer could not be
+      applied is C(held). When the apply request of one side fails after that, the other side is applied all the
+      same; the failed side is reported as C(unreachable) and the task fails.
+    - Runs on the controller, once for all hosts, and talks to each switch over the NVUE REST API with the connection
+      settings of its inventory host.
+    - Pairs are found from the C(mlag_mac), C(mlag_backup) and C(lo_ip) variables of the hosts, as used by the
+      C(nvidia.nvue.mlag) role, or C(ansible_nvue_mlag_peer); a host without a peer in I(revisions) is applied alone.
+
+options:
+    revisions:
+        description:
+            - The revisions to apply, as a dictionary of host names to revision ids, or to results holding one such as
+              those of M(nvidia.nvue.config) with I(state=new).
+        required: true
+        type: dict
+    pairs:
+        description: The MLAG pairs, as lists of two host names, instead of finding them from the host variables.
+        required: false
+        type: list
+        elements: list
+    force:
+        description: When true, replies "yes" to NVUE prompts during the applies.
+        required: false
+        default: false
+        type: bool
+    converge:
+        description: When true, waits for MLAG to see the peer again on both switches after the applies.
+        required: false
+        default: true
+        type: bool
+    wait:
+        description: Seconds to wait for the applies and MLAG together; with C(0), return as soon as every apply has started.
+        required: false
+        default: 300
+        type: int
+    rendezvous:
+        description: Seconds the two peers of a pair wait for each other before their applies, whatever I(wait) is.
+        required: false
+        default: 60
+        type: int
+    interval:
+        description: Seconds between the first two polls of a switch while waiting.
+        required: false
+        default: 1.0
+        type: float
+    max_interval:
+        description: The longest time between two polls of a switch while waiting.
+        required: false
+        default: 10.0
+        type: float
+    parallel:
+        description: How many switches to talk to at the same time.
+        required: false
+        default: 32
+        type: int
+
+notes:
+    - This module has a corresponding action plugin and is meant to be used with C(run_once).
+
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+EXAMPLES = r'''
+- name: Create new revision
+  nvidia.nvue.config:
+    state: new
+  register: revision
+
+- name: Change the MLAG backup IP
+  nvidia.nvue.mlag:
+    state: merged
+    revid: '{{ revision.revid }}'
+    data:
+      backup:
+        - id: '{{ mlag_backup }}'
+
+- name: Apply both peers together and wait for MLAG
+  nvidia.nvue.mlag_apply:
+    revisions: "{{ dict(ansible_play_hosts | zip(ansible_play_hosts | map('extract', hostvars, ['revision', 'revid']))) }}"
+    force: true
+    wait: 300
+  run_once: true
+'''
+
+RETURN = r'''
+revisions:
+    description: The result for each host.
+    returned: always
+    type: dict
+    contains:
+        revid:
+            description: The revision applied.
+            type: str
+        peer:
+            description: The MLAG peer of the host, or null when applied alone.
+            type: str
+        state:
+            description:
+                - The last state seen, C(timeout) when still applying at the deadline, C(held) when not applied because
+                  its peer could not be, or C(unreachable).
+            type: str
+        duration:
+            description: Seconds from the start of the apply to the poll that saw the last state.
+            type: float
+            returned: when I(wait) is not C(0)
+        mlag:
+            description: The C(peer_alive), C(local_role) and C(peer_role) MLAG operational state last seen.
+            type: dict
+            returned: when I(converge) is true and both revisions of the pair were applied
+pairs:
+    description: The pairs, in the order they were found.
+    returned: always
+    type: list
+    elements: dict
+    contains:
+        hosts:
+            description: The hosts of the pair.
+            type: list
+        skew:
+            description: Seconds between the starts of the applies of the two peers.
+            type: float
+            returned: when both applies started
+        converged:
+            description: Seconds from the first apply of the pair until both peers saw each other, or null at the deadline.
+            type: float
+            returned: when I(converge) is true and both revisions of the pair were applied
+'''
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: revision_rollback
+
+short_description: Roll many Cumulus Linux switches back to their last known good revision at once
+
+version_added: "1.3.0"
+
+description:
+    - Applies again, on every host, the revision that was applied before the last apply, as recorded by the httpapi
+      plugin in the I(last_known_good) directory, and waits for all of them together.
+    - Runs on the controller, once for all hosts, and talks to each switch over the NVUE REST API with the connection
+      settings of its inventory host, so a bad push to a fleet is reverted in one pass.
+    - Hosts without a recorded revision are reported as C(missing) and fail the task, the others are rolled back.
+    - To roll back a single switch, use M(nvidia.nvue.config) with I(state=rollback).
+
+options:
+    hosts:
+        description: The hosts to roll back. The default is the hosts in I(revisions), or else every host of the play.
+        required: false
+        type: list
+        elements: str
+    last_known_good:
+        description:
+            - The directory the httpapi plugin records revisions in. The default is the C(ansible_nvue_last_known_good)
+              variable, or else the C(ANSIBLE_NVUE_LAST_KNOWN_GOOD) environment variable.
+        required: false
+        type: path
+    revisions:
+        description: Revisions to roll back to instead of the recorded ones, as a dictionary of host names to revision ids.
+        required: false
+        type: dict
+    force:
+        description: When true, replies "yes" to NVUE prompts during the applies.
+        required: false
+        default: false
+        type: bool
+    wait:
+        description: Seconds to wait for all applies together; with C(0), return as soon as every apply has started.
+        required: false
+        default: 300
+        type: int
+    interval:
+        description: Seconds between the first two polls of a switch while waiting.
+        required: false
+        default: 1.0
+        type: float
+    max_interval:
+        description: The longest time between two polls of a switch while waiting.
+        required: false
+        default: 10.0
+        type: float
+    parallel:
+        description: How many switches to talk to at the same time.
+        required: false
+        default: 32
+        type: int
+
+notes:
+    - This module has a corresponding action plugin and is meant to be used with C(run_once).
+    - Revisions are only recorded while C(ansible_nvue_last_known_good) is set for the hosts.
+
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+EXAMPLES = r'''
+- name: Push the new configuration
+  nvidia.nvue.system:
+    state: merged
+    force: true
+    wait: 60
+    data:
+      hostname: '{{ inventory_hostname }}'
+  vars:
+    ansible_nvue_last_known_good: /var/lib/nvue/last-known-good
+
+- name: Roll the whole fleet back
+  nvidia.nvue.revision_rollback:
+    last_known_good: /var/lib/nvue/last-known-good
+    force: true
+    wait: 300
+  run_once: true
+'''
+
+RETURN = r'''
+revisions:
+    description: The result for each host.
+    returned: always
+    type: dict
+    contains:
+        revid:
+            description: The revision rolled back to.
+            type: str
+        state:
+            description: The last state seen, C(timeout) when still applying at the deadline, C(missing) or C(unreachable).
+            type: str
+        duration:
+            description: Seconds from the start of the applies to the poll that saw the last state.
+            type: float
+            returned: when I(wait) is not C(0)
+burst:
+    description: Seconds it took to start every apply.
+    returned: unless in check mode
+    type: float
+'''
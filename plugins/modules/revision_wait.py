@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: revision_wait
+
+short_description: Wait for the revisions of many Cumulus Linux switches at once
+
+version_added: "1.3.0"
+
+description:
+    - Waits until revisions applied with I(async_apply) have finished applying on many switches, and reports the final
+      state of each revision and how long its apply took.
+    - Runs on the controller, once for all switches, and polls each switch over the NVUE REST API with the connection
+      settings of its inventory host, so no persistent connection is kept open per switch while waiting.
+    - All switches share one deadline, and a switch is polled less often the longer its apply takes.
+    - Fails when any revision did not reach the C(applied) state.
+
+options:
+    revisions:
+        description:
+            - The revisions to wait for, as a dictionary of inventory host names to revision ids.
+            - A value may also be the I(revid) result of M(nvidia.nvue.config) with I(async_apply), or the I(message)
+              result of a resource module, which hold the revision id and the time the apply started.
+            - Hosts without a revision id, such as hosts that failed earlier, are reported as C(skipped).
+        required: true
+        type: dict
+    timeout:
+        description: Seconds to wait for all revisions together.
+        required: false
+        default: 300
+        type: int
+    interval:
+        description: Seconds between the first two polls of a switch.
+        required: false
+        default: 1.0
+        type: float
+    max_interval:
+        description: The longest time between two polls of a switch; the interval grows by half after each poll up to it.
+        required: false
+        default: 10.0
+        type: float
+    parallel:
+        description: How many switches to poll at the same time.
+        required: false
+        default: 32
+        type: int
+
+notes:
+    - This module has a corresponding action plugin and is meant to be used with C(run_once).
+
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+EXAMPLES = r'''
+- name: Start applying the revision
+  nvidia.nvue.config:
+    state: apply
+    revid: '{{ revision.revid }}'
+    force: true
+    async_apply: true
+  register: apply
+
+- name: Wait for every switch to apply its revision
+  nvidia.nvue.revision_wait:
+    revisions: "{{ dict(ansible_play_hosts | zip(ansible_play_hosts | map('extract', hostvars, ['apply', 'revid']))) }}"
+    timeout: 600
+  run_once: true
+  register: applied
+
+- name: Show how long each apply took
+  ansible.builtin.debug:
+    msg: "{{ applied.revisions | dict2items | map(attribute='value.duration') | list }}"
+  run_once: true
+'''
+
+RETURN = r'''
+revisions:
+    description: The result for each host.
+    returned: always
+    type: dict
+    contains:
+        revid:
+            description: The revision id.
+            type: str
+        state:
+            description: The last state seen, C(timeout) when the revision was still applying at the deadline, or C(skipped).
+            type: str
+        duration:
+            description: Seconds from the start of the apply, or of the wait, to the poll that saw the last state.
+            type: float
+        polls:
+            description: The number of times the revision was polled.
+            type: int
+        error:
+            description: The error of the last poll, when it failed.
+            type: str
+            returned: when the last poll failed
+'''
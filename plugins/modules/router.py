@@ -302,6 +302,18 @@ options:
         required: false
         default: 0
         type: int
+    aggregate_prefixes:
+        description:
+            - Aggregate the rules of each prefix list in I(data) before sending them, as the M(nvidia.nvue.aggregate_prefixes)
+              filter does. Covered entries are left out and sibling prefixes with the same length bounds are merged, so the
+              prefix lists match the same routes with fewer rules. Rules are renumbered in steps of 10.
+            - A prefix list with a rule id that is not a number is sent as it is, with a warning.
+            - As rule ids change, the prefix lists in I(data) are replaced as a whole, sending only the rules that differ from
+              the applied ones; their other rules are removed.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -313,10 +325,31 @@ EXAMPLES = r'''
 - name: Display all the router config in the environment
   nvidia.nvue.router:
     state: gathered
+
+- name: Push a customer prefix list, aggregated into the fewest rules
+  nvidia.nvue.router:
+    state: merged
+    wait: 15
+    aggregate_prefixes: true
+    data:
+        policy:
+            prefix_list:
+                - id: 'CUSTOMERS'
+                  type: 'ipv4'
+                  rule: "{{ customer_rules }}"
 '''
 
 RETURN = r'''
 # These are examples of possible return values, and in general should use other names for return values.
+aggregated:
+    description:
+        - For each prefix list aggregated with I(aggregate_prefixes), the number of match entries before and after.
+        - C(skipped) gives the reason a prefix list was sent as it is.
+    type: dict
+    returned: when aggregate_prefixes is true
+    version_added: '1.3.0'
+    sample:
+        CUSTOMERS: {before: 50000, after: 1830}
 
 '''
 
@@ -324,6 +357,7 @@ import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
 from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.prefixes import aggregate_rules
 
 
 def main():
@@ -404,6 +438,7 @@ def main():
         wait=dict(type="int", required=False, default=0),
         state=dict(type='str', required=True, choices=["gathered", "deleted", "merged"]),
         revid=dict(type='str', required=False),
+        aggregate_prefixes=dict(type='bool', required=False, default=False),
         data=dict(type='dict', required=False, options=router_spec),
         filters=dict(type='dict', required=False, options=filter_spec)
     )
@@ -437,6 +472,18 @@ def main():
     warnings = list()
     result = {"changed": False, "warnings": warnings}
 
+    # aggregated rules are renumbered, so the prefix lists are compared as a whole
+    incremental = None
+    if module.params["aggregate_prefixes"] and data:
+        result["aggregated"] = {}
+        for prefix_list in (data.get("policy") or {}).get("prefix_list") or []:
+            if prefix_list.get("rule"):
+                prefix_list["rule"], report = aggregate_rules(prefix_list["rule"])
+                result["aggregated"][prefix_list.get("id")] = report
+                if "skipped" in report:
+                    warnings.append(f"Prefix list {prefix_list.get('id')} was not aggregated, as it has {report['skipped']}")
+        incremental = ("policy", "prefix-list", "*", "rule")
+
     running = None
     commit = not module.check_mode
 
@@ -447,7 +494,7 @@ def main():
         module.exit_json(**result)
 
     connection = Connection(module._socket_path)
-    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid)
+    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid, incremental=incremental)
     if operation == "set" and response:
         result["changed"] = True
     result["message"] = response
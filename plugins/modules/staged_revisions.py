@@ -0,0 +1,151 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: staged_revisions
+
+short_description: Stage revisions ahead of a maintenance window and apply them together
+
+version_added: "1.3.0"
+
+description:
+    - Keeps track of revisions prepared on many Cumulus Linux switches ahead of a maintenance window, with
+      M(nvidia.nvue.config) I(state=new) and resource modules given the I(revid), so that the window only takes as
+      long as the applies.
+    - With I(state=staged), records the revision of each host in a file on the controller, together with the revisions
+      already applied on the host.
+    - With I(state=verified), checks that every staged revision is still pending and still based on the applied
+      configuration, that is, that no other revision was applied on the host since it was staged.
+    - With I(state=applied), verifies all staged revisions and, only when all of them are ready, starts every apply at
+      once and waits for them like M(nvidia.nvue.revision_wait).
+    - Runs on the controller, once for all hosts, and talks to each switch over the NVUE REST API with the connection
+      settings of its inventory host.
+
+options:
+    state:
+        description: Whether to stage revisions, verify staged revisions, or apply them.
+        required: true
+        type: str
+        choices:
+            - staged
+            - verified
+            - applied
+    path:
+        description:
+            - The file on the controller holding the staged revisions. Staging updates the hosts in I(revisions) and
+              keeps the others.
+        required: true
+        type: path
+    revisions:
+        description:
+            - With I(state=staged), the revisions to stage, as a dictionary of inventory host names to revision ids, or
+              to the I(revid) results of M(nvidia.nvue.config) I(state=new).
+        required: false
+        type: dict
+    hosts:
+        description: The hosts to verify or apply. The default is every host in I(path).
+        required: false
+        type: list
+        elements: str
+    force:
+        description: When true, replies "yes" to NVUE prompts during the applies.
+        required: false
+        default: false
+        type: bool
+    wait:
+        description: Seconds to wait for all applies together; with C(0), return as soon as every apply has started.
+        required: false
+        default: 300
+        type: int
+    interval:
+        description: Seconds between the first two polls of a switch while waiting.
+        required: false
+        default: 1.0
+        type: float
+    max_interval:
+        description: The longest time between two polls of a switch while waiting.
+        required: false
+        default: 10.0
+        type: float
+    parallel:
+        description: How many switches to talk to at the same time.
+        required: false
+        default: 32
+        type: int
+
+notes:
+    - This module has a corresponding action plugin and is meant to be used with C(run_once).
+    - In check mode, nothing is written to I(path) and nothing is applied.
+
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+EXAMPLES = r'''
+# hours before the window
+- name: Create new revision
+  nvidia.nvue.config:
+    state: new
+  register: revision
+
+- name: Set system settings
+  nvidia.nvue.system:
+    state: merged
+    revid: '{{ revision.revid }}'
+    data:
+      hostname: '{{ inventory_hostname }}'
+
+- name: Stage the revisions
+  nvidia.nvue.staged_revisions:
+    state: staged
+    path: /var/lib/nvue/window.json
+    revisions: "{{ dict(ansible_play_hosts | zip(ansible_play_hosts | map('extract', hostvars, ['revision', 'revid']))) }}"
+  run_once: true
+
+# in the window
+- name: Apply every staged revision at once
+  nvidia.nvue.staged_revisions:
+    state: applied
+    path: /var/lib/nvue/window.json
+    force: true
+    wait: 600
+  run_once: true
+'''
+
+RETURN = r'''
+revisions:
+    description: The result for each host.
+    returned: always
+    type: dict
+    contains:
+        revid:
+            description: The staged revision id.
+            type: str
+        state:
+            description: The state of the revision, C(missing) when the host has no such revision, or C(unreachable).
+            type: str
+        stale:
+            description: Whether another revision was applied on the host since the revision was staged.
+            type: bool
+            returned: when I(state=verified) or I(state=applied)
+        applied_since:
+            description: The revisions applied on the host since the revision was staged.
+            type: list
+            elements: str
+            returned: when I(state=verified) or I(state=applied)
+        duration:
+            description: Seconds from the start of the applies to the poll that saw the last state.
+            type: float
+            returned: when I(state=applied) and I(wait) is not C(0)
+burst:
+    description: Seconds it took to start every apply.
+    returned: when I(state=applied) and the revisions were applied
+    type: float
+'''
@@ -196,11 +196,11 @@ def main():
         operation = "set"
     data = module.params["data"]
     # convert parameter name from system_global to global
-    if "system_global" in data:
+    if data and "system_global" in data:
         data["global"] = data["system_global"]
         del data["system_global"]
     # convert parameter name from login_message to message
-    if "login_message" in data:
+    if data and "login_message" in data:
         data["message"] = data["login_message"]
         del data["login_message"]
     force = module.params["force"]
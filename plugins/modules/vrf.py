@@ -631,6 +631,59 @@ options:
         required: false
         default: 0
         type: int
+    fast_validation:
+        description: Validate C(data) with a validator compiled from the module's argument spec instead of the
+                     standard suboption validation, which is much faster for long lists. Unset suboptions are
+                     left out of the data passed on rather than set to null. Errors are reported as without it.
+        required: false
+        default: false
+        type: bool
+        version_added: '1.3.0'
+    routes_file:
+        description:
+            - Path to a CSV or JSON lines file on the controller with static routes for the VRF given by I(vrfid).
+            - A CSV file has a header row naming a C(prefix) and a C(via) column, and optionally C(type) and C(address_family)
+              columns; each row adds one next hop to a route. When C(type) is empty, it follows from C(via).
+            - A JSON lines file has one route per line, in the form of the I(static) suboption of I(data).
+            - The file is read and validated in batches of I(routes_batch) routes, each sent into the same revision as I(data),
+              so memory use does not grow with the number of routes. In check mode, the file is only validated.
+            - The rows or lines of a prefix in one batch are merged into one route with all their next hops, and a batch
+              never ends between rows of the same prefix that follow each other.
+        required: false
+        type: path
+        version_added: '1.3.0'
+    routes_format:
+        description: Format of I(routes_file). By default C(csv) for a file ending in C(.csv), and C(jsonl) otherwise.
+        required: false
+        type: str
+        choices:
+            - csv
+            - jsonl
+        version_added: '1.3.0'
+    routes_batch:
+        description: Number of routes from I(routes_file) sent per request.
+        required: false
+        default: 1000
+        type: int
+        version_added: '1.3.0'
+    template:
+        description:
+            - Configuration shared by the VRFs of I(tenants), in the form of an entry of I(data) without C(id).
+            - Strings, keys included, may refer to a parameter of a tenant as C({name}). A string that is only a placeholder
+              takes the value of the parameter as it is, other strings get the parameter as text.
+            - The template is checked against the options of I(data) once; parameter values are sent as they are.
+        required: false
+        type: dict
+        version_added: '1.3.0'
+    tenants:
+        description:
+            - Parameter table of the VRFs to configure from I(template), one dict per VRF. C(id) is the name of the VRF.
+            - The template is expanded by the httpapi plugin after it is normalized, and the parts without placeholders are
+              shared by all tenants. An entry of I(data) for the same VRF is merged over its expansion.
+        required: false
+        type: list
+        elements: dict
+        version_added: '1.3.0'
 
 author:
     - Nvidia NBU Team (@nvidia-nbu)
@@ -642,16 +695,71 @@ EXAMPLES = r'''
 - name: List all the VRFs and their configuration
   nvidia.nvue.vrf:
     state: gathered
+
+- name: Load the static routes of a tenant VRF from a CSV file
+  nvidia.nvue.vrf:
+    state: merged
+    wait: 30
+    vrfid: 'TENANT1'
+    routes_file: 'routes/tenant1.csv'
+
+- name: Provision tenant VRFs from a template and a parameter table
+  nvidia.nvue.vrf:
+    state: merged
+    wait: 30
+    template:
+        evpn:
+            enable: 'on'
+            vni:
+                - id: '{vni}'
+        router:
+            bgp:
+                enable: 'on'
+                autonomous_system: 65101
+                address_family:
+                    ipv4_unicast:
+                        enable: 'on'
+                        redistribute:
+                            connected:
+                                enable: 'on'
+                        route_export:
+                            to_evpn:
+                                enable: 'on'
+                    l2vpn_evpn:
+                        enable: 'on'
+                route_import:
+                    from_evpn:
+                        route_target:
+                            - id: '65101:{vni}'
+    tenants:
+        - {id: 'TENANT1', vni: 104001}
+        - {id: 'TENANT2', vni: 104002}
+
+# routes/tenant1.csv:
+# prefix,via,type
+# 10.1.0.0/16,192.0.2.1,
+# 10.2.0.0/16,192.0.2.1,
+# 10.2.0.0/16,192.0.2.2,
+# 10.3.0.0/16,blackhole,
 '''
 
 RETURN = r'''
 # These are examples of possible return values, and in general should use other names for return values.
+routes:
+    description: number of routes sent from I(routes_file), one per prefix of each batch
+    type: int
+    returned: when routes_file is set
+    version_added: '1.3.0'
+    sample: 100000
 '''
 
 import json
-from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.connection import Connection
 from ansible.module_utils.six import string_types
+from ansible_collections.nvidia.nvue.plugins.module_utils.routes import FORMATS, RouteError, batches, read_routes
+from ansible_collections.nvidia.nvue.plugins.module_utils.tenants import is_placeholder, placeholders
+from ansible_collections.nvidia.nvue.plugins.module_utils.validation import Invalid, check_data, check_options, compile_options, resource_module
 
 
 def main():
@@ -661,6 +769,17 @@ def main():
         omit=dict(type='list', required=False, elements='str'),
         include=dict(type='list', required=False, elements='str')
     )
+
+    # static routes, which can also be read from routes_file
+    static_spec = dict(type='list', required=False, elements='dict', options=dict(
+        id=dict(type='str', required=False),
+        address_family=dict(type='str', required=False),
+        via=dict(type='list', required=False, elements='dict', options=dict(
+            id=dict(type='str', required=False),
+            type=dict(type='str', required=False, choices=['interface', 'ipv4-address', 'ipv6-address', 'blackhole', 'reject'])
+        ))
+    ))
+
     #  define the VRF spec - used for creation/modification
     vrf_spec = dict(
         id=dict(type='str', required=True),
@@ -808,14 +927,7 @@ def main():
                     ))
                 ))
             )),
-            static=dict(type='list', required=False, elements='dict', options=dict(
-                id=dict(type='str', required=False),
-                address_family=dict(type='str', required=False),
-                via=dict(type='list', required=False, elements='dict', options=dict(
-                    id=dict(type='str', required=False),
-                    type=dict(type='str', required=False, choices=['interface', 'ipv4-address', 'ipv6-address', 'blackhole', 'reject'])
-                ))
-            ))
+            static=static_spec
         )),
     )
 
@@ -825,21 +937,29 @@ def main():
         wait=dict(type="int", required=False, default=0),
         revid=dict(type='str', required=False),
         state=dict(type='str', required=True, choices=['gathered', 'deleted', 'merged']),
+        fast_validation=dict(type='bool', required=False, default=False),
         vrfid=dict(type='str', required=False),
         data=dict(type='list', required=False, elements='dict', options=vrf_spec),
+        routes_file=dict(type='path', required=False),
+        routes_format=dict(type='str', required=False, choices=list(FORMATS)),
+        routes_batch=dict(type='int', required=False, default=1000),
+        template=dict(type='dict', required=False),
+        tenants=dict(type='list', required=False, elements='dict'),
         filters=dict(type='dict', required=False, options=filter_spec)
     )
 
     required_if = [
-        ["state", "merged", ["data"]],
+        ["state", "merged", ["data", "routes_file", "tenants"], True],
     ]
     # the AnsibleModule object will be our abstraction working with Ansible
     # this includes instantiation, a couple of common attr would be the
     # args/params passed to the execution, as well as if the module
     # supports check mode
-    module = AnsibleModule(
-        argument_spec=module_args,
+    module = resource_module(
+        module_args,
         required_if=required_if,
+        required_by={"routes_file": "vrfid"},
+        required_together=[["template", "tenants"]],
         supports_check_mode=True
     )
 
@@ -864,6 +984,14 @@ def main():
     running = None
     commit = not module.check_mode
 
+    template = module.params["template"]
+    tenants = module.params["tenants"]
+    if tenants:
+        check_template(module, vrf_spec, template, tenants)
+
+    if module.params["routes_file"] is not None:
+        load_routes(module, static_spec, data, result)
+
     # if the user is working with this module in only check mode we do not
     # want to make any changes to the environment, just return the current
     # state with no modifications
@@ -871,7 +999,7 @@ def main():
         module.exit_json(**result)
 
     connection = Connection(module._socket_path)
-    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid)
+    response = connection.send_request(data, path, operation, force=force, wait=wait, revid=revid, template=template, tenants=tenants)
     if operation == "set" and response:
         result["changed"] = True
     result["message"] = response
@@ -879,5 +1007,76 @@ def main():
     module.exit_json(**result)
 
 
+def check_template(module, vrf_spec, template, tenants):
+    """
+    Check the template against the VRF options once, converting the
+    values without placeholders, and check that every tenant has an id
+    and the parameters the template refers to
+    """
+    if module.params["vrfid"] is not None:
+        module.fail_json(msg="tenants cannot be combined with vrfid")
+    names = placeholders(template)
+    for tenant in tenants:
+        missing = names.union(["id"]).difference(tenant)
+        if missing:
+            module.fail_json(msg=f"Tenant {tenant.get('id')} has no parameter {', '.join(sorted(missing))}")
+    table = compile_options(vrf_spec)
+    template["id"] = "{id}"
+    try:
+        check_options(table, template, skip=is_placeholder)
+    except Invalid as exc:
+        module.fail_json(msg=f"Invalid template value for {exc}")
+    del template["id"]
+
+
+def routes_batches(module, static_spec):
+    """Yield validated batches of routes from routes_file, failing the module on the first bad route"""
+    try:
+        routes = read_routes(module.params["routes_file"], module.params["routes_format"])
+        for batch in batches(routes, max(module.params["routes_batch"], 1)):
+            try:
+                yield check_data(static_spec, [route for _number, route in batch])
+            except Invalid:
+                validated = []
+                for number, route in batch:
+                    checked = ArgumentSpecValidator(dict(static=static_spec)).validate(dict(static=[route]))
+                    if checked.error_messages:
+                        module.fail_json(msg=f"{module.params['routes_file']} line {number}: {checked.errors.msg}")
+                    validated.extend(checked.validated_parameters["static"])
+                yield validated
+    except RouteError as exc:
+        module.fail_json(msg=f"{module.params['routes_file']}: {exc}")
+    except (IOError, OSError) as exc:
+        module.fail_json(msg=f"Cannot read {module.params['routes_file']}: {exc}")
+
+
+def load_routes(module, static_spec, data, result):
+    """
+    Stream the routes of routes_file into one revision together with
+    data, and apply it unless revid is given. Exits the module.
+    """
+    if module.params["state"] != "merged":
+        module.fail_json(msg="routes_file can only be used with state merged")
+    if module.check_mode:
+        result["routes"] = sum(len(batch) for batch in routes_batches(module, static_spec))
+        module.exit_json(**result)
+
+    connection = Connection(module._socket_path)
+    revid = module.params["revid"] or connection.send_request(None, "revision", "new")
+    if data:
+        connection.send_request(data, "vrf", "set", revid=revid)
+    result["routes"] = 0
+    for batch in routes_batches(module, static_spec):
+        connection.send_request(batch, f"vrf/{module.params['vrfid']}/router/static", "set", revid=revid)
+        result["routes"] += len(batch)
+    result["changed"] = True
+    if module.params["revid"]:
+        result["message"] = {}
+    else:
+        result["message"] = connection.send_request(
+            None, "revision", "apply", revid=revid, force=module.params["force"], wait=module.params["wait"])
+    module.exit_json(**result)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,86 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Adapt how many switches are changed at once to how fast they take it.
+
+An AIMD controller, as in TCP congestion control, keeps a window, the
+number of switches in flight. After each batch it is given how long the
+switches of the batch took and how many of them failed. While the batch
+was no slower than the fastest seen, by a tolerance, and no more of it
+failed than allowed, the window grows by a step; otherwise it is cut by
+a factor. So a rollout speeds up while the switches and the controller
+keep up, and backs off as soon as they do not.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+class AIMD:
+    """The window of an additive increase, multiplicative decrease controller"""
+
+    def __init__(self, start=2, minimum=1, maximum=None, increase=1, decrease=0.5, tolerance=2.0, target=None, errors=0.0):
+        """
+        start is the first window, kept between minimum and maximum.
+        It grows by increase after a good batch and is multiplied by
+        decrease after a bad one: one whose median latency is more than
+        tolerance times the lowest median seen, or more than target
+        seconds, or in which more than the errors fraction failed.
+        """
+        if minimum < 1 or (maximum is not None and maximum < minimum):
+            raise ValueError("the window must be at least 1 and maximum at least minimum, got %r and %r" % (minimum, maximum))
+        if increase < 1 or not 0 < decrease < 1 or tolerance < 1:
+            raise ValueError("increase and tolerance must be at least 1 and decrease between 0 and 1")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.target = target
+        self.errors = errors
+        self.baseline = None
+        self.reason = None
+        self.window = self.bound(start)
+
+    def bound(self, window):
+        window = max(self.minimum, int(window))
+        return min(window, self.maximum) if self.maximum is not None else window
+
+    def congested(self, latency, error_rate):
+        """Why a batch of median latency and error_rate calls for a decrease, or None"""
+        if error_rate > self.errors:
+            return "%.0f%% failed" % (error_rate * 100)
+        if self.target is not None and latency > self.target:
+            return "%.1fs over the %.1fs target" % (latency, self.target)
+        if self.baseline is not None and latency > self.baseline * self.tolerance:
+            return "%.1fs over %.1f times the %.1fs baseline" % (latency, self.tolerance, self.baseline)
+        return None
+
+    def update(self, latencies, failed, size):
+        """
+        The next window, after a batch of size hosts that took latencies,
+        a list of seconds, of which failed failed. The reason for a
+        decrease is left in self.reason.
+        """
+        latency = median(latencies) if latencies else 0.0
+        self.reason = self.congested(latency, float(failed) / size if size else 0.0)
+        if self.reason:
+            self.window = self.bound(self.window * self.decrease)
+        elif size >= self.window:
+            # a batch smaller than the window, held back by the waves,
+            # says nothing about whether a larger one would keep up
+            self.window = self.bound(self.window + self.increase)
+        if not failed and latencies and (self.baseline is None or latency < self.baseline):
+            self.baseline = latency
+        return self.window
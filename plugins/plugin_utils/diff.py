@@ -0,0 +1,58 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Incremental changes between the applied configuration and the desired
+configuration of a path.
+
+NVUE merges a PATCH into a revision and removes the keys set to null,
+so a change is sent as two PATCH bodies: the removals, with the keys to
+drop set to null, and the updates, with only what differs from the
+applied configuration.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+def changes(current, desired, complete=()):
+    """
+    Return (removals, updates) turning current into desired. complete
+    is a sequence of key patterns, "*" matching any key, that leads to
+    a collection desired lists in full, such as ("*", "rule") for the
+    rules of every ACL. The entries of that collection are compared as
+    a whole: an entry that is gone or differs is removed, and an entry
+    that is new or differs is sent in full. Everywhere else desired is
+    merged into current, so only the leaves that differ are sent. Keys
+    are compared as text, as they are in JSON. A desired None, as with
+    state: deleted, removes everything current holds.
+    """
+    current = current if isinstance(current, dict) else {}
+    if desired is None:
+        return dict((str(key), None) for key in current), {}
+    removals = {}
+    updates = {}
+    for key, value in desired.items():
+        key = str(key)
+        old = current.get(key)
+        if value == old:
+            continue
+        if not isinstance(value, dict) or not isinstance(old, dict):
+            updates[key] = value
+            continue
+        if complete and complete[0] in ("*", key):
+            if len(complete) == 1:
+                value = dict((str(name), entry) for name, entry in value.items())
+                gone = dict((name, None) for name, entry in old.items() if value.get(name) != entry)
+                new = dict((name, entry) for name, entry in value.items() if old.get(name) != entry)
+            else:
+                gone, new = changes(old, value, complete[1:])
+        else:
+            gone, new = changes(old, value)
+        if gone:
+            removals[key] = gone
+        if new:
+            updates[key] = new
+    return removals, updates
@@ -0,0 +1,278 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Wait for the revisions of many switches at once.
+
+Each switch is polled directly over the NVUE REST API from the
+controller, without a persistent connection per switch. Polls of all
+switches share one pool of threads and one deadline. The time between
+two polls of a switch starts at the initial interval and grows by half
+after every poll that finds the revision still in progress, up to the
+maximum interval, so slow switches cost fewer requests while quick ones
+are still noticed early.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import concurrent.futures
+import functools
+import heapq
+import json
+import os
+import re
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.urls import ConnectionError as URLConnectionError, Request
+from ansible_collections.nvidia.nvue.plugins.module_utils.revision import FAILURE_STATES, SUCCESS_STATES
+
+# states waiting for an answer to a prompt, which never move on by themselves
+PROMPT_STATES = ("ays", "ignore_fail")
+BACKOFF = 1.5
+# what a failed request to a switch raises
+REQUEST_ERRORS = (urllib.error.URLError, URLConnectionError, OSError, ValueError)
+
+
+def finished(state):
+    """Whether a revision in state will not change any more"""
+    return state in SUCCESS_STATES or state in PROMPT_STATES or state in FAILURE_STATES \
+        or str(state).endswith("_fail")
+
+
+class Endpoint:
+    """The NVUE REST API of one switch"""
+
+    def __init__(self, host, port=None, use_ssl=True, validate_certs=True, user=None, password=None, timeout=10):
+        self.scheme = "https" if use_ssl else "http"
+        self.host = host
+        self.port = port or (443 if use_ssl else 80)
+        self.session = Request(
+            headers={"Accept": "application/json"}, timeout=timeout, validate_certs=validate_certs,
+            url_username=user, url_password=None if user is None else password or "", force_basic_auth=user is not None)
+
+    def request(self, path, data=None, method="GET"):
+        url = "%s://%s:%s/nvue_v1/%s" % (self.scheme, self.host, self.port, path)
+        body = None if data is None else json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body else {}
+        with self.session.open(method, url, data=body, headers=headers) as response:
+            return json.loads(response.read() or b"{}")
+
+    def revisions(self):
+        """All revisions, {revid: {state, ...}}"""
+        return self.request("revision")
+
+    def revision_state(self, revid):
+        return self.request("revision/" + urllib.parse.quote(revid, safe="")).get("state")
+
+    def operational(self, path):
+        """The operational state at path, such as mlag"""
+        return self.request(path + "?rev=operational")
+
+    def apply(self, revid, force=False):
+        """Start applying a revision; returns its state"""
+        data = {"state": "apply"}
+        if force:
+            data["auto-prompt"] = {"ays": "ays_yes", "ignore_fail": "ignore_fail_yes"}
+        return self.request("revision/" + urllib.parse.quote(revid, safe=""), data, "PATCH").get("state")
+
+
+def host_endpoint(host, variables, template=None):
+    """The endpoint of an inventory host from its variables, templated with template"""
+    def value(*names, **kwargs):
+        for name in names:
+            if variables.get(name) is not None:
+                return variables[name] if template is None else template(variables[name])
+        return kwargs.get("default")
+
+    port = value("ansible_httpapi_port")
+    return Endpoint(
+        value("ansible_host", default=host),
+        port=int(port) if port else None,
+        use_ssl=boolean(value("ansible_httpapi_use_ssl", default=False), strict=False),
+        validate_certs=boolean(value("ansible_httpapi_validate_certs", default=True), strict=False),
+        user=value("ansible_user", "ansible_httpapi_user", "remote_user"),
+        password=value("ansible_password", "ansible_httpapi_pass", "ansible_httpapi_password"),
+    )
+
+
+def write_json(path, data):
+    """Replace the file at path with data as JSON, all at once"""
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".nvue-")
+    with os.fdopen(handle, "w") as output:
+        json.dump(data, output, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def switch_name(host, port):
+    """A file name for the switch at host and port"""
+    return re.sub(r"[^\w.-]", "_", f"{host}_{port}")
+
+
+def last_known_good_file(directory, host, port):
+    """The file in directory holding the last known good revision of the switch at host and port"""
+    return os.path.join(directory, switch_name(host, port) + ".json")
+
+
+def read_last_known_good(directory, host, port):
+    """The last known good record of a switch, {revid, recorded, replaced_by}, or None"""
+    try:
+        with open(last_known_good_file(directory, host, port)) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_last_known_good(directory, host, port, revid, replaced_by):
+    """Record revid as the last known good revision of a switch, replaced_by the revision applied after it"""
+    os.makedirs(directory, exist_ok=True)
+    write_json(last_known_good_file(directory, host, port), {
+        "revid": revid,
+        "recorded": time.time(),
+        "replaced_by": replaced_by,
+    })
+
+
+def current_revision(record, revisions):
+    """
+    The id of the revision applied on a switch as far as its last known
+    good record tells, or None without one: the revision applied after
+    the last known good one when its apply succeeded, as found in
+    revisions, {revid: {state, ...}}, and the last known good one when
+    it did not. A rollback records the revision it applies as both.
+    """
+    if not record:
+        return None
+    if ((revisions or {}).get(record.get("replaced_by")) or {}).get("state") in SUCCESS_STATES:
+        return record["replaced_by"]
+    return record.get("revid")
+
+
+def revision_id(value):
+    """
+    The (revid, started) of a revision id, or of a result holding one
+    such as that of an asynchronous apply; revid is None without one
+    """
+    started = None
+    if isinstance(value, dict):
+        started = value.get("started")
+        value = value.get("revid")
+    if not isinstance(value, str) or not value:
+        return None, None
+    return value, started
+
+
+def applied_revisions(revisions):
+    """The ids of the applied revisions in a revision listing"""
+    return sorted(revid for revid, revision in revisions.items() if (revision or {}).get("state") in SUCCESS_STATES)
+
+
+def run_parallel(function, items, parallel=32):
+    """
+    Call function(*arguments) for each of items, {name: arguments}, in
+    at most parallel threads. Returns {name: (result, error)}, with the
+    text of the exception a call raised as error.
+    """
+    results = {}
+    if not items:
+        return results
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(parallel, len(items)))) as pool:
+        futures = dict((pool.submit(function, *arguments), name) for name, arguments in items.items())
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = (future.result(), None)
+            except Exception as exc:
+                # any error is that of the one item, not of the others
+                results[futures[future]] = (None, str(exc) or type(exc).__name__)
+    return results
+
+
+def poll(targets, timeout=300, interval=1.0, max_interval=10.0, parallel=32, clock=time.time):
+    """
+    Call the function of each of targets, {name: (function, done,
+    started)}, until done(result) is true or timeout seconds have passed.
+    started is when the awaited change began, or None to count from now.
+
+    Returns {name: {value, done, duration, polls}} with the last result
+    of the function, and the seconds from started to the call that
+    returned it. A failed call is retried until the deadline, and its
+    error kept in error.
+    """
+    begin = clock()
+    deadline = begin + timeout
+    results = {}
+    delays = {}
+    queue = []
+    for name in targets:
+        results[name] = {"value": None, "done": False, "duration": None, "polls": 0}
+        delays[name] = interval
+        heapq.heappush(queue, (begin, name))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(parallel, len(targets)))) as pool:
+        polling = {}
+        while queue or polling:
+            now = clock()
+            while queue and queue[0][0] <= now:
+                _due, name = heapq.heappop(queue)
+                polling[pool.submit(targets[name][0])] = name
+            wait = None if not queue else max(0, queue[0][0] - now)
+            if not polling:
+                time.sleep(wait)
+                continue
+            done, _pending = concurrent.futures.wait(polling, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = polling.pop(future)
+                result = results[name]
+                result["polls"] += 1
+                now = clock()
+                try:
+                    result["value"] = future.result()
+                    result.pop("error", None)
+                except REQUEST_ERRORS as exc:
+                    result["error"] = str(exc)
+                started = targets[name][2]
+                result["duration"] = round(now - (begin if started is None else started), 3)
+                if "error" not in result and targets[name][1](result["value"]):
+                    result["done"] = True
+                    continue
+                if now >= deadline:
+                    continue
+                heapq.heappush(queue, (min(now + delays[name], deadline), name))
+                delays[name] = min(delays[name] * BACKOFF, max_interval)
+    return results
+
+
+def wait_for_revisions(targets, timeout=300, interval=1.0, max_interval=10.0, parallel=32, clock=time.time):
+    """
+    Poll the revisions of targets, {name: (endpoint, revid, started)},
+    until every one has finished or timeout seconds have passed. started
+    is when the apply began, or None to count from now.
+
+    Returns {name: {revid, state, duration, polls}} with the last state
+    seen, "timeout" for revisions still in progress at the deadline, and
+    the seconds from the start of the apply to the poll that saw the
+    final state. A failed poll is retried until the deadline, and its
+    error kept in error.
+    """
+    polled = poll(
+        dict((name, (functools.partial(endpoint.revision_state, revid), finished, started))
+             for name, (endpoint, revid, started) in targets.items()),
+        timeout=timeout, interval=interval, max_interval=max_interval, parallel=parallel, clock=clock)
+    results = {}
+    for name, (_endpoint, revid, _started) in targets.items():
+        result = polled[name]
+        results[name] = {
+            "revid": revid,
+            "state": result["value"] if result["done"] else "timeout",
+            "duration": result["duration"],
+            "polls": result["polls"],
+        }
+        if "error" in result:
+            results[name]["error"] = result["error"]
+    return results
@@ -0,0 +1,121 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Group commit of the changes concurrent writers make to one switch.
+
+Every persistent connection to a switch, of every play running on the
+controller, queues its changes as a file in the spool directory of the
+switch, then waits for the lock of the switch. The writer holding the
+lock commits every change queued by then into one revision and applies
+it, and leaves the result for each of those writers. A writer that gets
+the lock and finds its result is done, so the writers that queued
+while an apply was in flight share the next one, and a switch sees one
+apply per group of writers instead of one per writer.
+
+Changes are committed in the order they were queued: a group is the
+oldest queued change and those right after it that answer NVUE prompts
+(force) the same way. A writer that stops waiting without a result, on
+an error or a timeout, takes its change out of the queue.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import fcntl
+import json
+import os
+import time
+import uuid
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import write_json
+
+POLL = 0.01
+
+
+class GroupCommit:
+    """The queue of changes to one switch"""
+
+    def __init__(self, directory, switch):
+        self.directory = os.path.join(directory, switch)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, name, extension):
+        return os.path.join(self.directory, name + extension)
+
+    def queued(self):
+        """The names of the queued changes, oldest first"""
+        return sorted(name[:-len(".change")] for name in os.listdir(self.directory) if name.endswith(".change"))
+
+    def read(self, name, extension):
+        with open(self.path(name, extension)) as handle:
+            return json.load(handle)
+
+    def discard(self, name, *extensions):
+        for extension in extensions:
+            try:
+                os.remove(self.path(name, extension))
+            except FileNotFoundError:
+                pass
+
+    def submit(self, change, commit):
+        """
+        Queue change, {patches, force, wait}, and return the result of
+        the commit it became part of. commit is called, with the lock
+        held, with the queued changes to commit together, and returns
+        their shared result. The exception it raises is raised in every
+        writer of the group.
+        """
+        name = "%.6f-%d-%s" % (time.time(), os.getpid(), uuid.uuid4().hex[:8])
+        write_json(self.path(name, ".change"), change)
+        result = self.path(name, ".result")
+        outcome = None
+        try:
+            with open(os.path.join(self.directory, "lock"), "a") as lock:
+                # waiting writers poll for their result rather than queue up
+                # for the lock, so they are all done as soon as it is written
+                while not os.path.exists(result):
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        time.sleep(POLL)
+                        continue
+                    try:
+                        if not os.path.exists(result):
+                            self.commit_group(commit)
+                    finally:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+            outcome = self.read(name, ".result")
+        finally:
+            # a change left queued would be applied by a later writer
+            # that nobody waits for
+            if outcome is None:
+                self.discard(name, ".change", ".result")
+        os.remove(result)
+        if "error" in outcome:
+            raise Exception(outcome["error"])
+        return outcome["result"]
+
+    def commit_group(self, commit):
+        """Commit the oldest queued change and those queued right after it with the same force"""
+        group = []
+        for name in self.queued():
+            try:
+                change = self.read(name, ".change")
+            except FileNotFoundError:
+                # discarded by a writer that stopped waiting
+                continue
+            if group and change["force"] != group[0][1]["force"]:
+                break
+            group.append((name, change))
+        if not group:
+            return
+        try:
+            outcome = {"result": commit([change for _name, change in group])}
+        except Exception as exc:
+            outcome = {"error": str(exc)}
+        for name, _change in group:
+            write_json(self.path(name, ".result"), outcome)
+            self.discard(name, ".change")
@@ -0,0 +1,186 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Controller-side index of the NVUE OpenAPI schema.
+
+The OpenAPI document of an NVUE version is reduced to one entry per
+API path, where the segments that are keys of a collection (such as
+an interface name) are replaced by "*":
+
+    {
+        "interface/*/link": {
+            "defaults": {"mtu": 9216, ...},
+            "enums": {"state": ["up", "down"], ...},
+            "keyed": false
+        },
+        "interface": {"defaults": {}, "enums": {}, "keyed": true},
+        ...
+    }
+
+The index is cached per NVUE version in a directory on the controller,
+so each version is downloaded and indexed once.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import re
+import tempfile
+
+
+def path_key(path):
+    """The index key of an OpenAPI path, such as interface/*/link"""
+    segments = [segment for segment in path.strip("/").split("/") if segment]
+    return "/".join("*" if segment.startswith("{") else segment for segment in segments)
+
+
+def resolve(document, schema, seen=()):
+    """Follow $ref, and merge allOf, into a schema with properties"""
+    if not isinstance(schema, dict):
+        return {}
+    ref = schema.get("$ref")
+    if ref:
+        if ref in seen or not ref.startswith("#/"):
+            return {}
+        target = document
+        for part in ref[2:].split("/"):
+            target = target.get(part, {}) if isinstance(target, dict) else {}
+        return resolve(document, target, seen + (ref,))
+    if "allOf" in schema:
+        merged = {"properties": {}}
+        for part in schema["allOf"]:
+            merged["properties"].update(resolve(document, part, seen).get("properties", {}))
+        merged["properties"].update(schema.get("properties", {}))
+        return merged
+    return schema
+
+
+def leaf_enum(document, schema):
+    """
+    The allowed values of a leaf, or None when any value of its type is
+    allowed. A oneOf/anyOf leaf is only restricted when every branch is.
+    """
+    schema = resolve(document, schema)
+    if "enum" in schema:
+        return list(schema["enum"])
+    branches = schema.get("oneOf") or schema.get("anyOf")
+    if not branches:
+        return None
+    values = []
+    for branch in branches:
+        enum = leaf_enum(document, branch)
+        if enum is None:
+            return None
+        values.extend(enum)
+    return values
+
+
+def operation_schema(item):
+    """The schema of a path's PATCH body, or of its GET response"""
+    patch = item.get("patch", {}).get("requestBody", {}).get("content", {})
+    if "application/json" in patch:
+        return patch["application/json"].get("schema", {})
+    get = item.get("get", {}).get("responses", {}).get("200", {}).get("content", {})
+    if "application/json" in get:
+        return get["application/json"].get("schema", {})
+    return {}
+
+
+def index_openapi(document):
+    """Reduce an OpenAPI document to the per-path index"""
+    index = {}
+    for path, item in document.get("paths", {}).items():
+        key = path_key(path)
+        entry = index.setdefault(key, {"defaults": {}, "enums": {}, "keyed": False})
+        properties = resolve(document, operation_schema(item)).get("properties", {})
+        for name, prop in properties.items():
+            prop = resolve(document, prop)
+            if "default" in prop and not isinstance(prop["default"], (dict, list)):
+                entry["defaults"][name] = prop["default"]
+            enum = leaf_enum(document, prop)
+            if enum is not None:
+                entry["enums"][name] = enum
+        if key.endswith("*"):
+            parent = key.rsplit("/", 1)[0] if "/" in key else ""
+            index.setdefault(parent, {"defaults": {}, "enums": {}, "keyed": False})["keyed"] = True
+    return index
+
+
+def cache_file(directory, version):
+    return os.path.join(directory, "nvue-%s.json" % re.sub(r"[^A-Za-z0-9._-]", "_", version))
+
+
+def load_index(directory, version, download):
+    """
+    Return the index for an NVUE version from the cache directory. On a
+    miss, download() is called for the OpenAPI document, and its index
+    is written to the cache atomically, so concurrent connections to
+    devices of the same version never see a partial file.
+    """
+    filename = cache_file(directory, version)
+    try:
+        with open(filename) as cached:
+            return json.load(cached)
+    except (IOError, OSError, ValueError):
+        pass
+
+    index = index_openapi(download())
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(handle, "w") as output:
+        json.dump(index, output, sort_keys=True)
+    os.replace(temporary, filename)
+    return index
+
+
+def child_key(index, key, segment):
+    """The index key of segment below key, or None if the schema has no such path"""
+    prefix = key + "/" if key else ""
+    if key in index and index[key]["keyed"]:
+        return prefix + "*"
+    if prefix + segment in index:
+        return prefix + segment
+    return None
+
+
+def base_key(index, path):
+    """The index key of a module path such as interface/swp1"""
+    key = ""
+    for segment in path.strip("/").split("/"):
+        if not segment:
+            continue
+        key = child_key(index, key, segment)
+        if key is None:
+            return None
+    return key
+
+
+def apply_schema(index, key, data, prune=False, location=""):
+    """
+    Check the leaves of normalized data at key against the enums of the
+    schema, raising an exception for a value the device would reject.
+    With prune, leaves equal to their schema default are left out of
+    the returned data. Paths the schema does not describe pass as-is.
+    """
+    if key is None or not isinstance(data, dict):
+        return data
+    entry = index.get(key, {"defaults": {}, "enums": {}, "keyed": False})
+    result = {}
+    for name, value in data.items():
+        where = "%s/%s" % (location, name) if location else name
+        if isinstance(value, dict):
+            result[name] = apply_schema(index, child_key(index, key, name), value, prune, where)
+            continue
+        enum = entry["enums"].get(name)
+        if enum is not None and value not in enum:
+            raise Exception(f"Invalid value {value!r} for {where}, expected one of: {', '.join(str(item) for item in enum)}")
+        if prune and name in entry["defaults"] and entry["defaults"][name] == value:
+            continue
+        result[name] = value
+    return result
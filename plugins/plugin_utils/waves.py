@@ -0,0 +1,134 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Plan the waves a change is rolled out to a fabric in.
+
+A wave is a set of switches changed together. The two peers of an MLAG
+pair are never in the same wave, so one of them keeps forwarding while
+the other is changed, and at most a given number of the switches of a
+group, such as the spines, are in a wave. Within those rules, waves are
+as large as they can be, so the rollout takes as few waves as it can.
+
+MLAG peers are found from the host variables the mlag role uses: the
+peers of a pair share their mlag_mac, and the mlag_backup of each is an
+address of the other, its ansible_host or lo_ip. ansible_nvue_mlag_peer
+names the peer of a host when neither is set.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+# the host variables MLAG peers are found from
+PEER_VARIABLES = ("ansible_host", "lo_ip", "mlag_mac", "mlag_backup", "ansible_nvue_mlag_peer")
+
+
+def address(value):
+    """An IP address, without a prefix length, or None"""
+    if not value:
+        return None
+    return str(value).split("/")[0].strip().lower()
+
+
+def mlag_peers(variables):
+    """
+    The MLAG peers of each host of variables, {host: {variable: value}},
+    as {host: set of hosts}.
+    """
+    peers = dict((host, set()) for host in variables)
+    by_mac = {}
+    by_address = {}
+    for host, hostvars in variables.items():
+        mac = address(hostvars.get("mlag_mac"))
+        if mac:
+            by_mac.setdefault(mac, []).append(host)
+        for name in ("ansible_host", "lo_ip"):
+            found = address(hostvars.get(name))
+            if found:
+                by_address.setdefault(found, set()).add(host)
+
+    def pair(one, other):
+        if one != other and other in peers:
+            peers[one].add(other)
+            peers[other].add(one)
+
+    for hosts in by_mac.values():
+        for one in hosts:
+            for other in hosts:
+                pair(one, other)
+    for host, hostvars in variables.items():
+        for other in by_address.get(address(hostvars.get("mlag_backup")), ()):
+            pair(host, other)
+        peer = hostvars.get("ansible_nvue_mlag_peer")
+        if peer:
+            pair(host, str(peer))
+    return peers
+
+
+def mlag_pairs(hosts, peers):
+    """
+    hosts as MLAG pairs, lists of one host and its peer, given the peers
+    of each host, {host: set}; a host whose peer is not in hosts is
+    alone in its list.
+    """
+    pairs = []
+    paired = set()
+    for host in hosts:
+        if host in paired:
+            continue
+        found = sorted(peer for peer in peers.get(host, ()) if peer in hosts and peer not in paired)
+        pair = [host] + found[:1]
+        paired.update(pair)
+        pairs.append(pair)
+    return pairs
+
+
+def plan_waves(hosts, groups, peers, limits=None, order=None, size=None):
+    """
+    The waves to roll out to hosts in, as lists of hosts, given the
+    groups of each host, {host: [group]}, and its peers, {host: set}.
+
+    limits, {group: count}, caps the hosts of a group in a wave. order,
+    a list of groups, rolls out to the hosts of each group, in turn,
+    before the next; hosts in none of them go last. size caps the hosts
+    in a wave. Each wave lists its hosts in the order of hosts.
+    """
+    limits = limits or {}
+    order = order or []
+    position = dict((host, index) for index, host in enumerate(hosts))
+
+    def phase(host):
+        for index, group in enumerate(order):
+            if group in groups.get(host, ()):
+                return index
+        return len(order)
+
+    def limit(host):
+        caps = [limits[group] for group in groups.get(host, ()) if group in limits]
+        return min(caps) if caps else float("inf")
+
+    waves = []
+    for current in sorted(set(phase(host) for host in hosts)):
+        # the hosts with the fewest places to go are placed first
+        placing = sorted(
+            (host for host in hosts if phase(host) == current),
+            key=lambda host: (limit(host), -len(peers.get(host, ())), position[host]))
+        planned = []
+        for host in placing:
+            for wave in planned:
+                if size and len(wave) >= size:
+                    continue
+                if peers.get(host, set()) & set(wave):
+                    continue
+                if any(
+                        group in limits and len([other for other in wave if group in groups.get(other, ())]) >= limits[group]
+                        for group in groups.get(host, ())):
+                    continue
+                wave.append(host)
+                break
+            else:
+                planned.append([host])
+        waves.extend(sorted(wave, key=position.get) for wave in planned)
+    return waves
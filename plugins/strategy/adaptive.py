@@ -0,0 +1,110 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+name: adaptive
+short_description: Roll a play out to a fabric in waves sized by how fast the switches take them
+version_added: "1.3.0"
+description:
+    - Runs the play in waves like the C(nvidia.nvue.waves) strategy, and with the same MLAG, group and failure rules,
+      but plans each wave when the last is done, as large as a window an AIMD controller keeps.
+    - After each wave, the window grows by C(ansible_nvue_concurrency_increase) hosts when the median time its hosts
+      spent in their tasks was no more than C(ansible_nvue_concurrency_tolerance) times the lowest median seen, and no
+      more than C(ansible_nvue_concurrency_latency) seconds when that is set, and none of its hosts failed or was
+      unreachable. Otherwise it is multiplied by C(ansible_nvue_concurrency_decrease). So the rollout speeds up while
+      the switches and the controller keep up, and backs off when applies get slow or fail.
+    - Failures in tasks with C(ignore_errors) count as failures for the window too.
+    - C(ansible_nvue_concurrency_start), the first window, 2 by default.
+    - C(ansible_nvue_concurrency_max), the largest window, C(forks) by default. C(ansible_nvue_wave_size) is the
+      largest window when set.
+    - C(ansible_nvue_concurrency_errors), the fraction of the hosts of a wave that may fail without a decrease, 0
+      by default. The rollout still stops after a failed wave unless the play sets C(max_fail_percentage).
+notes:
+    - As with C(serial), tasks with C(run_once) and handlers run once per wave.
+    - Settings are read from the variables of the first host of the batch, so set them on the play or for all hosts.
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+import time
+
+from ansible.errors import AnsibleError
+from ansible.utils.display import Display
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.concurrency import AIMD, median
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.waves import plan_waves
+from ansible_collections.nvidia.nvue.plugins.strategy.waves import StrategyModule as WavesStrategyModule
+
+display = Display()
+
+# the settings of the controller, with their defaults
+SETTINGS = dict(start=2, max=None, increase=1, decrease=0.5, tolerance=2.0, latency=None, errors=0.0)
+
+
+class StrategyModule(WavesStrategyModule):
+
+    def __init__(self, tqm):
+        super(StrategyModule, self).__init__(tqm)
+        self.queued = {}
+        self.latencies = {}
+        self.errors = set()
+
+    def configure(self, play, host):
+        hostvars, templar = super(StrategyModule, self).configure(play, host)
+        settings = {}
+        for name, default in SETTINGS.items():
+            value = templar.template(hostvars.get("ansible_nvue_concurrency_" + name))
+            try:
+                settings[name] = default if value is None else (int if name in ("start", "max", "increase") else float)(value)
+            except (TypeError, ValueError):
+                raise AnsibleError(f"ansible_nvue_concurrency_{name} must be a number, got {value!r}")
+        maximum = self.size or settings["max"] or self._tqm._forks
+        try:
+            self.controller = AIMD(
+                start=settings["start"], maximum=maximum, increase=settings["increase"], decrease=settings["decrease"],
+                tolerance=settings["tolerance"], target=settings["latency"], errors=settings["errors"])
+        except ValueError as exc:
+            raise AnsibleError(f"Invalid ansible_nvue_concurrency settings: {exc}")
+        return hostvars, templar
+
+    def _queue_task(self, host, task, task_vars, play_context):
+        self.queued[host.name] = time.time()
+        return super(StrategyModule, self)._queue_task(host, task, task_vars, play_context)
+
+    def _process_pending_results(self, iterator, one_pass=False, max_passes=None):
+        results = super(StrategyModule, self)._process_pending_results(iterator, one_pass=one_pass, max_passes=max_passes)
+        now = time.time()
+        for result in results:
+            host = (getattr(result, "host", None) or result._host).name
+            if host in self.queued:
+                self.latencies[host] = self.latencies.get(host, 0.0) + now - self.queued.pop(host)
+            if result.is_failed() or result.is_unreachable():
+                self.errors.add(host)
+        return results
+
+    def waves(self, hosts, groups, peers):
+        """
+        One wave at a time, planned from the hosts not yet done, as large
+        as the window allows, which is then updated from how it went.
+        """
+        remaining = list(hosts)
+        number = 0
+        while remaining:
+            wave = plan_waves(
+                remaining, groups, peers, limits=self.limits, order=self.order, size=self.controller.window)[0]
+            number += 1
+            self.latencies = {}
+            self.errors = set()
+            yield "WAVE [%d, window %d]" % (number, self.controller.window), wave
+            remaining = [host for host in remaining if host not in wave]
+
+            latencies = [self.latencies[host] for host in wave if host in self.latencies]
+            failed = len(self.errors.union(self.failed) & set(wave))
+            window = self.controller.update(latencies, failed, len(wave))
+            display.v("Wave %d: median %.1fs on %d hosts, %d failed; window %d%s" % (
+                number, median(latencies) if latencies else 0.0, len(wave), failed, window,
+                " (%s)" % self.controller.reason if self.controller.reason else ""))
@@ -0,0 +1,144 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+name: waves
+short_description: Roll a play out to a fabric in topology aware waves
+version_added: "1.3.0"
+description:
+    - Runs the play on the hosts of its batch in waves, one after the other, each wave like the C(linear) strategy.
+    - The two peers of an MLAG pair are never in the same wave, and a wave holds at most
+      C(ansible_nvue_wave_limits) hosts of a group, such as the spines. Within those rules the waves are as large as
+      they can be, so the play takes as few waves as it can while one peer of every pair keeps forwarding.
+    - MLAG peers are the hosts that share their C(mlag_mac), and the host whose C(ansible_host) or C(lo_ip) is the
+      C(mlag_backup) of another, as in the variables of the C(mlag) role. C(ansible_nvue_mlag_peer) names the peer
+      of a host otherwise.
+    - "C(ansible_nvue_wave_limits), a dictionary of group names to the most hosts of the group in a wave, for example
+      C({spines: 1})."
+    - C(ansible_nvue_wave_order), a list of group names; the hosts of each group are done, in turn, before those of
+      the next, and hosts in none of them go last.
+    - C(ansible_nvue_wave_size), the most hosts in a wave. C(forks) still caps the hosts running a task at once.
+    - The rollout stops after a wave in which a host failed or was unreachable, or, when the play sets
+      C(max_fail_percentage), more than that percentage of its hosts did, so a fault is not pushed to the peers. As
+      with C(serial), the playbook then stops.
+notes:
+    - As with C(serial), tasks with C(run_once) and handlers run once per wave.
+    - Settings are read from the variables of the first host of the batch, so set them on the play or for all hosts.
+author:
+    - Nvidia NBU Team (@nvidia-nbu)
+'''
+
+from ansible.errors import AnsibleError
+from ansible.executor.play_iterator import PlayIterator
+from ansible.plugins.strategy.linear import StrategyModule as LinearStrategyModule
+from ansible.template import Templar
+from ansible.utils.display import Display
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.waves import PEER_VARIABLES, mlag_peers, plan_waves
+
+display = Display()
+
+
+class StrategyModule(LinearStrategyModule):
+
+    def host_variables(self, play, hosts):
+        """The variables of each host needed to plan the waves, templated"""
+        variables = {}
+        for host in hosts:
+            hostvars = self._variable_manager.get_vars(play=play, host=host, include_hostvars=False)
+            templar = Templar(loader=self._loader, variables=hostvars)
+            variables[host.name] = dict(
+                (name, templar.template(hostvars[name])) for name in PEER_VARIABLES + ("group_names",) if name in hostvars)
+        return variables
+
+    def configure(self, play, host):
+        """Read the settings from the variables of host"""
+        hostvars = self._variable_manager.get_vars(play=play, host=host, include_hostvars=False)
+        templar = Templar(loader=self._loader, variables=hostvars)
+        limits = templar.template(hostvars.get("ansible_nvue_wave_limits")) or {}
+        order = templar.template(hostvars.get("ansible_nvue_wave_order")) or []
+        size = templar.template(hostvars.get("ansible_nvue_wave_size"))
+        if not isinstance(limits, dict):
+            raise AnsibleError(f"ansible_nvue_wave_limits must be a dictionary of group names to counts, got {limits!r}")
+        if not isinstance(order, list):
+            raise AnsibleError(f"ansible_nvue_wave_order must be a list of group names, got {order!r}")
+        try:
+            limits = dict((str(group), int(count)) for group, count in limits.items())
+            size = int(size) if size else None
+        except (TypeError, ValueError) as exc:
+            raise AnsibleError(f"ansible_nvue_wave_limits and ansible_nvue_wave_size must be numbers: {exc}")
+        if any(count < 1 for count in limits.values()) or (size is not None and size < 1):
+            raise AnsibleError("ansible_nvue_wave_limits and ansible_nvue_wave_size must be at least 1")
+        self.limits, self.order, self.size = limits, [str(group) for group in order], size
+        return hostvars, templar
+
+    def waves(self, hosts, groups, peers):
+        """
+        The waves to run, as (title, hosts). Each wave is run before the
+        next is taken, with the hosts that failed in it in self.failed.
+        """
+        planned = plan_waves(hosts, groups, peers, limits=self.limits, order=self.order, size=self.size)
+        display.v("%d waves: %s" % (len(planned), "; ".join(", ".join(wave) for wave in planned)))
+        for number, wave in enumerate(planned):
+            yield "WAVE [%d/%d]" % (number + 1, len(planned)), wave
+
+    def run(self, iterator, play_context):
+        play = iterator._play
+        everyone = self._inventory.get_hosts(play.hosts, order=play.order)
+        batch = [
+            host for host in everyone
+            if host.name not in self._tqm._unreachable_hosts and not iterator.is_failed(host)
+        ]
+        if len(batch) < 2:
+            return super(StrategyModule, self).run(iterator, play_context)
+
+        variables = self.host_variables(play, batch)
+        self.configure(play, batch[0])
+        hosts = [host.name for host in batch]
+        groups = dict((host, variables[host].get("group_names", [])) for host in hosts)
+
+        by_name = dict((host.name, host) for host in batch)
+        start_at_task = play_context.start_at_task
+        result = self._tqm.RUN_OK
+        done = set()
+        self.failed = []
+        try:
+            for title, wave in self.waves(hosts, groups, mlag_peers(variables)):
+                display.banner("%s %s" % (title, ", ".join(wave)))
+                unreachable = set(self._tqm._unreachable_hosts)
+                self._inventory.restrict_to_hosts([by_name[host] for host in wave])
+                play_context.start_at_task = start_at_task
+                wave_iterator = PlayIterator(
+                    inventory=self._inventory,
+                    play=play,
+                    play_context=play_context,
+                    variable_manager=self._variable_manager,
+                    all_vars=self._variable_manager.get_vars(play=play),
+                    start_at_done=self._tqm._start_at_done,
+                )
+                result |= super(StrategyModule, self).run(wave_iterator, play_context)
+                done.update(wave)
+
+                failed = [host for host in wave if wave_iterator.is_failed(by_name[host])]
+                for host in failed:
+                    iterator.mark_host_failed(by_name[host])
+                failed.extend(host for host in wave if host in self._tqm._unreachable_hosts and host not in unreachable)
+                self.failed = failed
+                if wave_iterator.end_play or self._tqm._terminated:
+                    iterator.end_play = wave_iterator.end_play
+                    break
+                remaining = [host for host in hosts if host not in done]
+                if failed and remaining:
+                    allowed = play.max_fail_percentage
+                    if allowed is None or len(failed) * 100.0 / len(wave) > allowed:
+                        display.warning("Stopped after %s, which failed on %s; not run on %s" % (
+                            title, ", ".join(sorted(set(failed))), ", ".join(remaining)))
+                        result |= self._tqm.RUN_FAILED_BREAK_PLAY
+                        break
+        finally:
+            self._inventory.restrict_to_hosts(everyone)
+        return result
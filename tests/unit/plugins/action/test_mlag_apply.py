@@ -0,0 +1,56 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from unittest.mock import MagicMock
+
+from ansible.playbook.play_context import PlayContext
+from ansible.template import Templar
+from ansible_collections.nvidia.nvue.plugins.action import mlag_apply
+
+
+class Switch:
+    """An endpoint with one pending revision"""
+
+    def __init__(self):
+        self.state = "pending"
+
+    def revision_state(self, revid):
+        return self.state
+
+    def apply(self, revid, force=False):
+        self.state = "applying"
+        return self.state
+
+
+class Broken(Switch):
+    """An endpoint whose apply request fails with an unexpected error"""
+
+    def apply(self, revid, force=False):
+        raise RuntimeError("unexpected answer")
+
+
+def run(monkeypatch, switches, **args):
+    monkeypatch.setattr(mlag_apply, "host_endpoint", lambda host, variables, template: switches[host])
+    task = MagicMock(async_val=0, args=dict(
+        revisions={"leaf1": "changeset/cumulus/1", "leaf2": "changeset/cumulus/2"}, pairs=[["leaf1", "leaf2"]], **args))
+    action = mlag_apply.ActionModule(task, MagicMock(), PlayContext(), MagicMock(), Templar(loader=MagicMock()), MagicMock())
+    return action.run(task_vars={"hostvars": {"leaf1": {}, "leaf2": {}}})
+
+
+def test_wait_0_applies_both_peers(monkeypatch):
+    result = run(monkeypatch, {"leaf1": Switch(), "leaf2": Switch()}, wait=0)
+    assert not result.get("failed"), result
+    assert dict((host, revision["state"]) for host, revision in result["revisions"].items()) == {
+        "leaf1": "applying", "leaf2": "applying"}
+
+
+def test_an_error_in_one_apply_fails_that_host_only(monkeypatch):
+    result = run(monkeypatch, {"leaf1": Switch(), "leaf2": Broken()}, wait=0, rendezvous=5)
+    assert result["failed"]
+    assert result["revisions"]["leaf1"]["state"] == "applying"
+    assert result["revisions"]["leaf2"]["state"] == "unreachable"
+    assert result["revisions"]["leaf2"]["error"] == "unexpected answer"
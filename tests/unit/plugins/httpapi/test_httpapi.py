@@ -0,0 +1,112 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import json
+import urllib.parse
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.nvidia.nvue.plugins.httpapi.httpapi import HttpApi, expand_ranges
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import read_last_known_good
+
+REVISIONS = "/nvue_v1/revision"
+
+
+class Switch:
+    """The revisions of a switch, answering the requests of the plugin"""
+
+    def __init__(self, **revisions):
+        self.revisions = dict((revid, {"state": state}) for revid, state in revisions.items())
+
+    def send_http(self, path, data, method):
+        revid = urllib.parse.unquote(path[len(REVISIONS) + 1:])
+        if method == "PATCH":
+            assert json.loads(data)["state"] == "apply"
+            self.revisions[revid]["state"] = "applied"
+        body = self.revisions if path.startswith(REVISIONS + "?") else self.revisions[revid]
+        return object(), BytesIO(json.dumps(body).encode())
+
+
+def plugin(switch):
+    api = HttpApi(MagicMock())
+    api.send_http = switch.send_http
+    api.get_plugin_option = lambda option: None
+    api.endpoint = lambda: ("leaf1", 443)
+    return api
+
+
+def test_expand_ranges_in_path():
+    assert expand_ranges("interface/swp1-2", {"type": "swp"}) == (
+        "interface", {"swp1": {"type": "swp"}, "swp2": {"type": "swp"}})
+
+
+def test_expand_ranges_deleting_a_collection():
+    # state: deleted without interfaceid or data
+    assert expand_ranges("interface", None) == ("interface", None)
+
+
+def test_last_known_good_after_a_rollback(tmp_path):
+    first, good, bad, later = ("changeset/cumulus/2021-11-0%d_16.09.18_5Z1K" % day for day in range(1, 5))
+    api = plugin(Switch(**{first: "applied", good: "pending", bad: "pending", later: "pending"}))
+    directory = str(tmp_path)
+    api.send_request(None, "revision", "apply", revid=good, last_known_good=directory)
+    api.send_request(None, "revision", "apply", revid=bad, last_known_good=directory)
+    assert read_last_known_good(directory, "leaf1", 443)["revid"] == good
+    api.send_request(None, "revision", "rollback", last_known_good=directory)
+    # the bad revision is still applied and newer than the good one, but
+    # the good one is the revision applied on the switch
+    api.send_request(None, "revision", "apply", revid=later, last_known_good=directory)
+    assert read_last_known_good(directory, "leaf1", 443)["revid"] == good
+
+
+class Response:
+    status = 200
+    reason = "OK"
+
+
+def cassette_plugin(options, answers):
+    """A plugin with options, whose connection answers from answers, {path: [answer]}"""
+    connection = MagicMock()
+    connection.get_option.return_value = "leaf1"
+
+    def send(path, data, headers=None, method="GET"):
+        status, body = answers[path].pop(0)
+        if status >= 400:
+            return HTTPError(path, status, "Not Found", {}, None), BytesIO(json.dumps(body).encode())
+        return Response(), BytesIO(json.dumps(body).encode())
+
+    connection.send.side_effect = send
+    api = HttpApi(connection)
+    api.get_plugin_option = options.get
+    return api
+
+
+def test_record_then_replay(tmp_path):
+    cassette = str(tmp_path / "leaf1.jsonl")
+    revision = "/nvue_v1/revision/changeset%2Fcumulus%2F1"
+    recording = cassette_plugin({"cassette": cassette, "cassette_mode": "record"}, {
+        revision: [(200, {"state": "applying"}), (200, {"state": "applied"})],
+        "/nvue_v1/missing": [(404, {"title": "Not Found"})],
+    })
+    assert recording.get_operation(revision) == {"state": "applying"}
+    assert recording.get_operation(revision) == {"state": "applied"}
+    with pytest.raises(Exception, match="Connection error: HTTP Error 404"):
+        recording.get_operation("/nvue_v1/missing")
+
+    replaying = cassette_plugin({"cassette": cassette, "cassette_mode": "replay"}, {})
+    assert replaying.get_operation(revision) == {"state": "applying"}
+    assert replaying.get_operation(revision) == {"state": "applied"}
+    # once the recorded answers run out, the last one is repeated
+    assert replaying.get_operation(revision) == {"state": "applied"}
+    with pytest.raises(Exception, match="Connection error: HTTP Error 404: Not Found, data: {'title': 'Not Found'}"):
+        replaying.get_operation("/nvue_v1/missing")
+    with pytest.raises(Exception, match="No recorded response for PATCH /nvue_v1/system"):
+        replaying.send_http("/nvue_v1/system", {"hostname": "leaf1"}, "PATCH")
+    replaying.connection.send.assert_not_called()
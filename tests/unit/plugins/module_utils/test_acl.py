@@ -0,0 +1,60 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.acl import compile_rules
+
+
+def rule(rule_id, action="permit", **ip):
+    return {"id": rule_id, "match": {"ip": ip}, "action": {action: {}}}
+
+
+def test_shadowed_by_the_earliest_covering_rule():
+    rules = [
+        rule("10", source_ip="10.0.0.0/8", protocol="tcp"),
+        rule("20", source_ip="10.1.0.0/16", protocol="tcp"),
+        rule("30", "deny", source_ip="10.1.2.0/24", protocol="tcp", tcp={"dest_port": [{"id": "22"}]}),
+    ]
+    kept, report = compile_rules(rules)
+    assert [entry["id"] for entry in kept] == ["10"]
+    assert report["shadowed"] == [
+        {"rule": "20", "by": "10", "conflict": False},
+        {"rule": "30", "by": "10", "conflict": True},
+    ]
+
+
+def test_not_shadowed_by_narrower_or_different_matches():
+    rules = [
+        rule("10", source_ip="10.1.0.0/16", protocol="tcp"),
+        rule("20", source_ip="10.0.0.0/8", protocol="tcp"),
+        rule("30", source_ip="10.2.0.0/16", protocol="udp"),
+        rule("40", dest_ip="192.0.2.0/24", tcp={"dest_port": [{"id": "80"}, {"id": "443"}]}),
+        rule("50", dest_ip="192.0.2.0/25", tcp={"dest_port": [{"id": "80"}, {"id": "8080"}]}),
+        rule("60", "log", source_ip="172.16.0.0/12"),
+        rule("70", source_ip="172.16.1.0/24"),
+    ]
+    kept, report = compile_rules(rules)
+    assert report["shadowed"] == []
+    assert report["duplicates"] == []
+
+
+def test_port_lists_and_any_address():
+    rules = [
+        rule("10", dest_ip="192.0.2.0/24", tcp={"dest_port": [{"id": "80"}, {"id": "443"}]}),
+        rule("20", source_ip="10.0.0.1/32", dest_ip="192.0.2.8/29", tcp={"dest_port": [{"id": "443"}]}),
+        rule("30", source_ip="ANY", dest_ip="2001:db8::/64", tcp={"dest_port": [{"id": "443"}]}),
+    ]
+    kept, report = compile_rules(rules)
+    assert [entry["id"] for entry in kept] == ["10", "30"]
+    assert report["shadowed"] == [{"rule": "20", "by": "10", "conflict": False}]
+
+
+def test_large_acl():
+    rules = [rule(str(index), dest_ip="10.%d.%d.0/24" % (index // 256, index % 256), protocol="tcp") for index in range(5000)]
+    rules.append(rule("last", dest_ip="10.3.4.0/25", protocol="tcp"))
+    kept, report = compile_rules(rules)
+    assert report["shadowed"] == [{"rule": "last", "by": str(3 * 256 + 4), "conflict": False}]
+    assert report["rules"]["after"] < 5000
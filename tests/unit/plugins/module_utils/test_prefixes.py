@@ -0,0 +1,29 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.prefixes import aggregate_rules
+
+
+def test_siblings_are_merged_in_rule_order():
+    rules = [
+        {"id": "20", "match": [{"id": "10.0.1.0/24"}], "action": "permit"},
+        {"id": 10, "match": [{"id": "10.0.0.0/24"}], "action": "permit"},
+        {"id": "30", "match": [{"id": "10.0.0.0/24"}], "action": "deny"},
+    ]
+    aggregated, report = aggregate_rules(rules)
+    assert aggregated == [{"id": 10, "match": [{"id": "10.0.0.0/23", "min_prefix_len": 24, "max_prefix_len": 24}], "action": "permit"}]
+    assert report == {"before": 3, "after": 1}
+
+
+def test_rule_ids_that_are_not_numbers():
+    rules = [
+        {"id": "10", "match": [{"id": "10.0.1.0/24"}], "action": "permit"},
+        {"id": "customers", "match": [{"id": "10.0.0.0/24"}], "action": "permit"},
+    ]
+    aggregated, report = aggregate_rules(rules)
+    assert aggregated == rules
+    assert report == {"before": 2, "after": 2, "skipped": "rule ids that are not numbers: customers"}
@@ -0,0 +1,19 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.ranges import expand_keys
+
+
+def test_expand_keys_shares_settings():
+    settings = {"type": "swp"}
+    expanded = expand_keys({"swp1-3": settings, "eth0": {}})
+    assert list(expanded) == ["swp1", "swp2", "swp3", "eth0"]
+    assert all(expanded[name] is settings for name in ("swp1", "swp2", "swp3"))
+
+
+def test_expand_keys_without_data():
+    assert expand_keys(None) is None
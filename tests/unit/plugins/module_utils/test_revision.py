@@ -0,0 +1,25 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.revision import prunable
+
+
+def test_applied_revisions_are_never_prunable():
+    revisions = {
+        "changeset/cumulus/2021-11-02_16.09.18_5Z1K": {"state": "applied"},
+        "changeset/cumulus/2021-11-03_16.09.18_5Z1L": {"state": "applied_and_saved"},
+        "changeset/cumulus/2021-11-04_16.09.18_5Z1M": {"state": "pending"},
+    }
+    states = ["applied", "applied_and_saved", "pending"]
+    assert prunable(revisions, states) == ["changeset/cumulus/2021-11-04_16.09.18_5Z1M"]
+
+
+def test_kept_revisions_are_not_prunable():
+    staged = "changeset/cumulus/2021-11-02_16.09.18_5Z1K"
+    abandoned = "changeset/cumulus/2021-11-03_16.09.18_5Z1L"
+    revisions = {staged: {"state": "pending"}, abandoned: {"state": "pending"}}
+    assert prunable(revisions, older_than=86400, keep={staged}, now=1700000000) == [abandoned]
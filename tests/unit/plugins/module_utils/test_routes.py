@@ -0,0 +1,48 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import types
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.routes import batches, read_routes
+
+ROUTES = (
+    "prefix,via,type\n"
+    "10.1.0.0/16,192.0.2.1,\n"
+    "10.2.0.0/16,192.0.2.1,\n"
+    "10.2.0.0/16,192.0.2.2,\n"
+    "10.3.0.0/16,blackhole,\n"
+)
+
+
+def test_routes_are_read_one_row_at_a_time(tmp_path):
+    filename = tmp_path / "routes.csv"
+    filename.write_text(ROUTES)
+    routes = read_routes(str(filename))
+    assert isinstance(routes, types.GeneratorType)
+    assert next(routes) == (2, {"id": "10.1.0.0/16", "via": [{"id": "192.0.2.1", "type": "ipv4-address"}]})
+
+
+def test_next_hops_of_a_prefix_in_a_batch_make_one_route(tmp_path):
+    filename = tmp_path / "routes.csv"
+    filename.write_text(ROUTES)
+    assert list(batches(read_routes(str(filename)), 2)) == [
+        [
+            (2, {"id": "10.1.0.0/16", "via": [{"id": "192.0.2.1", "type": "ipv4-address"}]}),
+            (3, {"id": "10.2.0.0/16", "via": [
+                {"id": "192.0.2.1", "type": "ipv4-address"}, {"id": "192.0.2.2", "type": "ipv4-address"}]}),
+        ],
+        [
+            (5, {"id": "10.3.0.0/16", "via": [{"id": "blackhole", "type": "blackhole"}]}),
+        ],
+    ]
+
+
+def test_a_full_batch_is_closed_before_a_new_prefix_only():
+    routes = [(number, {"id": "10.%d.0.0/16" % prefix, "via": [{"id": "192.0.2.%d" % number}]})
+              for number, prefix in ((1, 1), (2, 1), (3, 1), (4, 2))]
+    assert [[route["id"] for _number, route in batch] for batch in batches(routes, 1)] == [
+        ["10.1.0.0/16"], ["10.2.0.0/16"]]
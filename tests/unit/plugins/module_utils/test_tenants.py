@@ -0,0 +1,49 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.tenants import TemplateError, expand_tenants, placeholders
+
+TEMPLATE = {
+    "evpn": {"enable": "on", "vni": [{"id": "{vni}"}]},
+    "router": {"bgp": {"router_id": "10.10.{index}.1", "autonomous_system": 65101}},
+    "loopback": {"ip": {"address": {"10.{index}.0.1/32": {}}}},
+}
+
+
+def test_placeholders_are_filled_per_tenant():
+    expanded = dict(expand_tenants(TEMPLATE, [{"id": "TENANT1", "vni": 104001, "index": 1}, {"id": 2, "vni": 104002, "index": 2}]))
+    assert list(expanded) == ["TENANT1", "2"]
+    assert expanded["TENANT1"] == {
+        "evpn": {"enable": "on", "vni": [{"id": 104001}]},
+        "router": {"bgp": {"router_id": "10.10.1.1", "autonomous_system": 65101}},
+        "loopback": {"ip": {"address": {"10.1.0.1/32": {}}}},
+    }
+    assert expanded["2"]["evpn"]["vni"] == [{"id": 104002}]
+
+
+def test_parts_without_placeholders_are_shared():
+    expanded = dict(expand_tenants(TEMPLATE, [{"id": "A", "vni": 1, "index": 1}, {"id": "B", "vni": 2, "index": 2}]))
+    assert expanded["A"]["evpn"] is not expanded["B"]["evpn"]
+    assert expanded["A"]["loopback"]["ip"]["address"]["10.1.0.1/32"] is TEMPLATE["loopback"]["ip"]["address"]["10.{index}.0.1/32"]
+
+
+def test_template_without_placeholders_is_the_same_for_every_tenant():
+    template = {"evpn": {"enable": "on"}}
+    assert list(expand_tenants(template, [{"id": "A"}, {"id": "B"}])) == [("A", template), ("B", template)]
+
+
+def test_placeholders_of_a_template():
+    assert placeholders(TEMPLATE) == {"vni", "index"}
+
+
+def test_missing_parameters_and_ids():
+    with pytest.raises(TemplateError, match="Tenant A has no parameter index"):
+        list(expand_tenants(TEMPLATE, [{"id": "A", "vni": 1}]))
+    with pytest.raises(TemplateError, match="Tenant without an id"):
+        list(expand_tenants(TEMPLATE, [{"vni": 1, "index": 1}]))
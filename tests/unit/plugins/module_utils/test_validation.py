@@ -0,0 +1,84 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import copy
+
+import pytest
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+
+from ansible_collections.nvidia.nvue.plugins.module_utils.validation import Invalid, check_data, compile_options
+
+DATA = dict(type='list', elements='dict', options=dict(
+    name=dict(type='str', required=True),
+    mtu=dict(type='int'),
+    state=dict(type='str', choices=['up', 'down'], default='up'),
+    enable=dict(type='bool'),
+    vlans=dict(type='list', elements='int'),
+    addresses=dict(type='list', elements='dict', options=dict(
+        ip=dict(type='str', required=True),
+        prefix=dict(type='int', default=24),
+    )),
+    vrr=dict(type='dict', options=dict(
+        state=dict(type='str', choices=['on', 'off']),
+    )),
+))
+
+VALID = [
+    [{"name": "swp1"}],
+    [{"name": "swp1", "mtu": "9216", "enable": "yes", "vlans": ["10", 20]}],
+    [{"name": "swp2", "state": "down", "addresses": [{"ip": "10.0.0.1"}, {"ip": "10.0.1.1", "prefix": "31"}]}],
+    [{"name": "vlan10", "vrr": {"state": "True"}}, {"name": "vlan20", "vrr": {"state": "off"}}],
+    [{"name": 5, "mtu": None}],
+]
+
+INVALID = [
+    [{"mtu": 9216}],
+    [{"name": "swp1", "mtu": "jumbo"}],
+    [{"name": "swp1", "state": "sideways"}],
+    [{"name": "swp1", "enable": "maybe"}],
+    [{"name": "swp1", "vlans": ["ten"]}],
+    [{"name": "swp1", "addresses": [{"prefix": 24}]}],
+    [{"name": "swp1", "vrr": {"state": "enabled"}}],
+    [{"name": "swp1", "speed": "10G"}],
+]
+
+
+def without_none(value):
+    """The arguments without None values, which the httpapi plugin drops"""
+    if isinstance(value, dict):
+        return dict((key, without_none(item)) for key, item in value.items() if item is not None)
+    if isinstance(value, list):
+        return [without_none(item) for item in value]
+    return value
+
+
+def full_validation(data):
+    return ArgumentSpecValidator(dict(data=DATA)).validate(dict(data=copy.deepcopy(data)))
+
+
+def test_spec_compiles():
+    assert compile_options(DATA['options']) is not None
+
+
+@pytest.mark.parametrize("data", VALID)
+def test_valid_data_validates_as_with_ansible_module(data):
+    result = full_validation(data)
+    assert not result.error_messages
+    assert without_none(check_data(DATA, copy.deepcopy(data))) == without_none(result.validated_parameters['data'])
+
+
+@pytest.mark.parametrize("data", INVALID)
+def test_invalid_data_is_rejected_as_with_ansible_module(data):
+    assert full_validation(data).error_messages
+    with pytest.raises(Invalid):
+        check_data(DATA, copy.deepcopy(data))
+
+
+def test_data_that_is_not_dicts_is_rejected():
+    with pytest.raises(Invalid):
+        check_data(DATA, ["swp1"])
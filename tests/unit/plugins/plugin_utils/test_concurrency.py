@@ -0,0 +1,58 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.concurrency import AIMD, median
+
+
+def test_median():
+    assert median([3, 1, 2]) == 2
+    assert median([4, 1, 3, 2]) == 2.5
+
+
+def test_window_grows_additively_while_batches_keep_up():
+    controller = AIMD(start=2, increase=2)
+    assert controller.update([1.0, 1.2], 0, 2) == 4
+    assert controller.update([1.1] * 4, 0, 4) == 6
+    assert controller.reason is None
+
+
+def test_window_is_cut_on_failures_latency_and_target():
+    controller = AIMD(start=8, decrease=0.5)
+    controller.update([1.0] * 8, 0, 8)
+    assert controller.update([1.0] * 9, 1, 9) == 4
+    assert controller.reason == "11% failed"
+    assert controller.update([5.0] * 4, 0, 4) == 2
+    assert controller.reason.startswith("5.0s over 2.0 times the 1.0s baseline")
+    assert AIMD(start=4, target=3.0).update([4.0] * 4, 0, 4) == 2
+
+
+def test_window_stays_between_floor_and_ceiling():
+    controller = AIMD(start=10, minimum=2, maximum=5)
+    assert controller.window == 5
+    assert controller.update([1.0] * 5, 0, 5) == 5
+    for _batch in range(5):
+        controller.update([1.0] * 5, 5, 5)
+    assert controller.window == 2
+
+
+def test_small_batches_do_not_grow_the_window():
+    controller = AIMD(start=4)
+    assert controller.update([1.0], 0, 1) == 4
+
+
+def test_tolerated_errors():
+    assert AIMD(start=4, errors=0.25).update([1.0] * 4, 1, 4) == 5
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        AIMD(minimum=0)
+    with pytest.raises(ValueError):
+        AIMD(decrease=1.5)
@@ -0,0 +1,29 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.diff import changes
+
+APPLIED = {
+    "web": {"type": "ipv4", "rule": {"10": {"action": {"permit": {}}}, "20": {"action": {"deny": {}}}}},
+    "mgmt": {"type": "ipv4", "rule": {"10": {"action": {"permit": {}}}}},
+}
+
+
+def test_only_changed_rules_are_sent():
+    desired = {"web": {"type": "ipv4", "rule": {"10": {"action": {"permit": {}}}, 30: {"action": {"deny": {}}}}}}
+    removals, updates = changes(APPLIED, desired, ("*", "rule"))
+    assert removals == {"web": {"rule": {"20": None}}}
+    assert updates == {"web": {"rule": {"30": {"action": {"deny": {}}}}}}
+
+
+def test_deleting_removes_everything_applied():
+    assert changes(APPLIED, None, ("*", "rule")) == ({"web": None, "mgmt": None}, {})
+
+
+def test_deleting_nothing_sends_nothing():
+    assert changes(None, None, ("*", "rule")) == ({}, {})
@@ -0,0 +1,104 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils import fleet
+
+
+class Clock:
+    """Time that only passes when poll sleeps, so polls happen exactly when due"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Switch:
+    """An endpoint answering revision polls with states, or raising the exceptions among them"""
+
+    def __init__(self, clock, *states):
+        self.clock = clock
+        self.states = list(states)
+        self.polled = []
+
+    def revision_state(self, revid):
+        self.polled.append(self.clock.now)
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fleet, "time", clock)
+    return clock
+
+
+def gaps(times):
+    return [round(later - earlier, 3) for earlier, later in zip(times, times[1:])]
+
+
+def test_interval_grows_up_to_the_maximum(clock):
+    switch = Switch(clock, "applying")
+    results = fleet.wait_for_revisions({"leaf01": (switch, "1", None)}, timeout=20, interval=1, max_interval=4, clock=clock.time)
+    # every interval is BACKOFF times the one before, and the last poll is at the deadline
+    assert gaps(switch.polled) == [1, 1.5, 2.25, 3.375, 4, 4, 3.875]
+    assert results["leaf01"] == {"revid": "1", "state": "timeout", "duration": 20, "polls": 8}
+
+
+def test_finished_revisions_stop_polling(clock):
+    quick = Switch(clock, "applying", "applied")
+    slow = Switch(clock, "applying", "applying", "applying", "ays")
+    failed = Switch(clock, "apply_fail")
+    results = fleet.wait_for_revisions({
+        "leaf01": (quick, "1", None),
+        "leaf02": (slow, "2", None),
+        "leaf03": (failed, "3", None),
+    }, interval=1, clock=clock.time)
+    assert results["leaf01"] == {"revid": "1", "state": "applied", "duration": 1, "polls": 2}
+    assert results["leaf02"] == {"revid": "2", "state": "ays", "duration": 4.75, "polls": 4}
+    assert results["leaf03"] == {"revid": "3", "state": "apply_fail", "duration": 0, "polls": 1}
+
+
+def test_duration_counts_from_the_start_of_the_apply(clock):
+    clock.now = 100.0
+    switch = Switch(clock, "applying", "applied")
+    results = fleet.wait_for_revisions({"leaf01": (switch, "1", 95.0)}, interval=1, clock=clock.time)
+    assert results["leaf01"]["duration"] == 6
+
+
+def test_failed_polls_are_retried(clock):
+    switch = Switch(clock, OSError("connection refused"), "applying", "applied")
+    results = fleet.wait_for_revisions({"leaf01": (switch, "1", None)}, interval=1, clock=clock.time)
+    assert results["leaf01"] == {"revid": "1", "state": "applied", "duration": 2.5, "polls": 3}
+
+
+def test_the_last_error_is_kept_at_the_deadline(clock):
+    switch = Switch(clock, "applying", OSError("connection refused"))
+    results = fleet.wait_for_revisions({"leaf01": (switch, "1", None)}, timeout=3, interval=1, clock=clock.time)
+    assert results["leaf01"]["state"] == "timeout"
+    assert results["leaf01"]["error"] == "connection refused"
+    assert switch.polled == [0, 1, 2.5, 3]
+
+
+def test_a_late_answer_still_counts(clock):
+    def answer():
+        # the poll itself outlasts the deadline
+        clock.now += 5
+        return "done"
+
+    results = fleet.poll({"leaf01": (answer, lambda value: value == "done", None)}, timeout=2, clock=clock.time)
+    assert results["leaf01"] == {"value": "done", "done": True, "duration": 5, "polls": 1}
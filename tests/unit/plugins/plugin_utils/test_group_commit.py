@@ -0,0 +1,37 @@
+# Copyright: (c) 2022 NVIDIA
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.fleet import write_json
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.group_commit import GroupCommit
+
+
+class Timeout(BaseException):
+    pass
+
+
+def test_only_the_leading_run_with_the_same_force_is_grouped(tmp_path):
+    queue = GroupCommit(str(tmp_path), "leaf1")
+    for name, force in (("1", False), ("2", True), ("3", False)):
+        write_json(queue.path(name, ".change"), {"patches": [name], "force": force})
+    committed = []
+    for _group in range(3):
+        queue.commit_group(lambda changes: committed.append([change["patches"][0] for change in changes]))
+    assert committed == [["1"], ["2"], ["3"]]
+
+
+def test_a_change_without_a_result_is_not_left_queued(tmp_path):
+    queue = GroupCommit(str(tmp_path), "leaf1")
+
+    def commit(changes):
+        raise Timeout()
+
+    with pytest.raises(Timeout):
+        queue.submit({"patches": [], "force": False}, commit)
+    assert queue.queued() == []
+    assert queue.submit({"patches": [], "force": False}, lambda changes: len(changes)) == 1
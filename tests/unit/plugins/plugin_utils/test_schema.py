@@ -0,0 +1,71 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.schema import apply_schema, base_key, index_openapi, load_index
+
+
+def patch(schema):
+    return {"patch": {"requestBody": {"content": {"application/json": {"schema": schema}}}}}
+
+
+DOCUMENT = {
+    "paths": {
+        "/interface/{interface-id}": patch({"properties": {"type": {"enum": ["swp", "bond", "loopback"]}}}),
+        "/interface/{interface-id}/link": patch({"$ref": "#/components/schemas/link"}),
+    },
+    "components": {"schemas": {
+        "state": {"oneOf": [{"enum": ["up"]}, {"enum": ["down"]}]},
+        "link": {"allOf": [
+            {"properties": {"mtu": {"type": "integer", "default": 9216}}},
+            {"properties": {"state": {"$ref": "#/components/schemas/state"}, "speed": {"type": "string"}}},
+        ]},
+    }},
+}
+
+
+def test_index_of_an_openapi_document():
+    index = index_openapi(DOCUMENT)
+    assert index["interface"]["keyed"] is True
+    assert index["interface/*"]["enums"] == {"type": ["swp", "bond", "loopback"]}
+    assert index["interface/*/link"] == {"defaults": {"mtu": 9216}, "enums": {"state": ["up", "down"]}, "keyed": False}
+
+
+def test_base_key_of_module_paths():
+    index = index_openapi(DOCUMENT)
+    assert base_key(index, "interface/swp1") == "interface/*"
+    assert base_key(index, "interface/swp1/link") == "interface/*/link"
+    assert base_key(index, "system") is None
+
+
+def test_invalid_values_are_rejected():
+    index = index_openapi(DOCUMENT)
+    with pytest.raises(Exception, match="Invalid value 'sideways' for swp1/link/state, expected one of: up, down"):
+        apply_schema(index, "interface", {"swp1": {"link": {"state": "sideways"}}})
+
+
+def test_defaults_are_pruned():
+    index = index_openapi(DOCUMENT)
+    data = {"swp1": {"type": "swp", "link": {"mtu": 9216, "state": "up", "speed": "auto"}}}
+    assert apply_schema(index, "interface", data, prune=True) == {"swp1": {"type": "swp", "link": {"state": "up", "speed": "auto"}}}
+    assert apply_schema(index, "interface", data) == data
+
+
+def test_index_is_downloaded_once_per_version(tmp_path):
+    downloads = []
+
+    def download():
+        downloads.append(1)
+        return DOCUMENT
+
+    first = load_index(str(tmp_path), "5.4.0", download)
+    assert load_index(str(tmp_path), "5.4.0", download) == first
+    assert len(downloads) == 1
+    load_index(str(tmp_path), "5.5.0", download)
+    assert len(downloads) == 2
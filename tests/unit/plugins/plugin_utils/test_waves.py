@@ -0,0 +1,63 @@
+# Copyright: (c) 2022, NVIDIA <nvidia.com>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.nvidia.nvue.plugins.plugin_utils.waves import mlag_pairs, mlag_peers, plan_waves
+
+VARIABLES = {
+    "leaf01": {"ansible_host": "10.0.0.11", "mlag_mac": "44:38:39:BE:EF:AA", "mlag_backup": "10.0.0.12"},
+    "leaf02": {"ansible_host": "10.0.0.12", "mlag_mac": "44:38:39:be:ef:aa", "mlag_backup": "10.0.0.11"},
+    "leaf03": {"lo_ip": "10.10.10.3/32", "mlag_backup": "10.10.10.4"},
+    "leaf04": {"lo_ip": "10.10.10.4/32"},
+    "leaf05": {"ansible_nvue_mlag_peer": "leaf06"},
+    "leaf06": {},
+    "spine01": {"ansible_host": "10.0.0.1"},
+    "spine02": {"ansible_host": "10.0.0.2"},
+}
+HOSTS = sorted(VARIABLES)
+GROUPS = dict((host, ["spines" if host.startswith("spine") else "leaves"]) for host in HOSTS)
+
+
+def test_peers_from_mac_backup_address_and_variable():
+    peers = mlag_peers(VARIABLES)
+    assert peers["leaf01"] == {"leaf02"}
+    assert peers["leaf03"] == {"leaf04"} and peers["leaf04"] == {"leaf03"}
+    assert peers["leaf06"] == {"leaf05"}
+    assert peers["spine01"] == set()
+
+
+def test_pairs_leave_hosts_without_a_peer_alone():
+    peers = mlag_peers(VARIABLES)
+    assert mlag_pairs(["leaf01", "leaf02", "leaf03", "spine01"], peers) == [["leaf01", "leaf02"], ["leaf03"], ["spine01"]]
+
+
+def test_peers_are_never_in_the_same_wave():
+    peers = mlag_peers(VARIABLES)
+    waves = plan_waves(HOSTS, GROUPS, peers)
+    assert len(waves) == 2
+    for wave in waves:
+        for host in wave:
+            assert not peers[host] & set(wave)
+    assert sorted(host for wave in waves for host in wave) == HOSTS
+
+
+def test_unpaired_hosts_go_in_the_first_wave():
+    assert plan_waves(["spine01", "spine02", "leaf06"], {}, {}) == [["spine01", "spine02", "leaf06"]]
+
+
+def test_group_limits_and_wave_size():
+    peers = mlag_peers(VARIABLES)
+    waves = plan_waves(HOSTS, GROUPS, peers, limits={"spines": 1}, size=3)
+    assert all(len(wave) <= 3 for wave in waves)
+    assert all(len([host for host in wave if host.startswith("spine")]) <= 1 for wave in waves)
+    assert sorted(host for wave in waves for host in wave) == HOSTS
+
+
+def test_groups_in_order():
+    waves = plan_waves(HOSTS, GROUPS, mlag_peers(VARIABLES), order=["spines"])
+    assert waves[0] == ["spine01", "spine02"]
+    assert all(not host.startswith("spine") for wave in waves[1:] for host in wave)